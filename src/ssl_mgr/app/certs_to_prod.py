@@ -13,103 +13,145 @@ from ssl_mgr.utils import Log
 from ssl_mgr.config import ConfServ
 
 from .ssl_mgr_data import SslMgrData
-from .check_production_synced import check_production_synced
+from .remote_copy import copy_to_remotes
+from .prod_generations import ProdGenerations
+from .check_production_synced import (check_production_synced,
+                                      production_synced_save)
 
 
-def _copy_local_prod(ssl_mgr: SslMgrData) -> bool:
+type ChangedSvcs = dict[str, list[str]]
+
+
+def _changed_svcs(ssl_mgr: SslMgrData) -> ChangedSvcs:
     """
-    Copy from certs/group/svc -> prod_cert_dir
+    Groups with changes and their changed services
     """
-    logger = Log()
-    logs = logger.logs
-    logsv = logger.logsv
+    changed: ChangedSvcs = {}
+    for (grp_name, change) in ssl_mgr.changes.group.items():
+        if change.cert_changed or change.tlsa_changed or change.dns_changed:
+            changed[grp_name] = list(change.svc_names)
+    return changed
+
 
+def _changed_paths(ssl_mgr: SslMgrData, changed: ChangedSvcs) -> list[str]:
+    """
+    Paths, relative to prod_cert_dir, of changed services and
+    tlsa files.
+    """
     prod_cert_dir = ssl_mgr.opts.prod_cert_dir
-    if not os.path.exists(prod_cert_dir):
-        isok = make_dir_path(prod_cert_dir)
-        if not isok:
-            logs(f'Error - Failed to make dir {prod_cert_dir}')
-            return False
+    paths: list[str] = []
+    for (grp_name, svc_names) in changed.items():
+        tlsa_path = os.path.join(grp_name, f'tlsa.{grp_name}')
+        if os.path.exists(os.path.join(prod_cert_dir, tlsa_path)):
+            paths.append(tlsa_path)
+
+        for svc_name in svc_names:
+            svc_path = os.path.join(grp_name, svc_name)
+            if os.path.isdir(os.path.join(prod_cert_dir, svc_path)):
+                paths.append(f'{svc_path}/')
+    return paths
+
+
+def _changed_manifest_paths(changed: ChangedSvcs) -> list[str]:
+    """
+    Paths copied for changed services (see production_synced_save)
+    """
+    paths: list[str] = []
+    for (grp_name, svc_names) in changed.items():
+        paths.append(grp_name)
+        paths.append(os.path.join(grp_name, f'tlsa.{grp_name}'))
+        for svc_name in svc_names:
+            paths.append(f'{os.path.join(grp_name, svc_name)}/')
+    return paths
+
+
+def _copy_groups(ssl_mgr: SslMgrData, prod_cert_dir: str,
+                 changed: ChangedSvcs | None) -> bool:
+    """
+    Copy groups 1 at a time into prod_cert_dir
+     - if changed given, only those groups/services
+    """
+    logsv = Log().logsv
 
-    # copy groups 1 at a time
     for (grp_name, group) in ssl_mgr.groups.items():
+        svc_names: list[str] | None = None
+        if changed is not None:
+            if grp_name not in changed:
+                continue
+            svc_names = changed[grp_name]
+
         logsv(f'  -> prod {grp_name}')
         prod_group_dir = os.path.join(prod_cert_dir, grp_name)
 
-        if not group.to_production(prod_group_dir):
+        if not group.to_production(prod_group_dir, svc_names):
             return False
     return True
 
 
-def _copy_local_to_remote(ssl_mgr: SslMgrData, host: str) -> bool:
+def _copy_local_prod(ssl_mgr: SslMgrData,
+                     changed: ChangedSvcs | None = None) -> bool:
     """
-    Copy production certs/keys to remote server
-     - Skip if host is not remote
+    Copy from certs/group/svc -> prod_cert_dir
+     - if changed given, only those groups/services
+     - copied into a new generation (hard links to the current one)
+       which then replaces the current one in one step.
+       See ProdGenerations.
     """
-    # pylint: disable=duplicate-code
-    #
-    # Only do remote hosts
-    #
-    if host in (ssl_mgr.this_host, ssl_mgr.this_fqdn):
-        # skip as already copied to myself (local) host
-        return True
-
     logger = Log()
     logs = logger.logs
-    #
-    # copy contents to same remote dir
-    #
-    cert_dir = f'{ssl_mgr.opts.prod_cert_dir}/'
-    remote_cert_dir = f'{host}:{cert_dir}'
 
-    #
-    # Cannot copy remote if cert_dir not absolute path:
-    #
-    if cert_dir[0] == '.':
-        logs(f'  Error: remote copy must be absolute path : {cert_dir}')
-        return False
+    opts = ssl_mgr.opts
+    prod_cert_dir = opts.prod_cert_dir
+    if opts.debug:
+        return _copy_groups(ssl_mgr, prod_cert_dir, changed)
 
-    # pargs = ['/usr/bin/rsync', '-a', '--mkpath', cert_dir, remote_cert_dir]
-    pargs = ['/usr/bin/rsync']
-    pargs += ['-a', '--delete', '--mkpath', cert_dir, remote_cert_dir]
-
-    if ssl_mgr.opts.debug:
-        logs(f'  debug: {pargs}')
-    else:
-        logs(f'  Copying certs to remote {host}')
-        test = ssl_mgr.opts.debug
-        (retc, _sout, _serr) = run_prog(pargs, test=test, verb=True)
-        if retc != 0:
-            logs(f'Error: copying certs to {remote_cert_dir}')
+    parent_dir = os.path.dirname(os.path.abspath(prod_cert_dir))
+    if not os.path.exists(parent_dir):
+        isok = make_dir_path(parent_dir)
+        if not isok:
+            logs(f'Error - Failed to make dir {parent_dir}')
             return False
+
+    gens = ProdGenerations(prod_cert_dir, opts.prod_keep_gens)
+    gen_dir = gens.new_generation()
+    if not gen_dir:
+        return False
+
+    if not _copy_groups(ssl_mgr, gen_dir, changed):
+        gens.discard(gen_dir)
+        return False
+
+    if not gens.activate(gen_dir):
+        gens.discard(gen_dir)
+        return False
+
+    gens.prune()
     return True
 
 
-def _copy_to_server(ssl_mgr: SslMgrData,
-                    serv_class: ConfServ,
+def _copy_to_server(serv_class: ConfServ,
                     servers_done: set[str],
+                    hosts: list[str]
                     ):
     """
-    Copy production cers to server
+    Add servers to list of hosts to copy production certs to
+     - each host only once (servers_done)
     """
     logger = Log()
     logs = logger.logs
 
     if not (serv_class and serv_class.servers):
-        return True
+        return
 
     if serv_class.skip_prod_copy:
         logs(' skip_prod_copy set - skipping')
-        return True
+        return
 
-    okay = True
     for host in serv_class.servers:
         if host in servers_done:
             continue
         servers_done.add(host)
-        if not _copy_local_to_remote(ssl_mgr, host):
-            okay = False
-    return okay
+        hosts.append(host)
 
 
 def _post_copy_command(ssl_mgr: SslMgrData):
@@ -161,12 +203,18 @@ def certs_to_production(ssl_mgr: SslMgrData) -> bool:
     logs('Certs to production: checking for changes')
     changes = ssl_mgr.changes
     do_copy: bool = False
-    if (changes.any.cert_changed or changes.any.dns_changed
-            or ssl_mgr.opts.certs_to_prod):
+    changed: ChangedSvcs | None = None      # None => copy everything
+    if ssl_mgr.opts.certs_to_prod:
+        logs('    : Requested => copy certs/dns to production')
+        do_copy = True
+
+    elif changes.any.cert_changed or changes.any.dns_changed:
         #
         # check state machine
+        # production was in sync so only copy what changed
         #
-        logs('    : Changes => copy certs/dns to production')
+        logs('    : Changes => copy changed certs/dns to production')
+        changed = _changed_svcs(ssl_mgr)
         do_copy = True
 
     elif not check_production_synced(ssl_mgr):
@@ -183,18 +231,33 @@ def certs_to_production(ssl_mgr: SslMgrData) -> bool:
     #
     # copy everything in prod_cert_dir on this machine
     #
-    if not _copy_local_prod(ssl_mgr):
+    if not _copy_local_prod(ssl_mgr, changed):
         return False
 
+    copied: list[str] | None = None
+    if changed is not None:
+        copied = _changed_manifest_paths(changed)
+    if not production_synced_save(ssl_mgr, copied):
+        logs('Warning: failed to save production manifest')
+
     #
     # List of server types we know about
     #
     server_types = ('smtp', 'imap', 'web', 'other')
     servers_done: set[str] = set()
+    hosts: list[str] = []
     for stype in server_types:
         server = getattr(ssl_mgr.opts, stype)
-        if not _copy_to_server(ssl_mgr, server, servers_done):
-            return False
+        _copy_to_server(server, servers_done, hosts)
+
+    paths: list[str] | None = None
+    if changed is not None:
+        paths = _changed_paths(ssl_mgr, changed)
+        if not paths:
+            hosts = []
+
+    if not copy_to_remotes(ssl_mgr, hosts, paths):
+        return False
 
     #
     # Run any post copy commands
@@ -5,12 +5,17 @@ Check that production certs are same as latest "certs" output.
 """
 # pylint: disable=too-many-locals
 import os
+import time
 
 from ssl_mgr.utils import dir_list
 from ssl_mgr.utils import Log
 from ssl_mgr.compare import compare_files
 
 from .ssl_mgr_data import SslMgrData
+from .prod_manifest import (write_prod_manifest, prod_manifest_matches)
+
+_CERT_FILES = ('privkey.pem', 'cert.pem', 'csr.pem', 'bundle.pem',
+               'chain.pem', 'fullchain.pem')
 
 
 class _Check:
@@ -39,6 +44,56 @@ class _Check:
         for gname in self.group_names:
             self.grps_svcs[gname] = self.mgr.groups[gname].svcs
 
+    def synced_paths(self) -> list[str]:
+        """
+        Paths (relative to cert_dir / prod_dir) kept in sync
+        """
+        paths: list[str] = []
+        for gname in self.group_names:
+            paths.append(gname)
+            paths.append(os.path.join(gname, f'tlsa.{gname}'))
+            for sname in self.grps_svcs[gname]:
+                for which in ('curr', 'next'):
+                    which_dir = os.path.join(gname, sname, which)
+                    paths.append(which_dir)
+                    for file in _CERT_FILES:
+                        paths.append(os.path.join(which_dir, file))
+        return paths
+
+    def manifest_matches(self) -> bool:
+        """
+        Unchanged since last known in sync
+        """
+        return prod_manifest_matches(self.topdir, self.cert_dir,
+                                     self.prod_dir, self.synced_paths(),
+                                     save=not self.mgr.opts.debug)
+
+    def save_manifest(self, copied: list[str] | None = None) -> bool:
+        """
+        Record certs/production are in sync.
+         - copied : if only these paths were copied to production
+        """
+        if self.mgr.opts.debug:
+            return True
+        return write_prod_manifest(self.topdir, self.cert_dir,
+                                   self.prod_dir, self.synced_paths(),
+                                   copied)
+
+    def all_synced(self) -> bool:
+        """
+        Full comparison of certs and production
+        """
+        # list of groups must match
+        if not self.group_names_synced():
+            return False
+
+        if not self.tlsa_synced():
+            return False
+
+        if not self.certs_synced():
+            return False
+        return True
+
     def group_names_synced(self):
         """
         Check that every group is in production.
@@ -115,6 +170,7 @@ def check_production_synced(mgr: SslMgrData):
     logs = logger.logs
 
     logs('Checking production directory is up to date.')
+    start = time.monotonic()
 
     # prep some data
     check = _Check(mgr)
@@ -123,21 +179,41 @@ def check_production_synced(mgr: SslMgrData):
         logs(' Skipped: No cert dir. Possibly a new set up.')
         return True
 
-    # list of groups must match
-    if not check.group_names_synced():
-        return False
+    #
+    # Nothing changed since last known in sync
+    # else full compare
+    #
+    if check.manifest_matches():
+        logs(f'  All good (manifest) : {time.monotonic() - start:.2f} secs')
+        return True
 
-    if not check.tlsa_synced():
+    if not check.all_synced():
+        logs(f'  Check took {time.monotonic() - start:.2f} secs')
         return False
 
-    if not check.certs_synced():
-        return False
+    if not check.save_manifest():
+        logs('  Warning: failed to save production manifest')
 
-    logs('  All good.')
+    logs(f'  All good : {time.monotonic() - start:.2f} secs')
 
     return True
 
 
+def production_synced_save(mgr: SslMgrData,
+                           copied: list[str] | None = None) -> bool:
+    """
+    Call after copy to production so next check can
+    use the manifest.
+     - copied : None after a full copy, else the paths (relative
+       to prod_cert_dir, '/' ending for dirs) that were copied.
+       Only those are recorded as in sync.
+    """
+    check = _Check(mgr)
+    if not check.have_cert_dir:
+        return True
+    return check.save_manifest(copied)
+
+
 def _group_list(group_dir: str) -> list[str]:
     """
     Return list of groups (directories) in gdir.
@@ -176,10 +252,7 @@ def _check_cert_dir(group_dir: str, prod_dir: str, sname: str,
         return False
 
     # both exist - check content.
-    files = ('privkey.pem', 'cert.pem', 'csr.pem', 'bundle.pem',
-             'chain.pem', 'fullchain.pem')
-
-    for file in files:
+    for file in _CERT_FILES:
         cert_file = os.path.join(group_dir, sname, which, file)
         prod_file = os.path.join(prod_dir, sname, which, file)
 
@@ -0,0 +1,46 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Report nameserver propagation history (sslm-mgr --status)
+"""
+from ssl_mgr.utils import Log
+from ssl_mgr.dns_base import read_ns_stats
+
+from .ssl_mgr_data import SslMgrData
+
+
+def ns_stats_status(ssl_mgr: SslMgrData):
+    """
+    Show how long each nameserver has taken to reach
+    primary's serial, with timeouts and failures.
+    Helps tune dns_check_delay and dns_xtra_ns.
+    """
+    stats = read_ns_stats(ssl_mgr.opts.top_dir)
+    if stats == {}:
+        return
+
+    logger = Log()
+    logs = logger.logs
+
+    logs('')
+    logs('Nameserver propagation (secs):', opt='ldash')
+    if stats is None:
+        logs('  stats unreadable (will be rewritten on next dns-01 check)')
+        return
+
+    hdr = f'  {"nameserver":30s} {"avg":>7s} {"last":>7s} {"max":>7s}'
+    hdr += f' {"count":>6s} {"timeouts":>8s} {"fails":>6s}  serial'
+    logs(hdr)
+
+    for (ns, item) in sorted(stats.items()):
+        conv_secs = item.get('conv_secs', 0.0)
+        last_secs = item.get('last_secs', 0.0)
+        max_secs = item.get('max_secs', 0.0)
+        count = item.get('count', 0)
+        timeouts = item.get('timeouts', 0)
+        fails = item.get('fails', 0)
+        serial = item.get('last_serial', '')
+
+        row = f'  {ns:30s} {conv_secs:7.1f} {last_secs:7.1f} {max_secs:7.1f}'
+        row += f' {count:6d} {timeouts:8d} {fails:6d}  {serial}'
+        logs(row)
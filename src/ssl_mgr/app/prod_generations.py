@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Versioned production directory.
+
+prod_cert_dir is a symlink to the current generation:
+    <prod_cert_dir> -> <prod_cert_dir>.gens/<seq>-<date>
+
+Each copy to production builds a complete new generation, starting
+from hard links to every file in the current one, then flips the
+symlink in one rename. Readers (e.g. a server reload) see either the
+old set of certs/keys or the new one - never a mix.
+
+The previous prod_keep_gens generations are kept. To roll back,
+point the symlink at an older one, e.g.:
+    ln -sfn prod-certs.gens/<seq>-<date> prod-certs.new
+    mv -T prod-certs.new prod-certs
+
+An existing (pre generations) real prod_cert_dir is moved into
+<prod_cert_dir>.gens on the first flip (there is a brief moment
+between the 2 renames, this one time, when it's absent).
+"""
+import os
+import shutil
+
+from ssl_mgr.utils import current_date_time_str
+from ssl_mgr.utils import dir_list
+from ssl_mgr.utils import Log
+
+
+def _clone_tree(src_dir: str, dst_dir: str):
+    """
+    Copy of src_dir tree using hard links for the files.
+    """
+    os.makedirs(dst_dir)
+    shutil.copystat(src_dir, dst_dir)
+    with os.scandir(src_dir) as scan:
+        for entry in scan:
+            dst = os.path.join(dst_dir, entry.name)
+            if entry.is_symlink():
+                os.symlink(os.readlink(entry.path), dst)
+            elif entry.is_dir():
+                _clone_tree(entry.path, dst)
+            else:
+                os.link(entry.path, dst)
+
+
+class ProdGenerations:
+    """
+    Generations of the production dir
+    """
+    def __init__(self, prod_cert_dir: str, keep: int):
+        self.link: str = os.path.normpath(os.path.abspath(prod_cert_dir))
+        self.gens_dir: str = f'{self.link}.gens'
+        self.keep: int = max(keep, 0)
+
+    def current(self) -> str:
+        """
+        Current generation or (old style) real dir.
+        Empty if none yet.
+        """
+        if os.path.islink(self.link):
+            return os.path.realpath(self.link)
+        if os.path.isdir(self.link):
+            return self.link
+        return ''
+
+    def _new_name(self, suffix: str = '') -> str:
+        """
+        New generation dir name: <seq>-<date>
+        seq increases by 1 each time so names sort oldest first.
+        """
+        (_files, gens, _links) = dir_list(self.gens_dir)
+        seq = 0
+        for gen in gens:
+            num = gen.split('-', 1)[0]
+            if num.isdigit():
+                seq = max(seq, int(num))
+
+        date = current_date_time_str().replace(':', '')
+        return os.path.join(self.gens_dir, f'{seq + 1:06d}-{date}{suffix}')
+
+    def new_generation(self) -> str:
+        """
+        Make new generation from current one (hard links).
+        Returns its path or empty string if failed
+        """
+        gen_dir = self._new_name()
+        curr = self.current()
+        try:
+            os.makedirs(self.gens_dir, exist_ok=True)
+            if curr:
+                _clone_tree(curr, gen_dir)
+            else:
+                os.makedirs(gen_dir)
+        except OSError as err:
+            Log().logs(f'Error: making production generation {gen_dir} : {err}')
+            shutil.rmtree(gen_dir, ignore_errors=True)
+            return ''
+        return gen_dir
+
+    def discard(self, gen_dir: str):
+        """
+        Remove unused (failed) generation
+        """
+        if gen_dir and os.path.dirname(gen_dir) == self.gens_dir:
+            shutil.rmtree(gen_dir, ignore_errors=True)
+
+    def activate(self, gen_dir: str) -> bool:
+        """
+        Flip prod_cert_dir symlink to gen_dir (atomic rename).
+        """
+        logger = Log()
+        logs = logger.logs
+
+        target = os.path.relpath(gen_dir, os.path.dirname(self.link))
+        link_tmp = f'{self.link}.new'
+        try:
+            if os.path.lexists(link_tmp):
+                os.unlink(link_tmp)
+            os.symlink(target, link_tmp)
+
+            if os.path.isdir(self.link) and not os.path.islink(self.link):
+                # first time - old style real dir becomes a generation
+                legacy = self._new_name('.legacy')
+                os.rename(self.link, legacy)
+                logs(f'  Moved {self.link} -> {legacy}')
+
+            os.replace(link_tmp, self.link)
+
+        except OSError as err:
+            logs(f'Error: switching {self.link} -> {target} : {err}')
+            return False
+        return True
+
+    def prune(self):
+        """
+        Keep current and previous 'keep' generations.
+        The generation prod_cert_dir resolves to (the live one, even
+        after a manual roll back) is never removed. Compared by real
+        path as a parent of prod_cert_dir may be a symlink.
+        """
+        curr = os.path.realpath(self.link) if os.path.lexists(self.link) else ''
+        (_files, gens, _links) = dir_list(self.gens_dir)
+        gens = sorted(os.path.join(self.gens_dir, gen) for gen in gens)
+        gens = [gen for gen in gens if os.path.realpath(gen) != curr]
+
+        # names sort oldest first
+        num_remove = len(gens) - self.keep
+        for gen_dir in gens[:max(num_remove, 0)]:
+            shutil.rmtree(gen_dir, ignore_errors=True)
@@ -0,0 +1,262 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Manifest of files last seen in sync with production.
+
+check_production_synced() runs every time and a full comparison
+reads and hashes every cert/key/tlsa file in both certs and
+production. Instead, each time they are known to be in sync (after
+copy to production or a full comparison), we save the content hash
+of each file and its (inode, size, mtime) in both places.
+
+If every file still has the same stat as in the manifest, production
+is in sync. Where a stat differs, the content hash of that side is
+compared with the other (from the manifest if that side is unchanged).
+Only if contents differ (or missing / bad manifest) do we fall back to
+the full comparison.
+
+After a copy of only some services, only their entries are refreshed -
+the rest keep what was last verified.
+
+The manifest is signed (hmac-sha256). The key is kept next to it,
+so this only catches accidental edits or a damaged file - it is no
+protection against anyone able to write there. The directory is
+private to ssl-mgr (mode 0700).
+
+  <top_dir>/.prod-manifest/manifest.toml
+  <top_dir>/.prod-manifest/key
+"""
+from typing import Any
+import os
+import hashlib
+import hmac
+import secrets
+
+from ssl_mgr.utils import (read_toml_file, dict_to_toml_string)
+from ssl_mgr.utils import (write_path_atomic, read_file)
+from ssl_mgr.utils import Log
+
+type PathSig = list[int]
+
+
+def _manifest_dir(top_dir: str) -> str:
+    return os.path.join(top_dir, '.prod-manifest')
+
+
+def _path_sig(path: str) -> PathSig:
+    """
+    file -> [inode, size, mtime_ns]
+    dir  -> [1]
+    none -> []
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return []
+    if os.path.isdir(path):
+        return [1]
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _file_hash(path: str) -> str:
+    """
+    sha256 hex of file or empty if not a file
+    """
+    if not os.path.isfile(path):
+        return ''
+    try:
+        with open(path, 'rb') as fobj:
+            return hashlib.sha256(fobj.read()).hexdigest()
+    except OSError:
+        return ''
+
+
+def _sign_key(top_dir: str) -> bytes:
+    """
+    Key used to sign manifest - made first time
+    """
+    mdir = _manifest_dir(top_dir)
+    key = read_file(mdir, 'key').strip()
+    if not key:
+        try:
+            os.makedirs(mdir, mode=0o700, exist_ok=True)
+        except OSError:
+            return b''
+        key = secrets.token_hex(32)
+        key_path = os.path.join(mdir, 'key')
+        if not write_path_atomic(f'{key}\n', key_path):
+            return b''
+        os.chmod(key_path, 0o600)
+    return key.encode()
+
+
+def _signature(key: bytes, files: dict[str, Any]) -> str:
+    """
+    hmac of files table
+    """
+    data = dict_to_toml_string({'files': files})
+    return hmac.new(key, data.encode(), hashlib.sha256).hexdigest()
+
+
+def _file_entry(cert_dir: str, prod_dir: str, rel_path: str) -> dict[str, Any]:
+    """
+    Manifest entry of one path - now
+    """
+    src_path = os.path.join(cert_dir, rel_path)
+    return {'src': _path_sig(src_path),
+            'prod': _path_sig(os.path.join(prod_dir, rel_path)),
+            'hash': _file_hash(src_path),
+            }
+
+
+def _in_paths(rel_path: str, prefixes: list[str]) -> bool:
+    """
+    rel_path is one of prefixes or below one ending in '/'
+    """
+    for prefix in prefixes:
+        if rel_path == prefix.rstrip('/'):
+            return True
+        if prefix.endswith('/') and rel_path.startswith(prefix):
+            return True
+    return False
+
+
+def _read_manifest(top_dir: str, cert_dir: str, prod_dir: str
+                   ) -> dict[str, Any] | None:
+    """
+    Manifest files table if valid for these dirs else None
+    """
+    logsv = Log().logsv
+
+    path = os.path.join(_manifest_dir(top_dir), 'manifest.toml')
+    manifest = read_toml_file(path)
+    if not manifest:
+        logsv('  No production manifest')
+        return None
+
+    files = manifest.get('files', {})
+    key = _sign_key(top_dir)
+    if not (key and hmac.compare_digest(manifest.get('sig', ''),
+                                        _signature(key, files))):
+        logsv('  Production manifest signature mismatch')
+        return None
+
+    if (manifest.get('cert_dir') != cert_dir
+            or manifest.get('prod_dir') != prod_dir):
+        logsv('  Production manifest is for different dirs')
+        return None
+    return files
+
+
+def _write_manifest(top_dir: str, cert_dir: str, prod_dir: str,
+                    files: dict[str, Any]) -> bool:
+    """
+    Sign and save
+    """
+    key = _sign_key(top_dir)
+    if not key:
+        return False
+
+    manifest = {'cert_dir': cert_dir,
+                'prod_dir': prod_dir,
+                'sig': _signature(key, files),
+                'files': files,
+                }
+    path = os.path.join(_manifest_dir(top_dir), 'manifest.toml')
+    return write_path_atomic(dict_to_toml_string(manifest), path)
+
+
+def write_prod_manifest(top_dir: str, cert_dir: str, prod_dir: str,
+                        rel_paths: list[str],
+                        copied: list[str] | None = None) -> bool:
+    """
+    Save manifest of rel_paths.
+     - copied None: call only when all rel_paths known in sync
+       (full compare or full copy).
+     - copied given (paths/prefixes just copied to production):
+       only those entries are refreshed, the others are kept from
+       the current manifest. If that has no entry for any of the
+       others nothing is saved (next check does full compare).
+    """
+    old_files: dict[str, Any] = {}
+    if copied is not None:
+        old_files = _read_manifest(top_dir, cert_dir, prod_dir) or {}
+
+    files: dict[str, Any] = {}
+    for rel_path in sorted(rel_paths):
+        if copied is None or _in_paths(rel_path, copied):
+            files[rel_path] = _file_entry(cert_dir, prod_dir, rel_path)
+        elif rel_path in old_files:
+            files[rel_path] = old_files[rel_path]
+        else:
+            Log().logsv(f'  Production manifest not updated: {rel_path} unverified')
+            return True
+
+    return _write_manifest(top_dir, cert_dir, prod_dir, files)
+
+
+def _side_hash(item: dict[str, Any], which: str, sig: PathSig,
+               path: str) -> str:
+    """
+    Content hash of one side (src or prod) - from manifest if
+    its stat is unchanged (src and prod were same content then).
+    """
+    if sig == item.get(which):
+        return item.get('hash', '')
+    return _file_hash(path)
+
+
+def _same_entry(cert_dir: str, prod_dir: str, rel_path: str,
+                item: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Manifest entry for file if unchanged (item) or same content
+    in certs and production (refreshed entry) - None if changed.
+    """
+    src_path = os.path.join(cert_dir, rel_path)
+    prod_path = os.path.join(prod_dir, rel_path)
+    src_sig = _path_sig(src_path)
+    prod_sig = _path_sig(prod_path)
+    if src_sig == item.get('src') and prod_sig == item.get('prod'):
+        return item
+
+    # stat changed - same content ?
+    if bool(src_sig) != bool(prod_sig) or (src_sig == [1]) != (prod_sig == [1]):
+        return None
+    src_hash = _side_hash(item, 'src', src_sig, src_path)
+    prod_hash = _side_hash(item, 'prod', prod_sig, prod_path)
+    if src_hash != prod_hash:
+        return None
+    return {'src': src_sig, 'prod': prod_sig, 'hash': src_hash}
+
+
+def prod_manifest_matches(top_dir: str, cert_dir: str, prod_dir: str,
+                          rel_paths: list[str], save: bool = True) -> bool:
+    """
+    True if manifest is valid and every file in certs and production
+    is either unchanged since it was saved or has same content
+    (sha256) in both.
+    Entries found same by content are refreshed (saved if save).
+    """
+    logsv = Log().logsv
+
+    files = _read_manifest(top_dir, cert_dir, prod_dir)
+    if files is None:
+        return False
+
+    if sorted(files) != sorted(rel_paths):
+        logsv('  Production manifest is for different groups')
+        return False
+
+    refreshed = False
+    for (rel_path, item) in files.items():
+        entry = _same_entry(cert_dir, prod_dir, rel_path, item)
+        if entry is None:
+            logsv(f'  Production manifest changed: {rel_path}')
+            return False
+        if entry is not item:
+            files[rel_path] = entry
+            refreshed = True
+
+    if refreshed and save and not _write_manifest(top_dir, cert_dir, prod_dir, files):
+        logsv('  Warning: failed to refresh production manifest')
+    return True
@@ -0,0 +1,184 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Copy production certs to remote servers.
+ - everything or only the changed paths (rsync --files-from)
+ - up to prod_copy_jobs hosts at a time
+ - each rsync limited by prod_copy_timeout (secs without progress)
+ - failed copies retried up to prod_copy_retries times
+ - changed files renamed into place together at end (--delay-updates)
+ - summary of every host at end
+"""
+# pylint: disable=too-few-public-methods
+from dataclasses import dataclass
+import os
+import time
+
+from pyconcurrent import run_prog
+
+from ssl_mgr.utils import Log
+from ssl_mgr.utils import SshMux
+from ssl_mgr.utils import write_path_atomic
+
+from .ssl_mgr_data import SslMgrData
+
+
+@dataclass
+class CopyResult:
+    """
+    Result of copy to one host
+    """
+    host: str
+    okay: bool = False
+    skipped: bool = False
+    tries: int = 0
+    secs: float = 0.0
+
+
+def _rsync_args(ssl_mgr: SslMgrData, host: str, files_from: str
+                ) -> list[str]:
+    """
+    rsync prod_cert_dir to same dir on host
+     - files_from, if set, is file listing paths to copy
+    """
+    opts = ssl_mgr.opts
+    cert_dir = f'{opts.prod_cert_dir}/'
+    remote_cert_dir = f'{host}:{cert_dir}'
+
+    timeout = opts.prod_copy_timeout
+    pargs = ['/usr/bin/rsync']
+    ssh_args: list[str] = []
+    if timeout > 0:
+        pargs += [f'--timeout={timeout}']
+        ssh_args = ['-o', f'ConnectTimeout={timeout}']
+    pargs += ['-e', SshMux.rsync_rsh(host, ssh_args)]
+    # --delay-updates: changed files are put in place together at the end
+    pargs += ['-a', '--delete', '--delay-updates', '--mkpath']
+    if files_from:
+        # --files-from turns off recursion implied by -a
+        pargs += ['-r', f'--files-from={files_from}']
+    pargs += [cert_dir, remote_cert_dir]
+    return pargs
+
+
+def _copy_one_host(ssl_mgr: SslMgrData, host: str, files_from: str
+                   ) -> CopyResult:
+    """
+    Copy to host with retries.
+    """
+    logger = Log()
+    logs = logger.logs
+
+    opts = ssl_mgr.opts
+    result = CopyResult(host)
+    start = time.monotonic()
+
+    if host in (ssl_mgr.this_host, ssl_mgr.this_fqdn):
+        # skip as already copied to myself (local) host
+        result.okay = True
+        result.skipped = True
+        return result
+
+    #
+    # Cannot copy remote if cert_dir not absolute path:
+    #
+    if opts.prod_cert_dir[0] == '.':
+        logs(f'  Error: remote copy must be absolute path : {opts.prod_cert_dir}')
+        return result
+
+    pargs = _rsync_args(ssl_mgr, host, files_from)
+    if opts.debug:
+        logs(f'  debug: {pargs}')
+        result.okay = True
+        return result
+
+    max_tries = 1 + max(opts.prod_copy_retries, 0)
+    while result.tries < max_tries:
+        if result.tries > 0:
+            wait = opts.prod_copy_retry_wait * result.tries
+            logs(f'  Retry {result.tries} copy to {host} in {wait} secs')
+            time.sleep(wait)
+
+        result.tries += 1
+        logs(f'  Copying certs to remote {host}')
+        (retc, _sout, _serr) = run_prog(pargs, test=opts.debug, verb=True)
+        if retc == 0:
+            result.okay = True
+            break
+        logs(f'Error: copying certs to {host}:{opts.prod_cert_dir}/')
+
+    result.secs = time.monotonic() - start
+    return result
+
+
+def _report(results: list[CopyResult], secs: float):
+    """
+    Summary of all remote copies
+    """
+    logger = Log()
+    logs = logger.logs
+    logsv = logger.logsv
+
+    copied = [res for res in results if not res.skipped]
+    if not copied:
+        return
+
+    num_fail = len([res for res in copied if not res.okay])
+    num_ok = len(copied) - num_fail
+    logs(f'  Remote copy: {num_ok} ok, {num_fail} failed : {secs:.1f} secs')
+
+    for res in copied:
+        status = 'ok' if res.okay else 'FAILED'
+        txt = f'{res.host:>30s} {status:>6s} tries {res.tries} {res.secs:6.1f} secs'
+        if res.okay:
+            logsv(f'    {txt}')
+        else:
+            logs(f'    {txt}')
+
+
+def _write_files_from(ssl_mgr: SslMgrData, paths: list[str]) -> str:
+    """
+    Save paths for rsync --files-from.
+    Returns the file or empty string on error
+    """
+    fpath = os.path.join(ssl_mgr.opts.top_dir, '.cache', 'prod-files-from')
+    data = '\n'.join(paths) + '\n'
+    if not write_path_atomic(data, fpath):
+        return ''
+    return fpath
+
+
+def copy_to_remotes(ssl_mgr: SslMgrData, hosts: list[str],
+                    paths: list[str] | None = None) -> bool:
+    """
+    Copy production certs to each host - in parallel.
+    Each host should be listed once.
+    If paths given (relative to prod_cert_dir) only copy those.
+    Returns True only if every copy worked.
+    """
+    if not hosts:
+        return True
+
+    files_from = ''
+    if paths:
+        files_from = _write_files_from(ssl_mgr, paths)
+        if not files_from:
+            Log().logs('Error: failed saving changed paths - copying all')
+
+    jobs = max(min(ssl_mgr.opts.prod_copy_jobs, len(hosts)), 1)
+    start = time.monotonic()
+
+    results: list[CopyResult] = []
+    if jobs == 1:
+        for host in hosts:
+            results.append(_copy_one_host(ssl_mgr, host, files_from))
+    else:
+        # log output in host order
+        futures = Log().map_buffered(_copy_one_host,
+                                     [(ssl_mgr, host, files_from)
+                                      for host in hosts],
+                                     jobs)
+        results = [future.result() for future in futures]
+
+    _report(results, time.monotonic() - start)
+    return all(res.okay for res in results)
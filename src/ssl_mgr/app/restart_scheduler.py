@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Run non-DNS server restarts concurrently.
+ - up to restart_jobs hosts at a time (all server classes together)
+ - each server class runs independently of the others
+ - a host is only restarted by one class at a time
+ - rolling restarts: if class has restart_batch > 0, hosts are
+   restarted restart_batch at a time, next batch only after the
+   previous batch finished. If any host in a batch fails,
+   the rest of that class is skipped (treated as failed).
+ - log output is kept in class then host order.
+"""
+# pylint: disable=too-few-public-methods
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from ssl_mgr.utils import Log
+
+
+@dataclass
+class RestartTask:
+    """
+    Restart of one host
+    """
+    stype: str
+    host: str
+    num_fails: int = 0
+    skipped: bool = False
+    out: list = field(default_factory=list)
+
+
+@dataclass
+class RestartClass:
+    """
+    Restarts for one server class (smtp, imap ...)
+    """
+    stype: str
+    batch: int
+    tasks: list[RestartTask] = field(default_factory=list)
+
+    def batches(self) -> list[list[RestartTask]]:
+        """
+        Tasks split in rolling batches (1 batch if not rolling)
+        """
+        if self.batch < 1:
+            return [self.tasks]
+        size = self.batch
+        return [self.tasks[idx:idx+size]
+                for idx in range(0, len(self.tasks), size)]
+
+
+type RestartFunc = Callable[[RestartTask], int]
+
+
+class RestartScheduler:
+    """
+    Schedule restarts of all hosts of all classes.
+     restart_func(task) does the restart and returns number of fails.
+    """
+    def __init__(self, jobs: int, restart_func: RestartFunc):
+        self.jobs: int = max(jobs, 1)
+        self.restart_func: RestartFunc = restart_func
+        self.classes: list[RestartClass] = []
+        self._host_locks: dict[str, threading.Lock] = {}
+
+    def add_class(self, stype: str, hosts: list[str], batch: int = 0):
+        """
+        Add server class with its hosts
+        """
+        rclass = RestartClass(stype, batch)
+        rclass.tasks = [RestartTask(stype, host) for host in hosts]
+        self.classes.append(rclass)
+        for host in hosts:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.Lock()
+
+    def _restart(self, task: RestartTask):
+        """
+        Restart one host - one class at a time per host
+        """
+        with self._host_locks[task.host]:
+            Log().logs(f'    {task.stype} {task.host}')
+            task.num_fails = self.restart_func(task)
+
+    def _run_task(self, task: RestartTask):
+        """
+        Pool worker - log output kept in task.out
+        """
+        Log().run_buffered(task.out, self._restart, task)
+
+    def _run_class(self, rclass: RestartClass, pool: ThreadPoolExecutor):
+        """
+        Each batch submitted to pool and waited on before the next one.
+        """
+        batches = rclass.batches()
+        for (num, batch) in enumerate(batches):
+            futures = [pool.submit(self._run_task, task) for task in batch]
+            for future in futures:
+                future.result()
+
+            failed = any(task.num_fails > 0 for task in batch)
+            if failed and num + 1 < len(batches):
+                for later in batches[num+1:]:
+                    for task in later:
+                        task.skipped = True
+                break
+
+    def run(self) -> list[RestartTask]:
+        """
+        Do all the restarts.
+        Returns every task (class then host order).
+        """
+        logger = Log()
+        logs = logger.logs
+
+        tasks = [task for rclass in self.classes for task in rclass.tasks]
+        if not tasks:
+            return tasks
+
+        if self.jobs == 1:
+            for rclass in self.classes:
+                self._run_class_serial(rclass)
+        else:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool, \
+                 ThreadPoolExecutor(max_workers=len(self.classes)) as drivers:
+                futures = [drivers.submit(self._run_class, rclass, pool)
+                           for rclass in self.classes]
+                for future in futures:
+                    future.result()
+
+        for task in tasks:
+            if task.skipped:
+                logs(f'    {task.stype} {task.host} : skipped (earlier batch failed)')
+            else:
+                logger.buffer_replay(task.out)
+        return tasks
+
+    def _run_class_serial(self, rclass: RestartClass):
+        """
+        One host at a time, output logged as we go
+        """
+        logs = Log().logs
+        failed = False
+        for batch in rclass.batches():
+            for task in batch:
+                if failed:
+                    task.skipped = True
+                    continue
+                logs(f'    {task.stype} {task.host}')
+                task.num_fails = self.restart_func(task)
+            if rclass.batch > 0 and any(task.num_fails > 0 for task in batch):
+                failed = True
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Run the group (ca or apex domain) tasks.
+ - Groups can spend minutes waiting on certbot / dns propagation
+   so they may be run in parallel (max_parallel_groups / --jobs).
+ - ca group(s) run first on their own, as other groups
+   may be signed by them.
+"""
+from concurrent.futures import (ThreadPoolExecutor, Future, as_completed)
+
+from ssl_mgr.utils import Log
+from ssl_mgr.groups import SslGroup
+
+from .ssl_mgr_data import SslMgrData
+
+
+def _run_one_group(group: SslGroup) -> bool:
+    """
+    Worker: run one group's tasks.
+    Log output is held and written as one block when done.
+    """
+    logger = Log()
+    logger.buffer_start()
+    try:
+        okay = group.do_tasks()
+    finally:
+        logger.buffer_flush()
+    return okay
+
+
+def _run_serial(ssl_mgr: SslMgrData, grp_names: list[str]) -> bool:
+    """
+    One group at a time - stop on first failure
+    """
+    logger = Log()
+    logs = logger.logs
+
+    for grp_name in grp_names:
+        if not ssl_mgr.groups[grp_name].do_tasks():
+            logs(f' Errors with {grp_name}')
+            return False
+    return True
+
+
+def _run_parallel(ssl_mgr: SslMgrData, grp_names: list[str], jobs: int
+                  ) -> bool:
+    """
+    Run groups using pool of jobs workers.
+    On first failure any groups not yet started are cancelled
+    and we wait for those already running to finish.
+    """
+    logger = Log()
+    logs = logger.logs
+
+    okay = True
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures: dict[Future, str] = {}
+        for grp_name in grp_names:
+            group = ssl_mgr.groups[grp_name]
+            futures[pool.submit(_run_one_group, group)] = grp_name
+
+        for future in as_completed(futures):
+            grp_name = futures[future]
+            if future.cancelled():
+                continue
+
+            exc = future.exception()
+            if exc is None and future.result():
+                continue
+
+            if exc is not None:
+                logs(f' Errors with {grp_name}: {exc}')
+            else:
+                logs(f' Errors with {grp_name}')
+
+            if okay:
+                okay = False
+                for fut in futures:
+                    fut.cancel()
+    return okay
+
+
+def run_group_tasks(ssl_mgr: SslMgrData) -> bool:
+    """
+    Each group executes its tasks.
+
+    Any group failure => return False (fail fast).
+    On success every group change is added to ssl_mgr.changes
+    in group order, so later phases (certs to production,
+    server restarts) see same order as a serial run.
+    """
+    grp_names = list(ssl_mgr.groups)
+    jobs = ssl_mgr.opts.max_parallel_groups
+    if not jobs or jobs < 1:
+        jobs = 1
+
+    ca_names = [name for name in grp_names if name.lower() == 'ca']
+    other_names = [name for name in grp_names if name.lower() != 'ca']
+
+    if jobs == 1 or len(other_names) < 2:
+        okay = _run_serial(ssl_mgr, grp_names)
+    else:
+        logger = Log()
+        logger.logsv(f' Running groups with {jobs} parallel jobs')
+        okay = _run_serial(ssl_mgr, ca_names)
+        if okay:
+            okay = _run_parallel(ssl_mgr, other_names, jobs)
+
+    if not okay:
+        ssl_mgr.okay = False
+        return False
+
+    # keep any changes
+    for grp_name in grp_names:
+        ssl_mgr.changes.add_group_change(grp_name,
+                                         ssl_mgr.groups[grp_name].change)
+    return True
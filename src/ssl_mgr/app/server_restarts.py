@@ -8,11 +8,13 @@ Restart servers after cert update
 from pyconcurrent import run_prog
 
 from ssl_mgr.utils import Log
+from ssl_mgr.utils import SshMux
 from ssl_mgr.dns_base import dns_restart
 from ssl_mgr.config import (ConfServ, ConfDns, ConfSvcDep)
 from ssl_mgr.groups import (GroupChange, GroupChanges)
 
 from .ssl_mgr_data import SslMgrData
+from .restart_scheduler import (RestartScheduler, RestartTask)
 
 
 def _check_svc_deps(group_change: GroupChange,
@@ -134,7 +136,7 @@ def _do_one_restart(ssl_mgr: SslMgrData,
 
         pargs: list[str] = []
         if host:
-            pargs = ['/usr/bin/ssh', host]
+            pargs = SshMux.ssh(host)
 
         pargs += this_cmd
         if ssl_mgr.opts.debug:
@@ -149,81 +151,71 @@ def _do_one_restart(ssl_mgr: SslMgrData,
     return num_fails
 
 
-def _restart_server(ssl_mgr: SslMgrData,
-                    server: ConfDns | ConfServ
-                    ) -> tuple[bool, int, int]:
+def _restart_host(ssl_mgr: SslMgrData, server: ConfServ,
+                  task: RestartTask) -> int:
     """
-    Run restart command on host (local or remote)
-    Return (num_fails, num_total)
+    Run restart command on task host (local or remote)
+    Returns number of failed commands.
     The restart command can be 1 item or a list of items to run.
     """
     logger = Log()
-    logs = logger.logs
     log = logger.log
 
-    restart_needed = _check_restart_needed(ssl_mgr, server)
-    if not restart_needed:
-        return (True, 0, 0)
-
-    if not server.restart_cmd:
-        return (True, 0, 0)
-
     #
-    # NB if restart has more than 1 command,
-    # a failure of any of themn counts as a fail.
+    # Use ssh if remote otherwise run cmd locally
     #
-    num_fails_tot = 0
-    num_restarts_tot = 0
-    okay = True
-    for host in server.servers:
-        logs(f'    {host}')
-        num_restarts_tot += 1
-
-        #
-        # Use ssh if remote otherwise run cmd locally
-        #
-        remote = None
-        if host not in (ssl_mgr.this_host, ssl_mgr.this_fqdn):
-            remote = host
-
-        num_fails = _do_one_restart(ssl_mgr, server.restart_cmd, host=remote)
-
-        if num_fails > 0:
-            okay = False
-            num_fails_tot += 1
-            log(f'     Restart: {server.restart_cmd} had {num_fails} fails')
+    remote = None
+    if task.host not in (ssl_mgr.this_host, ssl_mgr.this_fqdn):
+        remote = task.host
 
-    return (okay, num_fails_tot, num_restarts_tot)
+    num_fails = _do_one_restart(ssl_mgr, server.restart_cmd, host=remote)
+    if num_fails > 0:
+        log(f'     Restart: {server.restart_cmd} had {num_fails} fails')
+    return num_fails
 
 
 def server_restarts_non_dns(ssl_mgr: SslMgrData) -> bool:
     """
     Restart any non-DNS servers requested in ssl-mgr.conf
+     - hosts are restarted concurrently (see RestartScheduler)
      If one server fails to be restarted we continue
     """
     logger = Log()
     logs = logger.logs
 
-    okay = True
-    num_fails = 0
-    total = 0
+    servers: dict[str, ConfServ] = {}
+
+    def restart_func(task: RestartTask) -> int:
+        return _restart_host(ssl_mgr, servers[task.stype], task)
+
+    scheduler = RestartScheduler(ssl_mgr.opts.restart_jobs, restart_func)
+
     server_types = ('smtp', 'imap', 'web', 'other')
     for stype in server_types:
         server = getattr(ssl_mgr.opts, stype)
-        if not server:
+        if not server or not server.restart_cmd:
             continue
 
-        logs(f'  {stype}: ')
-        (isokay, fails, tots) = _restart_server(ssl_mgr, server)
-        num_fails += fails
-        total += tots
-        if not isokay:
-            okay = False
+        if not _check_restart_needed(ssl_mgr, server):
+            continue
 
-    if not okay or num_fails > 0:
-        logs(f'   Error Server restarts: {num_fails} out of {total} failed')
+        #
+        # NB if restart has more than 1 command,
+        # a failure of any of them counts as a fail.
+        #
+        logs(f'  {stype}: {len(server.servers)} hosts')
+        servers[stype] = server
+        scheduler.add_class(stype, server.servers, server.restart_batch)
 
-    return okay
+    tasks = scheduler.run()
+    total = len(tasks)
+    num_fails = len([task for task in tasks
+                     if task.num_fails > 0 or task.skipped])
+
+    if num_fails > 0:
+        logs(f'   Error Server restarts: {num_fails} out of {total} failed')
+        return False
+    return True
 
 
 def server_restarts_dns(ssl_mgr: SslMgrData) -> bool:
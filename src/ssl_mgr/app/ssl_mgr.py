@@ -12,12 +12,21 @@ import os
 from ssl_mgr.utils import Log
 from ssl_mgr.utils import write_path_atomic
 from ssl_mgr.utils import current_date_time_str
+from ssl_mgr.utils import SshMux
+from ssl_mgr.cbot import acme_dns_batch_flush
+from ssl_mgr.cbot import AcmeSession
+from ssl_mgr.cbot import AuthHookServer
+from ssl_mgr.crypto_base import X509Cache
+from ssl_mgr.services import SvcState
+from ssl_mgr.compare import HashMemo
 
 from .ssl_mgr_data import SslMgrData
 from .clean import cleanup
 from .certs_to_prod import certs_to_production
 from .server_restarts import server_restarts
 from .check_production_synced import check_production_synced
+from .run_groups import run_group_tasks
+from .ns_status import ns_stats_status
 
 
 class SslMgr(SslMgrData):
@@ -28,11 +37,60 @@ class SslMgr(SslMgrData):
         """
         Run whatever been tasked to do
         """
-        _check_production_synced(self)
-        okay = _execute_tasks(self)
+        HashMemo.initialize(self.opts.top_dir)
+        SshMux.initialize(self.opts.top_dir, self.opts.ssh_control_persist)
+        hook_server: AuthHookServer | None = None
+        if _hook_server_needed(self):
+            hook_server = AuthHookServer(self.opts)
+            hook_server.start()
+        try:
+            _check_production_synced(self)
+            okay = _execute_tasks(self)
+        finally:
+            if hook_server:
+                hook_server.stop()
+            SshMux.close_all()
+            AcmeSession.close_all()
+        HashMemo.save()
+        _ssh_stats()
         return okay
 
 
+def _hook_server_needed(ssl_mgr: SslMgrData) -> bool:
+    """
+    Auth hooks are only run by certbot engine signings
+    (renew or new cert) - native engine needs no hooks.
+    """
+    if not ssl_mgr.opts.auth_hook_server:
+        return False
+
+    for group in ssl_mgr.groups.values():
+        tasks = group.task_mgr.tasks
+        if not (tasks.renew_cert or tasks.new_cert):
+            continue
+        for svc in group.services:
+            if not svc.ca_certbot:
+                continue
+            engine = svc.ca_certbot.ca_info.ca_acme_engine or 'certbot'
+            if engine != 'native':
+                return True
+    return False
+
+
+def _ssh_stats():
+    """
+    Log shared ssh connection use
+    """
+    logsv = Log().logsv
+    stats = SshMux.stats()
+    if not stats:
+        return
+
+    logsv(f'  ssh connections: {SshMux.stats_str()}')
+    for (host, uses, reused) in stats:
+        logsv(f'    {host:>30s} uses {uses:3d} reused {reused:3d}')
+
+
 def _check_production_synced(mgr: SslMgr) -> bool:
     """
     Check produciton is up to date.
@@ -96,19 +154,26 @@ def _execute_tasks(ssl_mgr: SslMgr):
     #
     # Each group executes its tasks
     #
+    # Groups may run in parallel (see max_parallel_groups)
+    #
     logs('Start group/domain tasks :', opt='ldash')
-    for (grp_name, group) in ssl_mgr.groups.items():
-        if not group.do_tasks():
-            logs(f' Errors with {grp_name}')
-            ssl_mgr.okay = False
-            return False
+    groups_okay = run_group_tasks(ssl_mgr)
+
+    #
+    # acme dns-01 cleanups defer their dns restart - do it once here
+    #
+    acme_dns_batch_flush(ssl_mgr.opts)
+    if not groups_okay:
+        return False
 
-        # keep any changes
-        ssl_mgr.changes.add_group_change(grp_name, group.change)
+    if ssl_mgr.opts.status:
+        ns_stats_status(ssl_mgr)
 
     logs('')
     logs('Done group tasks:')
     logs('', opt='ldash')
+    logsv(f'  x509 parse cache: {X509Cache.stats_str()}')
+    logsv(f'  service state: {SvcState.stats_str()}')
     #
     # Tasks for app level:
     # Order is important
@@ -122,9 +187,8 @@ def _execute_tasks(ssl_mgr: SslMgr):
     #   - If dns changed (tlsa records)
     #       - resign zones push to primary
     #
-    # - Copy (all) certs to prod if any changed
-    #   We assume nothing has messed up the unchanged ones
-    # Should we change to only copy changed ones?
+    # - Copy changed certs to prod (all if requested)
+    #   Production was checked at start so the unchanged ones are in sync
     #
 
     if not certs_to_production(ssl_mgr):
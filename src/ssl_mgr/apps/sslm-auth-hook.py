@@ -42,14 +42,21 @@ Config files:
 These provide info needed to use http-01 and dns-01 validation
 Info includes server names and, if needed, how to restart
 web server and push dns out
+
+When run by sslm-mgr, the work is done by its auth hook server
+(ssl_mgr/cbot/auth_hook_server.py) - we just pass along our
+arguments and the CERTBOT_* variables. Only if that's not available
+do we load ssl_mgr and do it here.
 """
 # pylint: disable=invalid-name
 # pylint: disable=R0801
+import json
 import os
+import socket
 import sys
 
-from ssl_mgr.cbot import CertbotHook
-from ssl_mgr.config import SslOpts
+# keep in sync with auth_hook_server.SOCKET_ENV
+_SOCKET_ENV = 'SSLM_AUTH_HOOK_SOCKET'
 
 
 def _group_service() -> tuple[str, str, str, bool]:
@@ -72,12 +79,48 @@ def _group_service() -> tuple[str, str, str, bool]:
     return (prog, group, service, debug)
 
 
+def _via_server() -> bool | None:
+    """
+    Send request to sslm-mgr auth hook server.
+    Returns None if no server, otherwise if it worked.
+    """
+    sock_path = os.getenv(_SOCKET_ENV)
+    if not sock_path:
+        return None
+
+    env = {key: val for (key, val) in os.environ.items()
+           if key.startswith('CERTBOT_')}
+    request = {'args': sys.argv[1:], 'env': env}
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(sock_path)
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            with sock.makefile('rb') as fobj:
+                reply = json.loads(fobj.readline())
+    except (OSError, ValueError):
+        return None
+
+    if not reply.get('okay'):
+        print(f'auth hook failed: {reply.get("error")}', file=sys.stderr)
+        return False
+    return True
+
+
 def main():
     """
     Certificate manager
      - does http / dns based on application name
        cb-auth-http or cb-auth-dns
     """
+    # pylint: disable=import-outside-toplevel
+    served = _via_server()
+    if served is not None:
+        sys.exit(0 if served else 1)
+
+    from ssl_mgr.cbot import CertbotHook
+    from ssl_mgr.config import SslOpts
+
     (_prog, group, service, deb) = _group_service()
     # special options
     opts = SslOpts(called_from_certbot=True)
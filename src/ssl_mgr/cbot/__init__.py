@@ -5,3 +5,7 @@ Certbot Class
 """
 from .certbot import (Certbot, CertbotHook)
 from .sign_cert_wrap import sign_cert_wrap
+from .auth_push_dns import acme_dns_batch_flush
+from .acme_engine import (ACME_ENGINES, acme_engine)
+from .acme_client import AcmeSession
+from .auth_hook_server import AuthHookServer
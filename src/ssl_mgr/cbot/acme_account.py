@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+ACME account for the in process client (acme_engine = 'native').
+
+Saved in <cb_dir>/acme/<acme server>/
+    account-key.pem
+    account.toml         kid (account url)
+
+If there is none yet, an existing certbot account of the same
+server (<cb_dir>/accounts/...) is used, otherwise a new
+account is registered.
+"""
+import json
+import os
+from urllib.parse import urlsplit
+
+from ssl_mgr.utils import (dir_list, read_file, write_path_atomic)
+from ssl_mgr.utils import (read_toml_file, dict_to_toml_string)
+from ssl_mgr.utils import Log
+
+from .acme_jws import (AcctKey, new_acct_key, acct_key_to_pem,
+                       acct_key_from_pem, acct_key_from_jwk)
+from .acme_client import (AcmeSession, AcmeAccount)
+
+
+def _server_name(directory_url: str) -> str:
+    """
+    acme server as dir name: host[_port]
+    """
+    return urlsplit(directory_url).netloc.replace(':', '_')
+
+
+def _certbot_account(cb_dir: str, directory_url: str
+                     ) -> tuple[AcctKey | None, str]:
+    """
+    Key and url of certbot account for directory_url (if any)
+    """
+    parts = urlsplit(directory_url)
+    acct_dir = os.path.join(cb_dir, 'accounts', parts.netloc,
+                            parts.path.strip('/'))
+
+    (_files, fp_dirs, _links) = dir_list(acct_dir, path_type='path')
+    for fp_dir in fp_dirs:
+        try:
+            jwk = json.loads(read_file(fp_dir, 'private_key.json') or '{}')
+            regr = json.loads(read_file(fp_dir, 'regr.json') or '{}')
+        except ValueError:
+            continue
+
+        key = acct_key_from_jwk(jwk)
+        if key:
+            return (key, regr.get('uri', ''))
+    return (None, '')
+
+
+def _save_account(acct_dir: str, acct: AcmeAccount) -> bool:
+    key_path = os.path.join(acct_dir, 'account-key.pem')
+    data_path = os.path.join(acct_dir, 'account.toml')
+    try:
+        os.makedirs(acct_dir, mode=0o700, exist_ok=True)
+    except OSError:
+        return False
+
+    logs = Log().logs
+    if not write_path_atomic(acct_key_to_pem(acct.key).decode(), key_path,
+                             log=logs):
+        return False
+    os.chmod(key_path, 0o600)
+
+    data = {'kid': acct.kid, 'directory': acct.session.directory_url}
+    return write_path_atomic(dict_to_toml_string(data), data_path, log=logs)
+
+
+def acme_account(cb_dir: str, session: AcmeSession, email: str
+                 ) -> AcmeAccount | None:
+    """
+    Account to use with session's server - registered if needed
+    """
+    logger = Log()
+    logs = logger.logs
+
+    acct_dir = os.path.join(cb_dir, 'acme', _server_name(session.directory_url))
+
+    #
+    # Ours
+    #
+    key_pem = read_file(acct_dir, 'account-key.pem')
+    if key_pem:
+        key = acct_key_from_pem(key_pem.encode())
+        kid = read_toml_file(os.path.join(acct_dir, 'account.toml')).get('kid', '')
+        if key and kid:
+            return AcmeAccount(session, key, kid)
+
+    #
+    # certbot's
+    #
+    (key, kid) = _certbot_account(cb_dir, session.directory_url)
+    if key:
+        acct = AcmeAccount(session, key, kid)
+        if kid or acct.register(email, only_existing=True):
+            logs(f'  Using certbot acme account {acct.kid}')
+            _save_account(acct_dir, acct)
+            return acct
+
+    #
+    # new
+    #
+    logs(f'  Registering ACME acct : {acct_dir}')
+    acct = AcmeAccount(session, new_acct_key())
+    if not acct.register(email):
+        return None
+
+    if not _save_account(acct_dir, acct):
+        logs(f'Error: saving acme account {acct_dir}')
+    return acct
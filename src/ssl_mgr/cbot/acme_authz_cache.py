@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Cache of valid ACME authorizations (native acme engine).
+
+Once an identifier (domain) is validated the CA keeps the
+authorization valid for a while (letsencrypt: 30 days) and reuses
+it for new orders of the same account. Remembering them lets a
+later cert for the same names skip fetching, publishing and
+waiting on challenges.
+
+ - keyed by account (kid) and identifier
+ - entries used only until min_left_secs before they expire
+ - saved in <top_dir>/.cache/acme-authz.toml
+"""
+# pylint: disable=too-few-public-methods
+from datetime import datetime
+from typing import Any
+import os
+import re
+import threading
+import time
+
+from ssl_mgr.utils import (read_toml_file, dict_to_toml_string)
+from ssl_mgr.utils import write_path_atomic
+
+
+def expires_to_secs(expires: str) -> int:
+    """
+    RFC 3339 time (as in authorization 'expires') to epoch secs
+    Returns 0 if can't be parsed.
+    """
+    # drop fractional secs (may have more digits than python parses)
+    expires = re.sub(r'\.\d+', '', expires or '')
+    try:
+        return int(datetime.fromisoformat(expires).timestamp())
+    except ValueError:
+        return 0
+
+
+class AcmeAuthzCache:
+    """
+    Process wide cache of valid authorizations.
+    Each entry : {'url': <authz url>, 'expires': <epoch secs>}
+    """
+    min_left_secs: int = 3600
+    _accounts: dict[str, dict[str, dict[str, Any]]] = {}
+    _path: str = ''
+    _lock = threading.Lock()
+
+    @staticmethod
+    def initialize(top_dir: str):
+        """
+        Load saved entries - once per process
+        """
+        path = os.path.join(top_dir, '.cache', 'acme-authz.toml')
+        with AcmeAuthzCache._lock:
+            if AcmeAuthzCache._path == path:
+                return
+            AcmeAuthzCache._path = path
+            saved = read_toml_file(path).get('accounts', {})
+            # toml keys are the kid urls
+            AcmeAuthzCache._accounts = saved
+
+    @staticmethod
+    def valid(kid: str, url: str) -> str:
+        """
+        Identifier of authorization url if cached as valid
+        otherwise empty string.
+        (Orders list only the authorization urls)
+        """
+        now = time.time()
+        with AcmeAuthzCache._lock:
+            for (ident, entry) in AcmeAuthzCache._accounts.get(kid, {}).items():
+                if entry.get('url') != url:
+                    continue
+                if entry.get('expires', 0) - now < AcmeAuthzCache.min_left_secs:
+                    return ''
+                return ident
+        return ''
+
+    @staticmethod
+    def put(kid: str, ident: str, url: str, expires: str):
+        """
+        Remember valid authorization
+        """
+        expires_secs = expires_to_secs(expires)
+        if not (kid and url and expires_secs):
+            return
+        with AcmeAuthzCache._lock:
+            idents = AcmeAuthzCache._accounts.setdefault(kid, {})
+            idents[ident] = {'url': url, 'expires': expires_secs}
+
+    @staticmethod
+    def drop(kid: str, idents: list[str]):
+        """
+        Forget authorizations (e.g. CA no longer has them valid)
+        """
+        with AcmeAuthzCache._lock:
+            acct = AcmeAuthzCache._accounts.get(kid, {})
+            for ident in idents:
+                acct.pop(ident, None)
+
+    @staticmethod
+    def save() -> bool:
+        """
+        Write cache - expired entries are dropped.
+        """
+        now = time.time()
+        with AcmeAuthzCache._lock:
+            if not AcmeAuthzCache._path:
+                return True
+
+            accounts: dict[str, dict[str, dict[str, Any]]] = {}
+            for (kid, idents) in AcmeAuthzCache._accounts.items():
+                live = {ident: entry for (ident, entry) in idents.items()
+                        if entry.get('expires', 0) > now}
+                if live:
+                    accounts[kid] = live
+            AcmeAuthzCache._accounts = accounts
+
+            data = dict_to_toml_string({'accounts': accounts})
+            return write_path_atomic(data, AcmeAuthzCache._path)
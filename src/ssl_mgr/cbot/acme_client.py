@@ -0,0 +1,308 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Minimal in process ACME (RFC 8555) client.
+
+AcmeSession - one per ACME directory, shared by all threads in process:
+ - keeps its https connection(s) open between requests
+ - directory and nonces fetched once and reused
+AcmeAccount - account key and its url (kid).
+"""
+# pylint: disable=too-few-public-methods
+from typing import Any
+from urllib.parse import urlsplit
+import http.client
+import json
+import ssl
+import threading
+import time
+
+from ssl_mgr.utils import Log
+
+from .acme_jws import (AcctKey, jws)
+
+
+LE_DIRECTORY = 'https://acme-v02.api.letsencrypt.org/directory'
+LE_STAGING_DIRECTORY = 'https://acme-staging-v02.api.letsencrypt.org/directory'
+
+
+class AcmeError(Exception):
+    """ ACME request failed """
+
+
+def acme_field(data: Any, name: str, kind: type = str) -> Any:
+    """
+    data[name] from a server response - must be a kind (and not
+    empty if str). Raises AcmeError if response isn't shaped as expected.
+    """
+    value = data.get(name) if isinstance(data, dict) else None
+    if not isinstance(value, kind) or (kind is str and not value):
+        raise AcmeError(f'unexpected response: {name} missing or not {kind.__name__}')
+    return value
+
+
+class AcmeResponse:
+    """
+    Response to one request
+    """
+    def __init__(self, status: int, headers: http.client.HTTPMessage,
+                 body: bytes):
+        self.status: int = status
+        self.headers: http.client.HTTPMessage = headers
+        self.body: bytes = body
+
+    def json(self) -> dict[str, Any]:
+        """ body as json (empty if not json) """
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            return {}
+        if isinstance(data, dict):
+            return data
+        return {}
+
+    def text(self) -> str:
+        """ body as text (pem) """
+        try:
+            return self.body.decode()
+        except UnicodeDecodeError as err:
+            raise AcmeError(f'unexpected response: {err}') from err
+
+    def location(self) -> str:
+        """ Location header """
+        return self.headers.get('Location', '')
+
+    def retry_after(self, default: int) -> int:
+        """ Retry-After header (secs) """
+        value = self.headers.get('Retry-After', '')
+        if value.isdigit():
+            return max(int(value), 1)
+        return default
+
+    def links(self, rel: str) -> list[str]:
+        """ Link header urls with rel """
+        urls: list[str] = []
+        for link in self.headers.get_all('Link') or []:
+            for one in link.split(','):
+                parts = one.split(';')
+                url = parts[0].strip().strip('<>')
+                for param in parts[1:]:
+                    if param.strip().replace('"', '') == f'rel={rel}':
+                        urls.append(url)
+        return urls
+
+
+class _Https:
+    """
+    Kept open https connections (one per host)
+    """
+    def __init__(self, ca_bundle: str):
+        cafile = ca_bundle if ca_bundle else None
+        self.context = ssl.create_default_context(cafile=cafile)
+        self.conns: dict[str, http.client.HTTPSConnection] = {}
+        self.num_connects: int = 0
+        self.num_requests: int = 0
+        self.timeout: int = 60
+
+    def _conn(self, netloc: str) -> http.client.HTTPSConnection:
+        conn = self.conns.get(netloc)
+        if not conn:
+            conn = http.client.HTTPSConnection(netloc, timeout=self.timeout,
+                                               context=self.context)
+            self.conns[netloc] = conn
+            self.num_connects += 1
+        return conn
+
+    def request(self, method: str, url: str, body: bytes | None = None,
+                headers: dict[str, str] | None = None) -> AcmeResponse:
+        """
+        Make request - reconnecting once if the kept connection was closed
+        """
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += f'?{parts.query}'
+
+        hdrs = {'User-Agent': 'ssl-mgr'}
+        if headers:
+            hdrs.update(headers)
+
+        self.num_requests += 1
+        for attempt in range(2):
+            conn = self._conn(parts.netloc)
+            try:
+                conn.request(method, path, body=body, headers=hdrs)
+                resp = conn.getresponse()
+                data = resp.read()
+                return AcmeResponse(resp.status, resp.headers, data)
+
+            except (http.client.HTTPException, OSError) as err:
+                conn.close()
+                del self.conns[parts.netloc]
+                if attempt > 0:
+                    raise AcmeError(f'{method} {url} : {err}') from err
+        raise AcmeError(f'{method} {url}')
+
+    def close(self):
+        """ close all connections """
+        for conn in self.conns.values():
+            conn.close()
+        self.conns = {}
+
+
+class AcmeSession:
+    """
+    One ACME server (directory url).
+    Requests are made one at a time (lock) - the waiting
+    (challenge propagation and validation) is done outside.
+    """
+    _sessions: dict[str, 'AcmeSession'] = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, directory_url: str, ca_bundle: str = ''):
+        self.directory_url: str = directory_url
+        self.directory: dict[str, Any] = {}
+        self.https = _Https(ca_bundle)
+        self.nonces: list[str] = []
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def get(directory_url: str, ca_bundle: str = '') -> 'AcmeSession':
+        """
+        Process wide session for directory_url
+        """
+        with AcmeSession._sessions_lock:
+            session = AcmeSession._sessions.get(directory_url)
+            if not session:
+                session = AcmeSession(directory_url, ca_bundle)
+                AcmeSession._sessions[directory_url] = session
+            return session
+
+    @staticmethod
+    def close_all():
+        """
+        Close every session's connections and log their use
+        """
+        logsv = Log().logsv
+        with AcmeSession._sessions_lock:
+            for session in AcmeSession._sessions.values():
+                https = session.https
+                logsv(f'  acme {session.directory_url}: {https.num_requests}'
+                      f' requests {https.num_connects} connections')
+                https.close()
+            AcmeSession._sessions = {}
+
+    def url(self, name: str) -> str:
+        """
+        Url of resource (newNonce, newAccount, newOrder ...)
+        """
+        with self.lock:
+            if not self.directory:
+                resp = self.https.request('GET', self.directory_url)
+                if resp.status != 200:
+                    raise AcmeError(f'directory {self.directory_url} : {resp.status}')
+                self.directory = resp.json()
+        url = self.directory.get(name, '')
+        if not (url and isinstance(url, str)):
+            raise AcmeError(f'directory has no {name}')
+        return url
+
+    def meta(self) -> dict[str, Any]:
+        """ directory meta """
+        self.url('newNonce')
+        meta = self.directory.get('meta', {})
+        return meta if isinstance(meta, dict) else {}
+
+    def _nonce(self) -> str:
+        if self.nonces:
+            return self.nonces.pop()
+        resp = self.https.request('HEAD', self.url('newNonce'))
+        nonce = resp.headers.get('Replay-Nonce', '')
+        if not nonce:
+            raise AcmeError('no nonce from server')
+        return nonce
+
+    def post(self, key: AcctKey, url: str, payload: Any, kid: str = '',
+             accept: str = '') -> AcmeResponse:
+        """
+        Signed POST (payload None => POST-as-GET)
+        Retried on badNonce.
+        Raises AcmeError if server returns an error
+        """
+        headers = {'Content-Type': 'application/jose+json'}
+        if accept:
+            headers['Accept'] = accept
+
+        with self.lock:
+            for _attempt in range(3):
+                body = jws(key, url, self._nonce(), payload, kid=kid)
+                resp = self.https.request('POST', url, body=body,
+                                          headers=headers)
+                nonce = resp.headers.get('Replay-Nonce', '')
+                if nonce:
+                    self.nonces.append(nonce)
+
+                if resp.status < 400:
+                    return resp
+
+                problem = resp.json()
+                if str(problem.get('type', '')).endswith(':badNonce'):
+                    continue
+                detail = problem.get('detail', resp.body[:200])
+                raise AcmeError(f'{url} : {resp.status} {detail}')
+        raise AcmeError(f'{url} : too many bad nonces')
+
+
+class AcmeAccount:
+    """
+    Account key and url (kid) on one ACME server
+    """
+    def __init__(self, session: AcmeSession, key: AcctKey, kid: str = ''):
+        self.session: AcmeSession = session
+        self.key: AcctKey = key
+        self.kid: str = kid
+
+    def post(self, url: str, payload: Any = None,
+             accept: str = '') -> AcmeResponse:
+        """
+        Signed request with account kid
+        """
+        return self.session.post(self.key, url, payload, kid=self.kid,
+                                 accept=accept)
+
+    def register(self, email: str, only_existing: bool = False) -> bool:
+        """
+        New account (or find existing one for our key).
+        Sets kid.
+        """
+        payload: dict[str, Any] = {'termsOfServiceAgreed': True}
+        if only_existing:
+            payload = {'onlyReturnExisting': True}
+        elif email:
+            payload['contact'] = [f'mailto:{email}']
+
+        try:
+            resp = self.session.post(self.key, self.session.url('newAccount'),
+                                     payload)
+        except AcmeError as err:
+            if not only_existing:
+                Log().logs(f'Error: acme account : {err}')
+            return False
+
+        self.kid = resp.location()
+        return bool(self.kid)
+
+    def poll(self, url: str, pending: tuple[str, ...], max_secs: int
+             ) -> dict[str, Any]:
+        """
+        POST-as-GET url until status not in pending or max_secs.
+        """
+        start = time.monotonic()
+        while True:
+            resp = self.post(url)
+            data = resp.json()
+            if data.get('status') not in pending:
+                return data
+            if time.monotonic() - start > max_secs:
+                return data
+            time.sleep(resp.retry_after(2))
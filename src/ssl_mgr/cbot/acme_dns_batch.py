@@ -0,0 +1,232 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Batch acme dns-01 challenges across certbot auth hooks.
+
+Each certbot (one per service) runs its own auth hook process.
+Rather than each doing its own dns zone update, dns restart and
+nameserver propagation wait, hooks leave their challenges here.
+Whichever hook gets the lock (the leader) waits briefly for
+others to arrive, then publishes all pending challenges with one
+zone update, one dns restart and one propagation wait, and marks
+each request done. Waiting hooks see their done marker and return
+to certbot.
+
+Cleanup removes a request's challenges and updates the zone include
+file but leaves the dns restart for the next publish or the
+end of run flush.
+
+<top_dir>/.acme-dns/
+    lock
+    active/<apex_domain>/<service>   challenges (domain validation rows)
+    pending/<apex_domain>.<service>  waiting to be published
+    done/<apex_domain>.<service>     ok or fail
+    restart/<apex_domain>            dns restart needed (after cleanup)
+
+Dirs are made by the first hook to use them (make_dirs), so
+runs with no dns-01 work leave nothing behind.
+"""
+# pylint: disable=too-many-instance-attributes,duplicate-code
+import os
+import fcntl
+from typing import IO
+
+from ssl_mgr.utils import (open_file, read_file, write_path_atomic)
+from ssl_mgr.utils import (make_dir_path, dir_list)
+from ssl_mgr.utils import Log
+
+
+class AcmeDnsBatch:
+    """
+    File based coordinator shared by the auth hook processes.
+    """
+    def __init__(self, top_dir: str):
+        self.batch_dir: str = os.path.join(top_dir, '.acme-dns')
+        self.active_dir: str = os.path.join(self.batch_dir, 'active')
+        self.pending_dir: str = os.path.join(self.batch_dir, 'pending')
+        self.done_dir: str = os.path.join(self.batch_dir, 'done')
+        self.restart_dir: str = os.path.join(self.batch_dir, 'restart')
+        self.lock_path: str = os.path.join(self.batch_dir, 'lock')
+        self.lock_fobj: IO | None = None
+
+    def exists(self) -> bool:
+        """
+        True if any hook has used the batch dirs
+        """
+        return os.path.isdir(self.batch_dir)
+
+    def make_dirs(self) -> bool:
+        """
+        Make the batch dirs if needed
+        """
+        for one_dir in (self.active_dir, self.pending_dir,
+                        self.done_dir, self.restart_dir):
+            if not os.path.isdir(one_dir) and not make_dir_path(one_dir):
+                Log().logs(f'Error: failed to make dir {one_dir}')
+                return False
+        return True
+
+    def lock(self, wait: bool = True) -> bool:
+        """
+        Get the batch lock.
+        If wait is False and lock is held by another return False.
+        """
+        if self.lock_fobj:
+            return True
+
+        fobj = open_file(self.lock_path, 'a')
+        if not fobj:
+            return False
+
+        flags = fcntl.LOCK_EX
+        if not wait:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(fobj, flags)
+        except OSError:
+            fobj.close()
+            return False
+
+        self.lock_fobj = fobj
+        return True
+
+    def unlock(self):
+        """
+        Release batch lock
+        """
+        if not self.lock_fobj:
+            return
+        fcntl.flock(self.lock_fobj, fcntl.LOCK_UN)
+        self.lock_fobj.close()
+        self.lock_fobj = None
+
+    def add(self, apex_domain: str, svc_name: str, rows: list[str]) -> bool:
+        """
+        Save challenges and mark them pending publication
+        """
+        req = f'{apex_domain}.{svc_name}'
+        self.clear_done(req)
+
+        data = '\n'.join(rows) + '\n'
+        active_path = os.path.join(self.active_dir, apex_domain, svc_name)
+        if not write_path_atomic(data, active_path):
+            return False
+
+        pending_path = os.path.join(self.pending_dir, req)
+        return write_path_atomic(f'{apex_domain} {svc_name}\n', pending_path)
+
+    def remove(self, apex_domain: str, svc_name: str):
+        """
+        Drop challenges (cleanup)
+        """
+        active_path = os.path.join(self.active_dir, apex_domain, svc_name)
+        if os.path.exists(active_path):
+            os.unlink(active_path)
+
+    def rows(self, apex_domain: str, svc_name: str = '') -> list[str]:
+        """
+        Challenge rows for one service or,
+        if no svc_name, all active ones for apex_domain
+        """
+        apex_dir = os.path.join(self.active_dir, apex_domain)
+        if svc_name:
+            svc_names = [svc_name]
+        else:
+            (svc_names, _dirs, _links) = dir_list(apex_dir)
+            svc_names = sorted(svc_names)
+
+        rows: list[str] = []
+        for name in svc_names:
+            if name.endswith('.tmp'):
+                continue
+            data = read_file(apex_dir, name)
+            if data:
+                rows += data.splitlines()
+        return rows
+
+    def pending(self) -> list[tuple[str, str]]:
+        """
+        Return list of (apex_domain, svc_name) waiting to be published
+        """
+        (reqs, _dirs, _links) = dir_list(self.pending_dir)
+
+        pending: list[tuple[str, str]] = []
+        for req in sorted(reqs):
+            if req.endswith('.tmp'):
+                continue
+            data = read_file(self.pending_dir, req)
+            items = data.split()
+            if len(items) == 2:
+                pending.append((items[0], items[1]))
+        return pending
+
+    def newest_pending_age(self, now: float) -> float:
+        """
+        Seconds since the most recent request arrived
+        """
+        newest = 0.0
+        with os.scandir(self.pending_dir) as scan:
+            for entry in scan:
+                try:
+                    newest = max(newest, entry.stat().st_mtime)
+                except FileNotFoundError:
+                    continue
+        return now - newest
+
+    def set_done(self, apex_domain: str, svc_name: str, okay: bool):
+        """
+        Mark published and remove from pending
+        """
+        req = f'{apex_domain}.{svc_name}'
+        result = 'ok' if okay else 'fail'
+        write_path_atomic(f'{result}\n', os.path.join(self.done_dir, req))
+
+        pending_path = os.path.join(self.pending_dir, req)
+        if os.path.exists(pending_path):
+            os.unlink(pending_path)
+
+    def cancel(self, apex_domain: str, svc_name: str):
+        """
+        Waiter gave up - drop request if not yet published
+        """
+        req = f'{apex_domain}.{svc_name}'
+        pending_path = os.path.join(self.pending_dir, req)
+        if os.path.exists(pending_path):
+            os.unlink(pending_path)
+        self.clear_done(req)
+
+    def get_done(self, apex_domain: str, svc_name: str) -> bool | None:
+        """
+        Result of publication or None if not done yet
+        """
+        req = f'{apex_domain}.{svc_name}'
+        done_path = os.path.join(self.done_dir, req)
+        if not os.path.exists(done_path):
+            return None
+        data = read_file(self.done_dir, req)
+        self.clear_done(req)
+        return data.strip() == 'ok'
+
+    def clear_done(self, req: str):
+        """
+        Remove done marker
+        """
+        done_path = os.path.join(self.done_dir, req)
+        if os.path.exists(done_path):
+            os.unlink(done_path)
+
+    def mark_restart(self, apex_domain: str):
+        """
+        Zone include was updated but dns not yet restarted.
+        """
+        write_path_atomic('', os.path.join(self.restart_dir, apex_domain))
+
+    def take_restarts(self) -> list[str]:
+        """
+        Return and clear list of apex domains needing dns restart
+        """
+        (domains, _dirs, _links) = dir_list(self.restart_dir)
+        domains = sorted(dom for dom in domains if not dom.endswith('.tmp'))
+        for domain in domains:
+            os.unlink(os.path.join(self.restart_dir, domain))
+        return domains
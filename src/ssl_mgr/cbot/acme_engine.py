@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+ACME engines used by CACertbot to get a cert signed.
+Chosen by ca-info.conf ca_acme_engine:
+ - certbot : run /usr/bin/certbot with sslm-auth-hook (default)
+ - native  : in process ACME client
+"""
+from collections.abc import Callable
+
+from ssl_mgr.utils import Log
+from ssl_mgr.crypto_csr import SslCsr
+from ssl_mgr.ca_sign import CACertbot
+
+from .certbothook_data import CertbotHookData
+from .sign_cert import certbot_sign_cert
+from .sign_cert_acme import acme_sign_cert
+
+
+type AcmeSignFunc = Callable[[CertbotHookData, CACertbot, SslCsr],
+                             tuple[bytes, bytes]]
+
+ACME_ENGINES: dict[str, AcmeSignFunc] = {
+        'certbot': certbot_sign_cert,
+        'native': acme_sign_cert,
+        }
+
+
+def acme_engine(ca_certbot: CACertbot) -> AcmeSignFunc:
+    """
+    Sign function of CA's acme engine
+    """
+    name = ca_certbot.ca_info.ca_acme_engine or 'certbot'
+    engine = ACME_ENGINES.get(name)
+    if not engine:
+        Log().logs(f'Error: unknown ca_acme_engine {name} - using certbot')
+        engine = certbot_sign_cert
+    return engine
@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+ACME (RFC 8555) JSON web signatures for account keys.
+ - EC (P-256, P-384) and RSA account keys
+ - certbot account keys (JWK in private_key.json) can be loaded
+"""
+from typing import Any
+import base64
+import hashlib
+import json
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa, padding
+from cryptography.hazmat.primitives.asymmetric.utils import (
+        decode_dss_signature)
+
+type AcctKey = ec.EllipticCurvePrivateKey | rsa.RSAPrivateKey
+
+
+def b64url(data: bytes) -> str:
+    """
+    base64url without padding
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64url_int(data: str) -> int:
+    pad = '=' * (-len(data) % 4)
+    return int.from_bytes(base64.urlsafe_b64decode(data + pad), 'big')
+
+
+def _int_bytes(num: int, size: int = 0) -> bytes:
+    if not size:
+        size = (num.bit_length() + 7) // 8
+    return num.to_bytes(size, 'big')
+
+
+def new_acct_key() -> AcctKey:
+    """
+    New account key (EC P-256)
+    """
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def acct_key_to_pem(key: AcctKey) -> bytes:
+    """
+    PEM (PKCS8) of account key
+    """
+    return key.private_bytes(serialization.Encoding.PEM,
+                             serialization.PrivateFormat.PKCS8,
+                             serialization.NoEncryption())
+
+
+def acct_key_from_pem(pem: bytes) -> AcctKey | None:
+    """
+    Account key from PEM - None if not EC or RSA
+    """
+    try:
+        key = serialization.load_pem_private_key(pem, password=None)
+    except ValueError:
+        return None
+    if isinstance(key, (ec.EllipticCurvePrivateKey, rsa.RSAPrivateKey)):
+        return key
+    return None
+
+
+def acct_key_from_jwk(jwk_data: dict[str, str]) -> AcctKey | None:
+    """
+    Private key from JWK (as certbot saves in private_key.json)
+    """
+    try:
+        if jwk_data.get('kty') == 'RSA':
+            pub = rsa.RSAPublicNumbers(_b64url_int(jwk_data['e']),
+                                       _b64url_int(jwk_data['n']))
+            prv = rsa.RSAPrivateNumbers(_b64url_int(jwk_data['p']),
+                                        _b64url_int(jwk_data['q']),
+                                        _b64url_int(jwk_data['d']),
+                                        _b64url_int(jwk_data['dp']),
+                                        _b64url_int(jwk_data['dq']),
+                                        _b64url_int(jwk_data['qi']),
+                                        pub)
+            return prv.private_key()
+
+        if jwk_data.get('kty') == 'EC':
+            curves = {'P-256': ec.SECP256R1(), 'P-384': ec.SECP384R1()}
+            curve = curves[jwk_data['crv']]
+            ec_pub = ec.EllipticCurvePublicNumbers(_b64url_int(jwk_data['x']),
+                                                   _b64url_int(jwk_data['y']),
+                                                   curve)
+            ec_prv = ec.EllipticCurvePrivateNumbers(_b64url_int(jwk_data['d']),
+                                                    ec_pub)
+            return ec_prv.private_key()
+
+    except (KeyError, ValueError):
+        pass
+    return None
+
+
+def _ec_size(key: ec.EllipticCurvePrivateKey) -> int:
+    return (key.curve.key_size + 7) // 8
+
+
+def jwk(key: AcctKey) -> dict[str, str]:
+    """
+    Public JWK of account key - members in lexical order
+    (as needed for thumbprint)
+    """
+    if isinstance(key, rsa.RSAPrivateKey):
+        nums = key.public_key().public_numbers()
+        return {'e': b64url(_int_bytes(nums.e)),
+                'kty': 'RSA',
+                'n': b64url(_int_bytes(nums.n))}
+
+    size = _ec_size(key)
+    ec_nums = key.public_key().public_numbers()
+    crv = {256: 'P-256', 384: 'P-384'}[key.curve.key_size]
+    return {'crv': crv,
+            'kty': 'EC',
+            'x': b64url(_int_bytes(ec_nums.x, size)),
+            'y': b64url(_int_bytes(ec_nums.y, size))}
+
+
+def jwk_thumbprint(key: AcctKey) -> str:
+    """
+    RFC 7638 thumbprint - used in key authorizations
+    """
+    data = json.dumps(jwk(key), sort_keys=True, separators=(',', ':'))
+    return b64url(hashlib.sha256(data.encode()).digest())
+
+
+def _alg(key: AcctKey) -> str:
+    if isinstance(key, rsa.RSAPrivateKey):
+        return 'RS256'
+    return {256: 'ES256', 384: 'ES384'}[key.curve.key_size]
+
+
+def _sign(key: AcctKey, data: bytes) -> bytes:
+    if isinstance(key, rsa.RSAPrivateKey):
+        return key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+
+    algo = hashes.SHA256() if key.curve.key_size == 256 else hashes.SHA384()
+    der = key.sign(data, ec.ECDSA(algo))
+    (sig_r, sig_s) = decode_dss_signature(der)
+    size = _ec_size(key)
+    return _int_bytes(sig_r, size) + _int_bytes(sig_s, size)
+
+
+def jws(key: AcctKey, url: str, nonce: str, payload: Any,
+        kid: str = '') -> bytes:
+    """
+    Flattened JWS body for ACME POST.
+     - payload None => POST-as-GET (empty payload)
+     - kid empty => use jwk (new account)
+    """
+    protected: dict[str, Any] = {'alg': _alg(key), 'nonce': nonce, 'url': url}
+    if kid:
+        protected['kid'] = kid
+    else:
+        protected['jwk'] = jwk(key)
+
+    prot64 = b64url(json.dumps(protected).encode())
+    pay64 = ''
+    if payload is not None:
+        pay64 = b64url(json.dumps(payload).encode())
+
+    sig = _sign(key, f'{prot64}.{pay64}'.encode())
+    body = {'protected': prot64, 'payload': pay64, 'signature': b64url(sig)}
+    return json.dumps(body).encode()
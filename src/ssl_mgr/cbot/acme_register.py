@@ -14,6 +14,7 @@ from ssl_mgr.ca_sign import CACertbot
 
 from .certbothook_data import CertbotHookData
 from .acct_registered import acct_registered
+from .acme_registry import acme_registry
 
 
 def _certbot_register_options(certbot: CertbotHookData, ssl_csr: SslCsr
@@ -55,9 +56,32 @@ def certbot_acct_check(certbot: CertbotHookData, ca_certbot: CACertbot,
     """
     logger = Log()
     logs = logger.logs
+
+    #
+    # Account may be shared (acme_account_scope) - one registration
+    # at a time and the service cb_dir linked to it.
+    #
+    registry = acme_registry(certbot)
+    if not registry.lock():
+        logs(f'Error: failed to lock acme accounts {registry.acct_dir}')
+        return False
+    try:
+        if not registry.link_service():
+            return False
+        return _acct_check(certbot, ca_certbot, ssl_csr, registry.acct_dir)
+    finally:
+        registry.unlock()
+
+
+def _acct_check(certbot: CertbotHookData, ca_certbot: CACertbot,
+                ssl_csr: SslCsr, acct_dir: str) -> bool:
+    """
+    Register unless already have account
+    """
+    logger = Log()
+    logs = logger.logs
     log = logger.log
 
-    cb_dir = certbot.db.cb_dir
     apex_domain = certbot.apex_domain
     service = ssl_csr.svc.service
 
@@ -70,7 +94,7 @@ def certbot_acct_check(certbot: CertbotHookData, ca_certbot: CACertbot,
     if acct_is_reg:
         return True
 
-    logs(f'  Registering ACME acct {apex_domain}/{service} : {cb_dir}')
+    logs(f'  Registering ACME acct {apex_domain}/{service} : {acct_dir}')
 
     #
     # certbot does the work
@@ -0,0 +1,201 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Shared ACME accounts.
+
+acme_account_scope (ssl-mgr.conf) says who shares an account:
+ - apex_domain : all services of an apex domain (default)
+ - global      : every service
+ - service     : each service its own (as before - in its cb dir)
+
+Shared accounts are kept in:
+    <top_dir>/acme-accounts/<apex_domain or _global>/
+        accounts/      certbot accounts
+        acme/          native acme engine accounts
+        lock
+
+Each service cb dir gets symlinks to these in place of its own
+accounts/ and acme/ dirs - certbot keeps using its config dir
+(cb dir) as before.
+
+Migration of existing per service accounts:
+ - if the registry has no account for that acme server yet,
+   the service's account is moved into the registry.
+ - otherwise the service's account is left in
+   <cb_dir>/<accounts or acme>.migrated-<date>
+   (certbot must only find one account per server).
+"""
+from typing import IO
+import fcntl
+import os
+
+from ssl_mgr.utils import (open_file, make_dir_path, current_date_time_str)
+from ssl_mgr.utils import Log
+
+from .certbothook_data import CertbotHookData
+
+
+_SCOPES = ('apex_domain', 'global', 'service')
+
+# account dir marker files : certbot and native
+_MARKERS = {'accounts': 'private_key.json', 'acme': 'account-key.pem'}
+
+
+def _account_dirs(root: str, marker: str) -> list[str]:
+    """
+    Account dirs (relative to root) - those with marker file
+    """
+    found: list[str] = []
+    for (dirpath, _dirnames, filenames) in os.walk(root):
+        if marker in filenames:
+            found.append(os.path.relpath(dirpath, root))
+    return found
+
+
+def _slot(name: str, rel: str) -> str:
+    """
+    What identifies the acme server of account dir:
+     certbot : accounts/<server>/<path>/<id> => parent
+     native  : acme/<server>
+    """
+    if name == 'accounts':
+        return os.path.dirname(rel)
+    return rel
+
+
+def _migrate(name: str, src_dir: str, dst_dir: str) -> bool:
+    """
+    Move accounts in (real) src_dir into dst_dir where dst has
+    none for that server. Returns True if src_dir is now empty
+    of accounts (all moved).
+    """
+    logs = Log().logs
+    marker = _MARKERS[name]
+
+    taken = {_slot(name, rel) for rel in _account_dirs(dst_dir, marker)}
+    all_moved = True
+    for rel in _account_dirs(src_dir, marker):
+        slot = _slot(name, rel)
+        if slot in taken:
+            all_moved = False
+            continue
+
+        dst = os.path.join(dst_dir, rel)
+        try:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            os.rename(os.path.join(src_dir, rel), dst)
+        except OSError as err:
+            logs(f'Error: moving acme account {src_dir}/{rel} : {err}')
+            all_moved = False
+            continue
+        taken.add(slot)
+        logs(f'  Moved acme account {src_dir}/{rel} -> {dst_dir}')
+    return all_moved
+
+
+def _remove_empty_dirs(top: str):
+    """
+    Remove top if nothing but empty dirs left in it
+    """
+    for (dirpath, _dirnames, _filenames) in os.walk(top, topdown=False):
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            pass
+
+
+class AcmeRegistry:
+    """
+    Account dir for one service.
+    acct_dir is what certbot config dir (cb_dir) or native
+    engine use for accounts.
+    """
+    def __init__(self, top_dir: str, scope: str, apex_domain: str,
+                 cb_dir: str):
+        self.cb_dir: str = cb_dir
+        self.acct_dir: str = cb_dir
+        self.shared: bool = False
+        self.lock_fobj: IO | None = None
+
+        if scope not in _SCOPES:
+            Log().logs(f'Error: bad acme_account_scope {scope} - using apex_domain')
+            scope = 'apex_domain'
+
+        if scope != 'service':
+            name = '_global' if scope == 'global' else apex_domain
+            self.acct_dir = os.path.join(top_dir, 'acme-accounts', name)
+            self.shared = True
+
+    def lock(self) -> bool:
+        """
+        Serialize account registration / migration
+        """
+        if self.lock_fobj:
+            return True
+        if not os.path.isdir(self.acct_dir) and not make_dir_path(self.acct_dir):
+            return False
+        fobj = open_file(os.path.join(self.acct_dir, 'lock'), 'a')
+        if not fobj:
+            return False
+        fcntl.flock(fobj, fcntl.LOCK_EX)
+        self.lock_fobj = fobj
+        return True
+
+    def unlock(self):
+        """
+        Release lock
+        """
+        if not self.lock_fobj:
+            return
+        fcntl.flock(self.lock_fobj, fcntl.LOCK_UN)
+        self.lock_fobj.close()
+        self.lock_fobj = None
+
+    def link_service(self) -> bool:
+        """
+        Service cb dir uses shared account dirs (symlinks).
+        Existing service accounts are migrated.
+        Call with lock held.
+        """
+        if not self.shared:
+            return True
+
+        logs = Log().logs
+        okay = True
+        for name in _MARKERS:
+            shared = os.path.join(self.acct_dir, name)
+            local = os.path.join(self.cb_dir, name)
+            target = os.path.relpath(shared, self.cb_dir)
+
+            if os.path.islink(local) and os.readlink(local) == target:
+                continue
+
+            try:
+                os.makedirs(shared, mode=0o700, exist_ok=True)
+                if os.path.islink(local):
+                    os.unlink(local)
+
+                elif os.path.isdir(local):
+                    all_moved = _migrate(name, local, shared)
+                    _remove_empty_dirs(local)
+                    if os.path.isdir(local):
+                        keep = f'{local}.migrated-{current_date_time_str()}'
+                        os.rename(local, keep)
+                        if not all_moved:
+                            logs(f'  Kept service acme account(s) in {keep}')
+
+                os.symlink(target, local)
+
+            except OSError as err:
+                logs(f'Error: linking {local} -> {shared} : {err}')
+                okay = False
+        return okay
+
+
+def acme_registry(certbot: CertbotHookData) -> AcmeRegistry:
+    """
+    Registry for certbot's service
+    """
+    opts = certbot.opts
+    return AcmeRegistry(opts.top_dir, opts.acme_account_scope,
+                        certbot.apex_domain, certbot.db.cb_dir)
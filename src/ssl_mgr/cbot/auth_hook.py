@@ -16,6 +16,7 @@ certbot auth hook
    use to trigger sending all acme-challenges out
    (to web or dns server as appropriate)
 """
+from collections.abc import Mapping
 import os
 # from .class_certbot import Certbot
 from ssl_mgr.utils import open_file
@@ -27,15 +28,18 @@ from .certbothook_data import CertbotHookData
 from .auth_push import auth_push
 
 
-def auth_hook(certbot: CertbotHookData):
+def auth_hook(certbot: CertbotHookData,
+              environ: Mapping[str, str] | None = None):
     """
     Auth hook handler
+     - certbot env variables from environ if given
+       (see auth_hook_server) else from our environment.
     """
     logger = Log()
     log = logger.log
 
     result = ''
-    certbot.env.refresh()
+    certbot.env.refresh(environ)
     domain = certbot.env.domain
     validation = certbot.env.validation
     token = certbot.env.token
@@ -0,0 +1,167 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Auth hook server.
+
+certbot runs sslm-auth-hook once per domain of each cert. Rather than
+each one loading the config, setting up logging and the db, sslm-mgr
+runs this server (in process, for the duration of the run) and the
+hook just forwards its arguments and CERTBOT_* variables here.
+
+ - unix socket: <top_dir>/.auth-hook/sock (dir mode 0700)
+ - socket path passed to certbot (and so its hooks) in the
+   environment variable SSLM_AUTH_HOOK_SOCKET
+ - only clients with our uid are served
+ - request : one line of json {"args": [group, service, (debug)],
+                               "env": {"CERTBOT_DOMAIN": ...}}
+ - reply   : one line of json {"okay": bool, "error": str}
+
+If the socket is not available sslm-auth-hook does the work itself
+as before.
+"""
+# pylint: disable=too-few-public-methods
+from typing import Any
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+from ssl_mgr.utils import Log
+from ssl_mgr.config import SslOpts
+
+from .certbothook import CertbotHook
+
+
+SOCKET_ENV = 'SSLM_AUTH_HOOK_SOCKET'
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    One hook request
+    """
+    def handle(self):
+        server: '_UnixServer' = self.server     # type: ignore[assignment]
+        if not server.peer_allowed(self.request):
+            return
+
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = {}
+
+        reply = server.hook_server.handle(request)
+        self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Each request in its own thread (dns hooks wait for propagation)
+    """
+    daemon_threads = True
+
+    def __init__(self, path: str, hook_server: 'AuthHookServer'):
+        self.hook_server = hook_server
+        super().__init__(path, _Handler)
+
+    def peer_allowed(self, sock: socket.socket) -> bool:
+        """ client must have our uid """
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                struct.calcsize('3i'))
+        (_pid, uid, _gid) = struct.unpack('3i', creds)
+        return uid == os.geteuid()
+
+
+class AuthHookServer:
+    """
+    Serve sslm-auth-hook requests using our already loaded opts.
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, opts: SslOpts):
+        self.opts: SslOpts = opts
+        self.sock_dir: str = os.path.join(opts.top_dir, '.auth-hook')
+        self.sock_path: str = os.path.join(self.sock_dir, 'sock')
+        self.server: _UnixServer | None = None
+        self.thread: threading.Thread | None = None
+
+        self.num_requests: int = 0
+        self._hooks: dict[tuple[str, str, bool], CertbotHook] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """
+        Listen on socket and tell hooks where it is
+        """
+        logs = Log().logs
+        try:
+            os.makedirs(self.sock_dir, mode=0o700, exist_ok=True)
+            os.chmod(self.sock_dir, 0o700)
+            if os.path.lexists(self.sock_path):
+                os.unlink(self.sock_path)
+            self.server = _UnixServer(self.sock_path, self)
+        except OSError as err:
+            logs(f'Warning: auth hook server not started : {err}')
+            return False
+
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        os.environ[SOCKET_ENV] = self.sock_path
+        return True
+
+    def stop(self):
+        """
+        Stop serving
+        """
+        if not self.server:
+            return
+
+        os.environ.pop(SOCKET_ENV, None)
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        if os.path.lexists(self.sock_path):
+            os.unlink(self.sock_path)
+        Log().logsv(f'  auth hook server: {self.num_requests} requests')
+
+    def _hook(self, group: str, service: str, debug: bool) -> CertbotHook:
+        """
+        One CertbotHook per service for the run
+        """
+        key = (group, service, debug)
+        with self._lock:
+            self.num_requests += 1
+            hook = self._hooks.get(key)
+            if not hook:
+                hook = CertbotHook('next', group, service, self.opts,
+                                   debug=debug)
+                self._hooks[key] = hook
+            return hook
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Do what sslm-auth-hook would have done
+        """
+        args = request.get('args', [])
+        environ = request.get('env', {})
+        if len(args) < 2 or not isinstance(environ, dict):
+            return {'okay': False, 'error': 'bad request'}
+
+        (group, service) = (args[0], args[1])
+        debug = len(args) > 2 and args[2].lower().startswith('deb')
+
+        logger = Log()
+        logger.buffer_start()
+        try:
+            hook = self._hook(group, service, debug)
+            hook.auth_hook(environ)
+
+        except Exception as err:        # pylint: disable=broad-exception-caught
+            logger.logs(f'Error: auth hook {group} {service} : {err}')
+            return {'okay': False, 'error': str(err)}
+
+        finally:
+            logger.buffer_flush()
+        return {'okay': True, 'error': ''}
@@ -6,13 +6,16 @@ auth push for dns-01
 # pylint: disable=too-many-locals
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from ssl_mgr.utils import open_file
 from ssl_mgr.utils import (Log)
 from ssl_mgr.dns_base import (init_primary_dns_server, dns_zone_update, dns_restart)
 from ssl_mgr.dns_base import (dns_txt_record_format)
+from ssl_mgr.config import SslOpts
 
 from .certbothook_data import CertbotHookData
+from .acme_dns_batch import AcmeDnsBatch
 
 
 def _acme_challenges(apex_domain: str, auth_data_rows: list[str]):
@@ -77,6 +80,121 @@ def _save_dns_acme_file(cb_dir: str, apex_domain: str, dns_rr: str) -> str:
     return ''
 
 
+def _check_nameservers(opts: SslOpts, apex_domain: str,
+                       challenges: list[tuple[str, str]],
+                       debug: bool) -> bool:
+    """
+    Wait and only return after all auth nameservers have
+    the correct acme validation challenges
+    Certbot will check with the authorized NS to validate challenge
+
+    - sanity check primary NS has correct acme challenges
+      if not we have major problem.
+    - get serial of primary NS
+    - check each ns has current serial
+    """
+    logger = Log()
+    logs = logger.logs
+
+    dns = init_primary_dns_server(opts, apex_domain)
+    if not dns.okay:
+        logs('Error setting up primary DNS server')
+        return False
+
+    if debug:
+        subdoms = [sub for (sub, _val) in challenges]
+        logs(f'Debug skip: dns acme check {apex_domain} : {subdoms}')
+        return True
+
+    ns_updated = dns.check_acme_challenges(challenges)
+    if not ns_updated:
+        logs('  Failed to validate all nameservers.  Fatal error')
+    return ns_updated
+
+
+def _update_zone(opts: SslOpts, batch: AcmeDnsBatch, apex_domain: str,
+                 debug: bool) -> bool:
+    """
+    Write all active acme challenges of apex_domain to
+      <batch_dir>/acme-challenge.<apex_domain>
+    and copy to dns acme directory / directories.
+    """
+    logger = Log()
+    logs = logger.logs
+
+    rows = batch.rows(apex_domain)
+    if not rows:
+        rows = [f';; {apex_domain} : no active challenges']
+    (dns_rr, _challenges) = _acme_challenges(apex_domain, rows)
+    dns_path = _save_dns_acme_file(batch.batch_dir, apex_domain, dns_rr)
+
+    isokay = dns_zone_update(dns_path, opts.dns.acme_dir, debug=debug)
+    if not isokay:
+        logs('Error with dns_zone_update (see log file)')
+    return isokay
+
+
+def _publish_batch(opts: SslOpts, batch: AcmeDnsBatch, debug: bool):
+    """
+    Leader (holds batch lock):
+     - let any other hooks arriving close together join this batch
+     - one zone update per apex domain, one dns restart for all
+     - one propagation wait per apex domain (they overlap in time
+       as all zones were restarted together)
+     - mark every request done
+    """
+    logger = Log()
+    logs = logger.logs
+
+    window = opts.dns_batch_window
+    max_wait = opts.dns_batch_max_wait
+    start = time.time()
+    while time.time() - start < max_wait:
+        if batch.newest_pending_age(time.time()) >= window:
+            break
+        time.sleep(1)
+
+    pending = batch.pending()
+    if not pending:
+        return
+
+    apex_domains = sorted({apex for (apex, _svc) in pending})
+    logs(f'    auth_push_dns batch: {len(pending)} certs {apex_domains}')
+
+    for apex_domain in apex_domains:
+        _update_zone(opts, batch, apex_domain, debug)
+
+    #
+    # DNS update = (sign zone and restart primary)
+    # include any domains left from cleanup
+    #
+    domains = sorted(set(apex_domains + batch.take_restarts()))
+    isokay = dns_restart(domains, opts, debug=debug)
+    if not isokay:
+        logs('Error with dns_restart (see log file)')
+
+    #
+    # Each apex domain has its own nameservers - check them all at same time
+    #
+    apex_challenges: dict[str, list[tuple[str, str]]] = {}
+    for apex_domain in apex_domains:
+        challenges: list[tuple[str, str]] = []
+        for (apex, svc_name) in pending:
+            if apex == apex_domain:
+                rows = batch.rows(apex_domain, svc_name)
+                challenges += _acme_challenges(apex_domain, rows)[1]
+        apex_challenges[apex_domain] = challenges
+
+    with ThreadPoolExecutor(max_workers=len(apex_domains)) as pool:
+        futures = {apex: pool.submit(_check_nameservers, opts, apex,
+                                     apex_challenges[apex], debug)
+                   for apex in apex_domains}
+        ns_updated = {apex: fut.result() for (apex, fut) in futures.items()}
+
+    for (apex_domain, svc_name) in pending:
+        batch.set_done(apex_domain, svc_name, ns_updated[apex_domain])
+
+
 def auth_push_dns(certbot: CertbotHookData,
                   auth_data_rows: list[str],
                   check_nameservers: bool = True):
@@ -90,6 +208,12 @@ def auth_push_dns(certbot: CertbotHookData,
       each row : domain validation
     Used only for dns:
      - acme-challenge validation
+
+    Challenges from all certbot hooks running at same time are
+    published together (see acme_dns_batch).
+    With check_nameservers False (cleanup) this certs challenges are
+    removed from the zone include file and dns restart is left
+    for the next batch or end of run (acme_dns_batch_flush).
     """
     #
     # Dont need logger.set_zone(LogZone.CERTBOT)
@@ -101,78 +225,82 @@ def auth_push_dns(certbot: CertbotHookData,
     logs('    auth_push_dns')
 
     apex_domain = certbot.apex_domain
-    cb_dir = certbot.db.cb_dir
+    svc_name = certbot.svc_name
+    opts = certbot.opts
     deb = False
     if certbot.debug:
         deb = certbot.debug
 
-    #
-    # Get
-    #  - dns_rr : string of DNS TXT records for all challenges
-    #  - challenges : [(domain, validation), ...]
-    #    pairs to confirm dns NS servers have them
-    #
-    (dns_rr, challenges) = _acme_challenges(apex_domain, auth_data_rows)
+    batch = AcmeDnsBatch(opts.top_dir)
+    if not batch.make_dirs():
+        return
 
-    #
-    # Save:
-    #  TXT records to file : <cb_dir/acme-challenge.<apex-domain>
-    #
-    dns_path = _save_dns_acme_file(cb_dir, apex_domain, dns_rr)
+    if not check_nameservers:
+        batch.lock()
+        try:
+            batch.remove(apex_domain, svc_name)
+            if _update_zone(opts, batch, apex_domain, deb):
+                batch.mark_restart(apex_domain)
+        finally:
+            batch.unlock()
+        logs('    auth_push_dns - cleanup dns restart deferred')
+        return
 
     #
-    # Copy acme challenge file (dns_path) to dns acme directory / directories
-    # This has all challenges for the current cert.
-    # dns_acme_dir has one or more directories
+    # Leave our challenges for the batch and wait till done.
+    # If we get the lock we publish every pending request.
     #
-    dns_acme_dir = certbot.opts.dns.acme_dir
-    isokay = dns_zone_update(dns_path, dns_acme_dir, debug=deb)
-    if not isokay:
-        logs('Error with dns_zone_update (see log file)')
+    if not batch.add(apex_domain, svc_name, auth_data_rows):
+        logs('Error saving acme challenges for batch')
+        return
 
     #
-    # DNS update = (sign zone and restart primary)
-    # auth-hook will be called by certbot to check that all
+    # Leader gathers for up to dns_batch_max_wait then waits up to
+    # dns_wait_max for nameservers - dont wait on it longer than that.
     #
-    domains: list[str] = [apex_domain]
-    isokay = dns_restart(domains, certbot.opts, debug=deb)
-    if not isokay:
-        logs('Error with dns_restart (see log file)')
+    deadline = time.time() + opts.dns_batch_max_wait + opts.dns_wait_max
+    while True:
+        result = batch.get_done(apex_domain, svc_name)
+        if result is not None:
+            if not result:
+                logs(f'    auth_push_dns: {apex_domain} {svc_name} failed')
+            return
 
-    #
-    # Cleanup doesn't need any nameserver checks
-    # It just wants to push empty acme-challenge TXT records to the zone
-    #
-    if not check_nameservers:
-        logs('    auth_push_dns - skipping nameserver checks')
-        return
+        if time.time() > deadline:
+            logs(f'Error: auth_push_dns: {apex_domain} {svc_name} batch timed out')
+            batch.cancel(apex_domain, svc_name)
+            return
 
-    #
-    # Wait and only return after all auth nameservers have
-    # the correct acme validation challenges
-    # Certbot will check with the authorized NS to validate challenge
-    #
-    # - sanity check primary NS has correct acme challenges
-    #   if not we have major problem.
-    # - get serial of primary NS
-    # - check each ns has current serial
-    #
-    dns = init_primary_dns_server(certbot.opts, apex_domain)
-    if not dns.okay:
-        logs('Error setting up primary DNS server')
-        return
+        if batch.lock(wait=False):
+            try:
+                _publish_batch(opts, batch, deb)
+            finally:
+                batch.unlock()
+            continue
+        time.sleep(1)
 
-    if deb:
-        subdoms = [sub for (sub, _val) in challenges]
-        logs(f'Debug skip: dns acme check {apex_domain} : {subdoms}')
-        return
 
-    ns_updated = dns.check_acme_challenges(challenges)
-    if not ns_updated:
-        hail_mary = 600
-        txt = f'hail mary delay {hail_mary}'
-        logs(f'Failed to validate all nameservers: {txt}')
-        time.sleep(hail_mary)
-        ns_updated = dns.check_acme_challenges(challenges)
-        if not ns_updated:
-            logs('  Still Failed to validate all nameservers.  Fatal error')
+def acme_dns_batch_flush(opts: SslOpts) -> bool:
+    """
+    End of run: one dns restart for any domains whose
+    acme-challenges were cleaned up since the last batch.
+    """
+    batch = AcmeDnsBatch(opts.top_dir)
+    if not batch.exists():
+        return True
+
+    batch.lock()
+    try:
+        domains = batch.take_restarts()
+    finally:
+        batch.unlock()
+
+    if not domains:
+        return True
+
+    logger = Log()
+    logger.logsv(f'  acme dns cleanup restart for {domains}')
+    okay = dns_restart(domains, opts, debug=opts.debug)
+    if not okay:
+        logger.logs('Error with dns_restart (see log file)')
+    return okay
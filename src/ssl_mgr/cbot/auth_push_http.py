@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 # SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
 """
-Worked functions
+acme http-01: push validation tokens to the web servers.
+ - this machine: token files written directly
+ - remote: all tokens of a cert staged locally and sent with
+   one scp per web server, all servers at same time
+ - cleanup removes them with one ssh rm per web server
 """
-from typing import (IO)
 import os
 import stat
 from pwd import getpwnam
@@ -14,6 +17,7 @@ from pyconcurrent import run_prog
 
 from ssl_mgr.utils import open_file, make_dir_path, write_path_atomic
 from ssl_mgr.utils import Log
+from ssl_mgr.utils import SshMux
 
 from .certbothook_data import CertbotHookData
 
@@ -48,52 +52,96 @@ def _fix_file_permission(certbot: CertbotHookData, token_path: str):
         logs('  http push needs root to change file owner/group')
 
 
-def _token_to_webservers(certbot: CertbotHookData,
-                         token_path: str,
-                         validation: str):
+def web_servers_split(certbot: CertbotHookData) -> tuple[bool, list[str]]:
     """
-    Copy the acme validation token to one or more web servers
-     - <server>/<domain>/.well-known/acme-challenge/<token>
-     - if same machine copy (make temp file) otherwise use scp
+    Web servers split into this machine and remote ones
+    Returns (local: bool, remotes: list[str])
+     - local is True if this machine is one of the web servers
+     - each remote host listed once
+    """
+    local = False
+    remotes: list[str] = []
+    if not (certbot.opts.web and certbot.opts.web.servers):
+        return (local, remotes)
+
+    for web_server in certbot.opts.web.servers:
+        if web_server in (certbot.this_host, certbot.this_fqdn):
+            local = True
+        elif web_server not in remotes:
+            remotes.append(web_server)
+    return (local, remotes)
+
+
+def _stage_tokens(certbot: CertbotHookData, stage_dir: str,
+                  tokens: dict[str, str]) -> list[str]:
+    """
+    Write token files to stage_dir ready to send.
+    Returns their paths - empty on failure.
+    """
+    logs = Log().logs
+    stage_paths: list[str] = []
+    for (token, validation) in tokens.items():
+        stage_path = os.path.join(stage_dir, token)
+        if not write_path_atomic(validation + '\n', stage_path, logs):
+            return []
+        _fix_file_permission(certbot, stage_path)
+        stage_paths.append(stage_path)
+    return stage_paths
+
+
+def _tokens_to_webservers(certbot: CertbotHookData,
+                          token_dir: str,
+                          tokens: dict[str, str]) -> bool:
+    """
+    Copy all acme validation tokens of cert to the web servers
+     - <server_dir>/<apex_domain>/.well-known/acme-challenge/<token>
+     - tokens : {token: validation}
+     - if same machine write the files directly.
+     - remote: tokens are written to one local staging dir and
+       sent with one scp per web server, all servers at same time
        (make sure scp has right permissions to work with no passphrase prompt)
     -
       make sure web server can read file.
       Be sure remote web server(s) use same uuid for user http as this machine
        - if not we'll need to fix code to change remote file owner
     """
-    # pylint: disable=line-too-long
     logger = Log()
+    logs = logger.logs
 
-    val_data = validation + '\n'
-    temp_token: IO | None = None
-    for web_server in certbot.opts.web.servers:
-        if web_server in (certbot.this_host, certbot.this_fqdn):
-            #
-            # remote server
-            #
-            if not temp_token:
-                with tempfile.NamedTemporaryFile(mode='w',
-                                                 prefix='cb-',
-                                                 delete=False) as temp_token:
-                    temp_token.write(val_data)
-                _fix_file_permission(certbot, temp_token.name)
-
-            scp = '/usr/bin/scp'
-
-            dst = f'{web_server}:{token_path}'
-            pargs = [scp, temp_token.name, dst]
-            test = certbot.opts.debug
-            (_ret, _sout, _serr) = run_prog(pargs, test=test, verb=True)
+    (local, remotes) = web_servers_split(certbot)
+    okay = True
 
-        else:
-            #
-            # Same machine - write file
-            #
-            write_path_atomic(val_data, token_path, logger.logs)
+    if local:
+        for (token, validation) in tokens.items():
+            token_path = os.path.join(token_dir, token)
+            if not write_path_atomic(validation + '\n', token_path, logs):
+                okay = False
+                continue
             _fix_file_permission(certbot, token_path)
 
-    if temp_token:
-        os.unlink(temp_token.name)
+    if not remotes:
+        return okay
+
+    with tempfile.TemporaryDirectory(prefix='cb-') as stage_dir:
+        stage_paths = _stage_tokens(certbot, stage_dir, tokens)
+        if not stage_paths:
+            return False
+
+        def _push_one(web_server: str) -> bool:
+            dst = f'{web_server}:{token_dir}/'
+            pargs = SshMux.scp(web_server) + stage_paths + [dst]
+            test = certbot.opts.debug
+            (ret, _sout, serr) = run_prog(pargs, test=test, verb=True)
+            if ret != 0:
+                logs(f'Error: pushing acme tokens to {web_server} : {serr}')
+                return False
+            return True
+
+        futures = logger.map_buffered(_push_one,
+                                      [(host,) for host in remotes],
+                                      len(remotes))
+        okay &= all(future.result() for future in futures)
+    return okay
 
 
 def acme_http_token_path(cb_dir: str) -> str:
@@ -142,6 +190,15 @@ def auth_push_http(certbot: CertbotHookData,
     acme = '.well-known/acme-challenge'
     web_token_data = ''
 
+    #
+    # x.apex_domain has its web data served from .../apex_domain/...
+    #   e.g. /srv/https/Sites/<apex_domain>/.well-known/acme-challenge
+    # So we dont actually use 'domain'
+    #
+    web_dir = os.path.join(certbot.opts.web.server_dir, apex_domain)
+    token_dir = os.path.join(web_dir, acme)
+    tokens: dict[str, str] = {}
+
     for row in auth_data_rows:
         if row.startswith('#') or row.startswith(';'):
             continue
@@ -149,13 +206,7 @@ def auth_push_http(certbot: CertbotHookData,
         (domain, validation, token) = row.split()
         log(f'  {domain} {validation} {token}')
 
-        #
-        # x.apex_domain has its web data served from .../apex_domain/...
-        #   e.g. /srv/https/Sites/<apex_domain>/.well-known/acme-challenge
-        # So we dont actually use 'domain'
-        #
-        web_dir = os.path.join(certbot.opts.web.server_dir, apex_domain)
-        token_path = os.path.join(web_dir, acme, token)
+        token_path = os.path.join(token_dir, token)
 
         # Keep the list of token paths so they can be removed in clean up
         web_token_data += token_path + '\n'
@@ -167,12 +218,15 @@ def auth_push_http(certbot: CertbotHookData,
             test_token_path = os.path.join(test_token_path, token)
             logs(f'Deb skip: push webserver : {domain} -> {token_path}')
             logs(f'    copy: {test_token_path}')
-            val_data = validation + 'n'
+            val_data = validation + '\n'
             write_path_atomic(val_data, test_token_path, log=logs)
             continue
 
-        # copy to web server(s)
-        _token_to_webservers(certbot, token_path, validation)
+        tokens[token] = validation
+
+    # copy all tokens to web server(s) together
+    if tokens and not _tokens_to_webservers(certbot, token_dir, tokens):
+        logs('Error: failed pushing acme tokens to web server(s)')
 
     #
     # Save token paths for clean_hook to remove
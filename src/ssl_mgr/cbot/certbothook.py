@@ -5,6 +5,7 @@ load certbot config
 """
 # pylint disable=invalid-name, too-many-instance-attributes
 # pylint disable=too-few-public-methods
+from collections.abc import Mapping
 
 from .certbothook_data import CertbotHookData
 from .auth_hook import auth_hook
@@ -15,11 +16,11 @@ class CertbotHook(CertbotHookData):
     """
     Used by certbot hook which has less info than when loaded by ssl-mgr
     """
-    def auth_hook(self):
+    def auth_hook(self, environ: Mapping[str, str] | None = None):
         """
-        when run as hook
+        when run as hook (or for auth hook server)
         """
-        result = auth_hook(self)
+        result = auth_hook(self, environ)
         return result
 
     def cleanup_hook(self):
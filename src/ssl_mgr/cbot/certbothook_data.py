@@ -5,11 +5,13 @@ load certbot config
 """
 # pylint: disable=invalid-name, too-many-instance-attributes
 # pylint: disable=too-few-public-methods
+from collections.abc import Mapping
 import os
 
 from ssl_mgr.db import SslDb
 from ssl_mgr.utils import get_my_hostname
 from ssl_mgr.utils import (Log, LogZone)
+from ssl_mgr.utils import SshMux
 from ssl_mgr.utils import set_restictive_file_perms
 from ssl_mgr.config import SslOpts
 
@@ -54,6 +56,7 @@ class CertbotHookData:
             # running as hook program
             logger.initialize(self.opts.logdir, zone=LogZone.CERTBOT)
             logger.logs('auth_hook: init logging')
+            SshMux.initialize(self.opts.top_dir, self.opts.ssh_control_persist)
 
         #
         # certbot logdir (--logs-dir) (default /var/log/letsencrypt)
@@ -97,40 +100,43 @@ class CertbotHookData:
             #
             self.auth_output: str = ''
 
-        def refresh(self):
+        def refresh(self, environ: Mapping[str, str] | None = None):
             """
             Fetch certbot env variables
+             - from environ if given (auth hook server) else
+               our environment
             """
+            getenv = environ.get if environ is not None else os.getenv
             # for auth and cleanup
             self.domain = ''
-            domain = os.getenv('CERTBOT_DOMAIN')
+            domain = getenv('CERTBOT_DOMAIN')
             if domain:
                 self.domain = domain
 
             self.validation = ''
-            validation = os.getenv('CERTBOT_VALIDATION')
+            validation = getenv('CERTBOT_VALIDATION')
             if validation:
                 self.validation = validation
 
             self.token = ''
-            token = os.getenv('CERTBOT_TOKEN')
+            token = getenv('CERTBOT_TOKEN')
             if token:
                 self.token = token
 
-            remaining_challenges = os.getenv('CERTBOT_REMAINING_CHALLENGES')
+            remaining_challenges = getenv('CERTBOT_REMAINING_CHALLENGES')
             if remaining_challenges:
                 self.remaining_challenges = int(remaining_challenges)
             else:
                 self.remaining_challenges = 0
 
-            all_domains = os.getenv('CERTBOT_ALL_DOMAINS')
+            all_domains = getenv('CERTBOT_ALL_DOMAINS')
             if all_domains:
                 self.all_domains = all_domains.split(',')
             else:
                 self.all_domains = []
 
             # for cleanup
-            auth_output = os.getenv('CERTBOT_AUTH_OUTPUT')
+            auth_output = getenv('CERTBOT_AUTH_OUTPUT')
             if not auth_output:
                 auth_output = ''
 
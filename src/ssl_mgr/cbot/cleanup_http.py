@@ -6,12 +6,15 @@ certbot cleanup hook
  - dns - accumulate till have domains for this cert
 """
 import os
+import shlex
 
 from pyconcurrent import run_prog
 
 from ssl_mgr.utils import open_file
+from ssl_mgr.utils import Log
+from ssl_mgr.utils import SshMux
 
-from .auth_push_http import acme_http_token_path
+from .auth_push_http import (acme_http_token_path, web_servers_split)
 from .certbothook_data import CertbotHookData
 
 
@@ -24,22 +27,40 @@ def _unlink_file(path: str):
             pass
 
 
-def _remove_web_server_token(certbot: CertbotHookData, token_path: str):
+def _remove_web_server_tokens(certbot: CertbotHookData,
+                               token_paths: list[str]):
     """
-    Remove 1 token
+    Remove all tokens of cert from web server(s)
+     - this machine: unlink each
+     - remote: one ssh rm per web server, all servers at same time
     """
-    if not (certbot.opts.web and certbot.opts.web.servers):
-        return
+    logs = Log().logs
+    (local, remotes) = web_servers_split(certbot)
 
-    for web_serv in certbot.opts.web.servers:
-        if web_serv in (certbot.this_host, certbot.this_fqdn):
-            rm_cmd = '/usr/bin/rm -f {token_path}'
-            pargs = ['/usr/bin/ssh', web_serv, rm_cmd]
-            test = certbot.opts.debug
-            (_ret, _out, _err) = run_prog(pargs, test=test, verb=True)
-        else:
+    if local:
+        for token_path in token_paths:
             _unlink_file(token_path)
 
+    if not remotes:
+        return
+
+    quoted = ' '.join(shlex.quote(path) for path in token_paths)
+    rm_cmd = f'/usr/bin/rm -f {quoted}'
+
+    def _remove_one(web_serv: str) -> bool:
+        pargs = SshMux.ssh(web_serv) + [rm_cmd]
+        test = certbot.opts.debug
+        (ret, _out, err) = run_prog(pargs, test=test, verb=True)
+        if ret != 0:
+            logs(f'Error: removing acme tokens from {web_serv} : {err}')
+            return False
+        return True
+
+    futures = Log().map_buffered(_remove_one, [(host,) for host in remotes],
+                                 len(remotes))
+    for future in futures:
+        future.result()
+
 
 def cleanup_hook_http(certbot: CertbotHookData):
     """
@@ -62,8 +83,9 @@ def cleanup_hook_http(certbot: CertbotHookData):
     else:
         return
 
-    for token_path in web_token_data:
-        _remove_web_server_token(certbot, token_path)
+    token_paths = [path for path in web_token_data if path.strip()]
+    if token_paths:
+        _remove_web_server_tokens(certbot, token_paths)
 
     #
     # Empty tokens from web_token_path so ready
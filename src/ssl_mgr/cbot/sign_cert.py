@@ -19,20 +19,26 @@ from .acme_register import certbot_acct_check
 from .certbothook_data import CertbotHookData
 
 
-def _domains(csr: SslCsr):
+def csr_domains(csr: SslCsr) -> list[str]:
     """
-    make comma separated list of domains from sans
+    list of domains from sans
     NB the primary domain MUST be the first one listed
     """
     domain_list = csr.svc.x509.sans
     if csr.svc.x509.CN not in domain_list:
         domain_list = [csr.svc.x509.CN] + domain_list
+    return domain_list
 
-    domains = ','.join(domain_list)
+
+def _domains(csr: SslCsr):
+    """
+    make comma separated list of domains from sans
+    """
+    domains = ','.join(csr_domains(csr))
     return domains
 
 
-def _challenge_type(ca_validation: str) -> str:
+def challenge_type_of(ca_validation: str) -> str:
     """
     ca_validation has typer and version:  type-vers
     e.g.
@@ -172,7 +178,7 @@ def certbot_options(certbot: CertbotHookData,
     return opts
 
 
-def _check_input(certbot: CertbotHookData, challenge_type: str) -> bool:
+def check_challenge_input(certbot: CertbotHookData, challenge_type: str) -> bool:
     """
     Check have whats needed
     """
@@ -244,8 +250,8 @@ def certbot_sign_cert(certbot: CertbotHookData,
     # Input check
     #
     ca_validation = ca_certbot.ca_info.ca_validation
-    challenge_type = _challenge_type(ca_validation)
-    if not _check_input(certbot, challenge_type):
+    challenge_type = challenge_type_of(ca_validation)
+    if not check_challenge_input(certbot, challenge_type):
         return (b'', b'')
 
     #
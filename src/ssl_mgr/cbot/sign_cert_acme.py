@@ -0,0 +1,352 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+(Re)New cert using the in process ACME client (acme_engine = 'native')
+
+Same steps certbot + sslm-auth-hook do, but without starting
+certbot or a hook process per domain:
+ - new order for the csr domains
+ - challenges pushed using the same http / dns push code as the
+   auth hook, all domains of the cert together
+ - authorizations known to be valid (AcmeAuthzCache) need no
+   challenge, publication or dns propagation wait
+ - respond, wait for validation, finalize with our csr
+ - save cert.pem, chain.pem and fullchain.pem in cert_dir
+"""
+# pylint: disable=too-many-locals
+import hashlib
+import os
+
+from cryptography.hazmat.primitives.serialization import Encoding
+
+from ssl_mgr.utils import read_pem
+from ssl_mgr.utils import Log
+from ssl_mgr.crypto_base import (cert_split_pem_string, pem_to_cert)
+from ssl_mgr.crypto_base import (save_cert_pem, save_chain_pem,
+                                 save_fullchain_pem)
+from ssl_mgr.crypto_csr import SslCsr
+from ssl_mgr.ca_sign import CACertbot
+
+from .acme_client import (AcmeSession, AcmeAccount, AcmeError, acme_field)
+from .acme_client import (LE_DIRECTORY, LE_STAGING_DIRECTORY)
+from .acme_account import acme_account
+from .acme_registry import acme_registry
+from .acme_authz_cache import AcmeAuthzCache
+from .acme_jws import (b64url, jwk_thumbprint)
+from .auth_push import auth_push
+from .certbothook_data import CertbotHookData
+from .sign_cert import (csr_domains, challenge_type_of,
+                        check_challenge_input)
+
+
+_VALIDATE_MAX_SECS = 300
+_PEM_CHAIN = 'application/pem-certificate-chain'
+
+
+def _directory_url(certbot: CertbotHookData, ca_certbot: CACertbot) -> str:
+    """
+    ca_acme_directory if set otherwise letsencrypt.
+    Test and dry run use letsencrypt staging (as certbot does)
+    """
+    if ca_certbot.ca_info.ca_acme_directory:
+        return ca_certbot.ca_info.ca_acme_directory
+    if certbot.opts.test or ca_certbot.dry_run:
+        return LE_STAGING_DIRECTORY
+    return LE_DIRECTORY
+
+
+def _authz_ident(authz: dict) -> str:
+    """
+    Identifier of authorization (*.domain if wildcard)
+    """
+    domain = acme_field(acme_field(authz, 'identifier', dict), 'value')
+    if authz.get('wildcard'):
+        domain = f'*.{domain}'
+    return domain
+
+
+def _challenges(authz: dict) -> list[dict]:
+    """
+    Challenges of authorization (those that are objects)
+    """
+    challenges = authz.get('challenges')
+    if not isinstance(challenges, list):
+        return []
+    return [chall for chall in challenges if isinstance(chall, dict)]
+
+
+def _challenge_rows(acct: AcmeAccount, authzs: list[dict],
+                    challenge_type: str) -> tuple[list[str], list[str]]:
+    """
+    For each pending authorization pick challenge and make its
+    auth data row (as auth hook saves them):
+      http : domain validation token
+      dns  : domain validation
+    Returns (rows, challenge urls)
+    """
+    thumbprint = jwk_thumbprint(acct.key)
+    chall_name = f'{challenge_type}-01'
+
+    rows: list[str] = []
+    urls: list[str] = []
+    for authz in authzs:
+        domain = _authz_ident(authz)
+
+        chall = next((one for one in acme_field(authz, 'challenges', list)
+                      if isinstance(one, dict)
+                      and one.get('type') == chall_name), None)
+        if not chall:
+            raise AcmeError(f'{domain} no {chall_name} challenge offered')
+
+        token = acme_field(chall, 'token')
+        key_auth = f'{token}.{thumbprint}'
+        if challenge_type == 'http':
+            rows.append(f'{domain} {key_auth} {token}')
+        else:
+            digest = hashlib.sha256(key_auth.encode()).digest()
+            rows.append(f'{domain} {b64url(digest)}')
+        urls.append(acme_field(chall, 'url'))
+    return (rows, urls)
+
+
+def _authorize(certbot: CertbotHookData, acct: AcmeAccount,
+               authz_urls: list[str], challenge_type: str,
+               use_cache: bool = True) -> list[str]:
+    """
+    Get every authorization of order valid.
+     - those cached as valid (AcmeAuthzCache) are not fetched
+     - those already valid need no challenge
+    Returns identifiers taken from cache.
+    Raises AcmeError if not all valid.
+    """
+    logger = Log()
+    log = logger.log
+
+    cached: list[str] = []
+    pending: list[tuple[str, dict]] = []
+    for url in authz_urls:
+        ident = AcmeAuthzCache.valid(acct.kid, url) if use_cache else ''
+        if ident:
+            log(f'  acme: {ident} valid (cached)')
+            cached.append(ident)
+            continue
+
+        authz = acct.post(url).json()
+        status = authz.get('status')
+        if status == 'valid':
+            log(f'  acme: {_authz_ident(authz)} already valid')
+            AcmeAuthzCache.put(acct.kid, _authz_ident(authz), url,
+                               str(authz.get('expires', '')))
+            continue
+        if status != 'pending':
+            raise AcmeError(f'authorization {url} is {status}')
+        pending.append((url, authz))
+
+    if not pending:
+        return cached
+
+    (rows, chall_urls) = _challenge_rows(acct, [az for (_u, az) in pending],
+                                         challenge_type)
+
+    #
+    # Push all challenges out - as the auth hook would do
+    # on its last call
+    #
+    certbot.challenge_proto = challenge_type
+    hdr = f'# {certbot.apex_domain} {challenge_type}'
+    auth_push(certbot, [hdr] + rows)
+
+    for url in chall_urls:
+        acct.post(url, {})
+
+    for (url, _authz) in pending:
+        authz = acct.poll(url, ('pending', 'processing'), _VALIDATE_MAX_SECS)
+        status = authz.get('status')
+        if status != 'valid':
+            error = ''
+            for chall in _challenges(authz):
+                if isinstance(chall.get('error'), dict):
+                    error = chall['error'].get('detail', '')
+            raise AcmeError(f'authorization {url} is {status} {error}')
+        AcmeAuthzCache.put(acct.kid, _authz_ident(authz), url,
+                           str(authz.get('expires', '')))
+    return cached
+
+
+def _chain_top_issuer(pem: str) -> str:
+    """
+    Issuer CN of last cert in chain
+    """
+    items = [item for (label, item) in cert_split_pem_string(pem)
+             if label == 'CERTIFICATE']
+    if not items:
+        return ''
+    cert = pem_to_cert(items[-1].encode())
+    if not cert:
+        return ''
+    return cert.issuer.rfc4514_string()
+
+
+def _download(acct: AcmeAccount, cert_url: str, preferred_chain: str) -> str:
+    """
+    Cert + chain (pem) - preferred chain if offered
+    """
+    resp = acct.post(cert_url, accept=_PEM_CHAIN)
+    pem = resp.text()
+    if not preferred_chain or preferred_chain in _chain_top_issuer(pem):
+        return pem
+
+    for alt_url in resp.links('alternate'):
+        alt_pem = acct.post(alt_url, accept=_PEM_CHAIN).text()
+        if preferred_chain in _chain_top_issuer(alt_pem):
+            return alt_pem
+    return pem
+
+
+def _save(cert_dir: str, pem: str) -> tuple[bytes, bytes]:
+    """
+    Save cert, chain and fullchain
+    """
+    items = [item for (label, item) in cert_split_pem_string(pem)
+             if label == 'CERTIFICATE']
+    if not items:
+        return (b'', b'')
+
+    cert_pem = items[0].encode()
+    chain_pem = ''.join(items[1:]).encode()
+    okay = save_cert_pem(cert_pem, cert_dir)
+    okay &= save_chain_pem(chain_pem, cert_dir)
+    okay &= save_fullchain_pem(cert_pem + chain_pem, cert_dir)
+    if not okay:
+        return (b'', b'')
+    return (cert_pem, chain_pem)
+
+
+def _order(certbot: CertbotHookData, ca_certbot: CACertbot,
+           acct: AcmeAccount, ssl_csr: SslCsr, challenge_type: str) -> str:
+    """
+    New order through to downloaded cert + chain pem
+    """
+    logs = Log().logs
+
+    payload: dict = {'identifiers': [{'type': 'dns', 'value': domain}
+                                     for domain in csr_domains(ssl_csr)]}
+    profile = ca_certbot.ca_info.ca_preferred_acme_profile
+    if profile and profile in acct.session.meta().get('profiles', {}):
+        payload['profile'] = profile
+
+    resp = acct.post(acct.session.url('newOrder'), payload)
+    order_url = resp.location()
+    order = resp.json()
+
+    authz_urls = acme_field(order, 'authorizations', list)
+    if not all(isinstance(url, str) for url in authz_urls):
+        raise AcmeError('unexpected response: authorizations not urls')
+    if order.get('status') == 'ready':
+        logs('    acme: all authorizations valid - no challenges')
+    else:
+        cached = _authorize(certbot, acct, authz_urls, challenge_type)
+        if cached and acct.post(order_url).json().get('status') == 'pending':
+            # CA no longer has some we cached
+            AcmeAuthzCache.drop(acct.kid, cached)
+            _authorize(certbot, acct, authz_urls, challenge_type,
+                       use_cache=False)
+
+    csr = ssl_csr.csr
+    if not csr:
+        raise AcmeError('no csr')
+    acct.post(acme_field(order, 'finalize'),
+              {'csr': b64url(csr.public_bytes(Encoding.DER))})
+    order = acct.poll(order_url, ('pending', 'ready', 'processing'),
+                      _VALIDATE_MAX_SECS)
+    if order.get('status') != 'valid':
+        raise AcmeError(f'order {order_url} is {order.get("status")}')
+
+    logs('    acme: order valid - downloading cert')
+    return _download(acct, acme_field(order, 'certificate'),
+                     ca_certbot.ca_info.ca_preferred_chain)
+
+
+def _account(certbot: CertbotHookData, session: AcmeSession,
+             email: str) -> AcmeAccount | None:
+    """
+    Account - may be shared (see acme_registry)
+    """
+    registry = acme_registry(certbot)
+    if not registry.lock():
+        return None
+    try:
+        if not registry.link_service():
+            return None
+        return acme_account(certbot.db.cb_dir, session, email)
+    finally:
+        registry.unlock()
+
+
+def _challenge_type(certbot: CertbotHookData, ca_certbot: CACertbot,
+                    ssl_csr: SslCsr) -> str:
+    """
+    Check input - return challenge type or '' if cant sign
+    """
+    apex_domain = certbot.apex_domain
+    if apex_domain != ssl_csr.svc.x509.CN:
+        txt = f'{apex_domain} != {ssl_csr.svc.x509.CN}'
+        Log().logs(f'Error: acme apex domain doesnt match csr: {txt}')
+        return ''
+
+    challenge_type = challenge_type_of(ca_certbot.ca_info.ca_validation)
+    if not check_challenge_input(certbot, challenge_type):
+        return ''
+    return challenge_type
+
+
+def acme_sign_cert(certbot: CertbotHookData,
+                   ca_certbot: CACertbot,
+                   ssl_csr: SslCsr
+                   ) -> tuple[bytes, bytes]:
+    """
+    Request a new cert - in process ACME client.
+    Returns (cert_pem, chain_pem) - empty on failure.
+    """
+    logger = Log()
+    logs = logger.logs
+
+    db_dir = certbot.db.db_dir
+    cert_dir = os.path.join(db_dir, ssl_csr.db_name)
+
+    apex_domain = certbot.apex_domain
+    logs(f'    Sign acme : {apex_domain}')
+    challenge_type = _challenge_type(certbot, ca_certbot, ssl_csr)
+    if not challenge_type:
+        return (b'', b'')
+
+    directory_url = _directory_url(certbot, ca_certbot)
+    if ca_certbot.debug:
+        logs(f'  debug: acme {directory_url} {csr_domains(ssl_csr)}')
+        logs('debug on - no cert/chain pem files generated')
+        return (b'', b'')
+
+    session = AcmeSession.get(directory_url,
+                              ca_certbot.ca_info.ca_acme_ca_bundle)
+    AcmeAuthzCache.initialize(certbot.opts.top_dir)
+    try:
+        acct = _account(certbot, session, ssl_csr.svc.x509.email)
+        if not acct:
+            logs(f'  Failed to get acme account {certbot.db.cb_dir}')
+            return (b'', b'')
+
+        pem = _order(certbot, ca_certbot, acct, ssl_csr, challenge_type)
+
+    except (AcmeError, KeyError) as err:
+        logs(f'Error: acme {apex_domain} : {err}')
+        return (b'', b'')
+
+    finally:
+        AcmeAuthzCache.save()
+
+    if ca_certbot.dry_run:
+        # like certbot --dry-run: nothing saved
+        logs('    acme: dry run - cert not saved')
+        return (read_pem(cert_dir, 'cert.pem'), read_pem(cert_dir, 'chain.pem'))
+
+    return _save(cert_dir, pem)
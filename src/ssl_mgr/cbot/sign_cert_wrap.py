@@ -13,11 +13,10 @@ from ssl_mgr.ca_sign import CACertbot
 from ssl_mgr.utils import Log
 
 from .certbothook import CertbotHook
-from .sign_cert import certbot_sign_cert
+from .acme_engine import acme_engine
 from .cleanup_http import cleanup_hook_http
 from .cleanup_dns import cleanup_hook_dns
 
-
 def _cleanup_auth(certbot: CertbotHook, ca_certbot: CACertbot):
     """
     Always clean up here as dont use certbot manual-cleanup-hook
@@ -62,7 +61,8 @@ def sign_cert_wrap(ca_certbot: CACertbot, db_dir: str, ssl_csr: SslCsr):
         logs(f'Error db_dir != certbot.db.db_dir: {txt}')
 
     # (cert_pem, chain_pem) = certbot.sign_cert(db_dir, ca_certbot, ssl_csr)
-    (cert_pem, chain_pem) = certbot_sign_cert(certbot, ca_certbot, ssl_csr)
+    sign_cert = acme_engine(ca_certbot)
+    (cert_pem, chain_pem) = sign_cert(certbot, ca_certbot, ssl_csr)
     _cleanup_auth(certbot, ca_certbot)
 
     return (cert_pem, chain_pem)
@@ -3,5 +3,6 @@
 """
 Comparison tools
 """
+from .hash_memo import HashMemo
 from .hash_file_data import hash_file_data
 from .compare_files import compare_files
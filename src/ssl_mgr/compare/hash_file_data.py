@@ -1,12 +1,16 @@
-# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-License-Identifier: GPL-2.0-or-later
 # SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
 """
 hash of contents of file
 """
 import os
 
+from cryptography.hazmat.primitives import hashes
+
 from ssl_mgr.utils import open_file
-from ssl_mgr.crypto_hash import (lookup_hash_algo, make_hash)
+from ssl_mgr.crypto_hash import lookup_hash_algo
+
+from .hash_memo import HashMemo
 
 
 def hash_file_data(fpath: str, comment_char: str = '') -> str:
@@ -34,6 +38,9 @@ def hash_file_data(fpath: str, comment_char: str = '') -> str:
     For dns files (like tlsa.rr) use comment_char = ';'
     Note - comments here are lines beginning with the comment char.
     Comments at end of line are left alone.
+
+    Lines are hashed as they are read. Hash is remembered
+    (see HashMemo) and reused while file size and mtime are unchanged.
     """
     hash_str = ''
 
@@ -41,37 +48,48 @@ def hash_file_data(fpath: str, comment_char: str = '') -> str:
     if not fpath:
         return hash_str
 
+    try:
+        stat = os.stat(fpath)
+    except OSError:
+        return hash_str
+
     if not os.path.isfile(fpath):
         return hash_str
 
+    memo_key = f'{comment_char} {os.path.abspath(fpath)}'
+    memo: str | None = HashMemo.get(memo_key, stat)
+    if memo is not None:
+        return memo
+
     # read file if exists
     fob = open_file(fpath, 'r')
     if not fob:
-        return hash_str
-
-    rows = fob.readlines()
-    fob.close()
+        return ''
 
     #
     # Data stripped and optionally no comment lines
     #
-    data = ''
-    for row in rows:
-        row_stripped = row.strip()
+    hash_algo = lookup_hash_algo('sha3-224')
+    digest = hashes.Hash(hash_algo)
+    have_data = False
 
-        if row_stripped == '':
-            continue
+    with fob:
+        for row in fob:
+            row_stripped = row.strip()
 
-        if comment_char and row_stripped.startswith(comment_char):
-            continue
+            if row_stripped == '':
+                continue
 
-        data += row_stripped + '\n'
+            if comment_char and row_stripped.startswith(comment_char):
+                continue
+
+            digest.update(row_stripped.encode() + b'\n')
+            have_data = True
 
     # If data is non-empty then hash it
-    if data:
-        bdata = data.encode()
-        hash_algo = lookup_hash_algo('sha3-224')
-        bhash = make_hash(bdata, hash_algo)
-        hash_str = bhash.hex()
+    hash_str = ''
+    if have_data:
+        hash_str = digest.finalize().hex()
 
+    HashMemo.put(memo_key, stat, hash_str)
     return hash_str
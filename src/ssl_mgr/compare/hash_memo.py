@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Remember file data hashes so unchanged files are not re-hashed.
+
+Keyed by file (and comment char) and valid while file's
+inode, size and mtime are unchanged.
+ - shared by all threads in process
+ - saved to <top_dir>/.cache/file-hashes.toml for later runs
+"""
+# pylint: disable=too-few-public-methods,duplicate-code
+from typing import Any
+import os
+import threading
+import time
+
+from ssl_mgr.utils import (read_toml_file, dict_to_toml_string)
+from ssl_mgr.utils import write_path_atomic
+
+
+def _stat_sig(stat: os.stat_result) -> list[int]:
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+class HashMemo:
+    """
+    Process wide memo of file data hashes.
+    Each entry : {'sig': [inode, size, mtime_ns], 'hash': <hex>}
+    """
+    racy_secs: int = 2
+    _entries: dict[str, dict[str, Any]] = {}
+    _path: str = ''
+    _dirty: bool = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def initialize(top_dir: str):
+        """
+        Load saved entries - once per process
+        """
+        if not top_dir:
+            return
+
+        path = os.path.join(top_dir, '.cache', 'file-hashes.toml')
+        with HashMemo._lock:
+            if HashMemo._path == path:
+                return
+            HashMemo._path = path
+            saved = read_toml_file(path).get('hashes', {})
+            saved.update(HashMemo._entries)
+            HashMemo._entries = saved
+
+    @staticmethod
+    def get(key: str, stat: os.stat_result) -> str | None:
+        """
+        Saved hash or None if not known or file changed.
+        """
+        with HashMemo._lock:
+            entry = HashMemo._entries.get(key)
+            if not entry or entry.get('sig') != _stat_sig(stat):
+                return None
+            return entry.get('hash', '')
+
+    @staticmethod
+    def put(key: str, stat: os.stat_result, hash_str: str):
+        """
+        Save hash of file with stat.
+        Skipped if file modified too recently for mtime
+        to be trusted to show the next change.
+        """
+        racy_ns = time.time_ns() - HashMemo.racy_secs * 1_000_000_000
+        if stat.st_mtime_ns >= racy_ns:
+            return
+
+        with HashMemo._lock:
+            HashMemo._entries[key] = {'sig': _stat_sig(stat),
+                                      'hash': hash_str}
+            HashMemo._dirty = True
+
+    @staticmethod
+    def save() -> bool:
+        """
+        Write memo to file.
+        Entries for files which no longer exist are dropped.
+        """
+        with HashMemo._lock:
+            if not (HashMemo._path and HashMemo._dirty):
+                return True
+
+            entries = {key: val for (key, val) in HashMemo._entries.items()
+                       if os.path.exists(key.split(' ', 1)[-1])}
+            HashMemo._entries = entries
+            HashMemo._dirty = False
+
+            data = dict_to_toml_string({'hashes': entries})
+            return write_path_atomic(data, HashMemo._path)
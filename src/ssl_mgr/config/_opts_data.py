@@ -46,6 +46,7 @@ class ConfServ:
     restart_cmd: list[str] = field(default_factory=list)
     server_dir: str = ''
     skip_prod_copy: bool = False     # testing or if server gets via NFS
+    restart_batch: int = 0           # rolling restarts: hosts at a time (0 = all)
 
     def from_dict(self, data_dict: dict[str, Any]):
         """
@@ -106,6 +107,7 @@ class SslOptsData:
     Input options/config data for ssl manger.
     """
     def __init__(self):
+        # pylint: disable=too-many-statements
         self.okay: bool = True
         self.conf_dir: str = get_conf_dir()
         self.top_dir: str = _top_dir(self.conf_dir)
@@ -142,15 +144,52 @@ class SslOptsData:
         self.renew: bool = False
         self.roll: bool = False
         self.min_roll_mins: int = 90
+        self.max_parallel_groups: int = 1    # groups run concurrently
+        self.max_parallel_services: int = 4  # services within a group
         self.certs_to_prod: bool = False
         self.dns_refresh: bool = False
         self.root_privs: bool = os.geteuid() == 0
 
         # config overrides these - may need longer delay
+        # dns_check_delay is the longest wait before first checking a
+        # nameserver - shortened for those seen to update quickly.
+        # dns_wait_max is limit on time waiting for nameservers.
         self.dns_check_delay: int = 240
+        self.dns_wait_max: int = 3600
         self.dns_xtra_ns: list[str] = ['1.1.1.1', '8.8.8.8',
                                        '9.9.9.9', '208.67.222.222']
 
+        # acme dns-01: certbot hooks arriving within dns_batch_window secs
+        # of each other are published together (up to dns_batch_max_wait)
+        self.dns_batch_window: int = 5
+        self.dns_batch_max_wait: int = 60
+
+        # timeout (secs) for each nameserver query when checking serials
+        self.dns_query_timeout: float = 5.0
+
+        # copy of production certs to remote servers:
+        # hosts copied at a time, rsync timeout (secs) and retries
+        self.prod_copy_jobs: int = 4
+        self.prod_copy_timeout: int = 120
+        self.prod_copy_retries: int = 2
+        self.prod_copy_retry_wait: int = 10
+
+        # previous generations of prod_cert_dir kept for rollback
+        self.prod_keep_gens: int = 3
+
+        # non-DNS server restarts: hosts restarted at a time
+        self.restart_jobs: int = 4
+
+        # ssh connection to each host shared by all ssh/scp/rsync
+        # master kept up to this many secs idle (0 = no sharing)
+        self.ssh_control_persist: int = 300
+
+        # acme account shared by: apex_domain, global or service
+        self.acme_account_scope: str = 'apex_domain'
+
+        # certbot auth hooks served by sslm-mgr (over unix socket)
+        self.auth_hook_server: bool = True
+
         self.post_copy_cmd: list[list[str]] = []
 
         self.groups: dict[str, list[dict[str, Any]]] = {}
@@ -32,7 +32,7 @@ class CAInfo():
     Would be more efficient to read file once and then pull
     each ca_info by name from that file. This is simpler.
     """
-    # pylint: disable=too-few-public-methods
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
     def __init__(self):
         """
         Should we limit preferred_acme_profile='tlsserver' for
@@ -45,6 +45,13 @@ class CAInfo():
         self.ca_preferred_chain: str = ''       # Not needed any longer with LE Gen Y root
         self.ca_preferred_acme_profile: str = 'tlsserver'
 
+        # certbot or native (in process acme client)
+        self.ca_acme_engine: str = 'certbot'
+        # native only: acme server (default letsencrypt) and its CA bundle
+        # e.g. for a local test server (pebble)
+        self.ca_acme_directory: str = ''
+        self.ca_acme_ca_bundle: str = ''
+
 
 class CAInfos:
     """
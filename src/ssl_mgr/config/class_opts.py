@@ -59,6 +59,7 @@ class SslOpts(SslOptsData):
         if not called_from_certbot:
             defaults = {'clean_keep': self.clean_keep,
                         'grps_svcs': self.grps_svcs,
+                        'max_parallel_groups': self.max_parallel_groups,
                         'min_roll_mins': self.min_roll_mins}
             opt_dict = parse_options(defaults)
             dict_to_opts(self, opt_dict)
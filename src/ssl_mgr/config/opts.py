@@ -59,6 +59,18 @@ def get_available_options(defaults: dict[str, str]):
                       'action': 'store_true'}
                      ))
 
+    jobs = '1'
+    if isinstance(defaults.get('max_parallel_groups'), int):
+        jobs = str(defaults.get('max_parallel_groups'))
+
+    ohelp = 'Number of groups to process in parallel'
+    ohelp += ' (config max_parallel_groups)'
+    std_opts.append((('-j', '--jobs'),
+                     {'help': ohelp,
+                      'dest': 'max_parallel_groups',
+                      'default': jobs}
+                     ))
+
     ohelp = 'Letsencrypt --dry-run'
     std_opts.append((('-n', '--dry-run'),
                      {'help': 'Letsencrypt --dry-run',
@@ -115,6 +115,30 @@ def check_options(opts: SslOptsData):
         logs(f'Info: clean_keep too small {txt}')
         opts.clean_keep = max(opts.clean_keep, clean_keep_min)
 
+    if opts.max_parallel_groups < 1:
+        txt = f'{opts.max_parallel_groups} resetting to 1'
+        logs(f'Info: max_parallel_groups too small {txt}')
+        opts.max_parallel_groups = 1
+
+    if opts.max_parallel_services < 1:
+        txt = f'{opts.max_parallel_services} resetting to 1'
+        logs(f'Info: max_parallel_services too small {txt}')
+        opts.max_parallel_services = 1
+
+    if opts.prod_copy_jobs < 1:
+        txt = f'{opts.prod_copy_jobs} resetting to 1'
+        logs(f'Info: prod_copy_jobs too small {txt}')
+        opts.prod_copy_jobs = 1
+
+    opts.prod_copy_retries = max(opts.prod_copy_retries, 0)
+
+    opts.prod_keep_gens = max(opts.prod_keep_gens, 0)
+
+    if opts.restart_jobs < 1:
+        txt = f'{opts.restart_jobs} resetting to 1'
+        logs(f'Info: restart_jobs too small {txt}')
+        opts.restart_jobs = 1
+
     if not _check_post_copy_command(opts):
         okay = False
 
@@ -115,4 +115,7 @@ def parse_options(defaults: dict[str, Any]) -> dict[str, Any]:
     if opt_dict.get('min_roll_mins'):
         opt_dict['min_roll_mins'] = int(opt_dict['min_roll_mins'])
 
+    if opt_dict.get('max_parallel_groups'):
+        opt_dict['max_parallel_groups'] = int(opt_dict['max_parallel_groups'])
+
     return opt_dict
@@ -21,6 +21,13 @@ from .save_pem import save_fullchain_pem
 from .save_pem import save_cert_pem
 from .save_pem import save_bundle
 
+from .pem_file import PemFile
+
+from .x509_cache import X509Cache
+from .x509_cache import pem_to_cert
+from .x509_cache import pem_to_csr
+from .x509_cache import pem_to_pubkey
+
 from .certinfo import CertInfo
 
 from .certinfo_utils import cert_info
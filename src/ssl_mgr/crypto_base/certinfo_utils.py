@@ -8,8 +8,6 @@ import cryptography
 from cryptography import x509
 from cryptography.x509 import NameOID
 from cryptography.x509 import Extensions
-from cryptography.x509 import load_pem_x509_certificate
-from cryptography.x509 import load_pem_x509_csr
 from cryptography.x509 import CertificateSigningRequest
 from cryptography.x509 import ObjectIdentifier
 from cryptography.x509 import NameAttribute
@@ -29,6 +27,7 @@ from .crypto_types import (KeyTypePrv, KeyTypePub)
 
 from .cert_expires import CertExpires
 from .certinfo import CertInfo
+from .x509_cache import (pem_to_cert, pem_to_csr)
 
 
 def cert_time_to_expire(cert: x509.Certificate) -> tuple[str, int]:
@@ -262,7 +261,7 @@ def cert_pem_info(cert_pem: bytes) -> CertInfo:
     """
     Extract info from certificate pem bytes
     """
-    cert = load_pem_x509_certificate(cert_pem)
+    cert = pem_to_cert(cert_pem)
     info = cert_info(cert)
 
     return info
@@ -294,7 +293,7 @@ def csr_pem_info(csr_pem: bytes) -> CertInfo:
     Extract info from CSR pem bytes
     """
     try:
-        csr = load_pem_x509_csr(csr_pem)
+        csr = pem_to_csr(csr_pem)
         info = csr_info(csr)
     except ValueError:
         info = CertInfo()
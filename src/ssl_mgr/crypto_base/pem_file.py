@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+PEM file loaded on demand and kept until the file changes.
+"""
+from typing import (Any, Callable)
+import os
+
+from ssl_mgr.utils import read_pem
+
+type FileSig = tuple[int, int, int] | None
+
+
+def _file_sig(path: str) -> FileSig:
+    """
+    (inode, mtime ns, size) or None if no file.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class PemFile:
+    """
+    Memoized pem (and object parsed from it) for one file.
+     - (re)read only when file (inode, mtime, size) changes
+       or after invalidate() (dirty).
+     - set() holds a pem not yet (or never) saved, e.g. a
+       newly generated key. It's kept until the file changes.
+    """
+    def __init__(self, db_dir: str, file: str):
+        self.db_dir: str = db_dir
+        self.file: str = file
+        self.dirty: bool = True
+        self.reads: int = 0
+
+        self._sig: FileSig = None
+        self._pem: bytes = b''
+        self._obj: Any = None
+
+    def set_dir(self, db_dir: str):
+        """
+        Dir changed - will be reloaded from new dir
+        """
+        if db_dir != self.db_dir:
+            self.db_dir = db_dir
+            self.dirty = True
+
+    def invalidate(self):
+        """
+        Force re-read on next use
+        """
+        self.dirty = True
+
+    @property
+    def path(self) -> str:
+        """ full path to file """
+        return os.path.join(self.db_dir, self.file)
+
+    @property
+    def pem(self) -> bytes:
+        """
+        The pem - read from file if changed
+        """
+        if not self.db_dir:
+            return b''
+
+        sig = _file_sig(self.path)
+        if self.dirty or sig != self._sig:
+            self._pem = read_pem(self.db_dir, self.file) if sig else b''
+            self._sig = sig
+            self._obj = None
+            self.dirty = False
+            self.reads += 1
+        return self._pem
+
+    def set(self, pem: bytes, obj: Any = None):
+        """
+        Use pem (and optionally its parsed object)
+        until the file is changed.
+        """
+        self._pem = pem
+        self._obj = obj
+        self._sig = _file_sig(self.path) if self.db_dir else None
+        self.dirty = False
+
+    def obj(self, loader: Callable[[bytes], Any]) -> Any:
+        """
+        Object parsed from pem using loader.
+        Parsed once and kept until pem changes.
+        """
+        pem = self.pem
+        if not pem:
+            return None
+        if self._obj is None:
+            self._obj = loader(pem)
+        return self._obj
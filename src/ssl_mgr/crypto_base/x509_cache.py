@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Cache of parsed x509 objects keyed by digest of their PEM.
+
+Expiry checks, cert info and tlsa hashes all need the parsed cert
+and are called several times per service. Parse each PEM once.
+ - shared by all threads in process
+ - bounded - least recently used dropped first
+"""
+# pylint: disable=too-few-public-methods
+from typing import Any, Callable
+from collections import OrderedDict
+import hashlib
+import threading
+
+from cryptography.x509 import Certificate, CertificateSigningRequest
+from cryptography.x509 import load_pem_x509_certificate
+from cryptography.x509 import load_pem_x509_csr
+
+from .crypto_types import (KeyTypePub, KeyTypePubOther)
+
+
+class X509Cache:
+    """
+    Process wide LRU of parsed objects.
+    Key is (kind, sha256 of pem) where kind is cert, csr or pubkey.
+    """
+    max_size: int = 256
+    hits: int = 0
+    misses: int = 0
+    _entries: OrderedDict[tuple[str, bytes], Any] = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(kind: str, pem: bytes, loader: Callable[[bytes], Any]) -> Any:
+        """
+        Parsed object for pem - loader(pem) only if not cached.
+        """
+        key = (kind, hashlib.sha256(pem).digest())
+        with X509Cache._lock:
+            if key in X509Cache._entries:
+                X509Cache._entries.move_to_end(key)
+                X509Cache.hits += 1
+                return X509Cache._entries[key]
+            X509Cache.misses += 1
+
+        # parse outside lock - worst case 2 threads parse same pem
+        obj = loader(pem)
+
+        with X509Cache._lock:
+            X509Cache._entries[key] = obj
+            X509Cache._entries.move_to_end(key)
+            while len(X509Cache._entries) > X509Cache.max_size:
+                X509Cache._entries.popitem(last=False)
+        return obj
+
+    @staticmethod
+    def stats() -> tuple[int, int, int]:
+        """
+        Return (hits, misses, num cached)
+        """
+        with X509Cache._lock:
+            return (X509Cache.hits, X509Cache.misses,
+                    len(X509Cache._entries))
+
+    @staticmethod
+    def stats_str() -> str:
+        """
+        Counters as text for logging
+        """
+        (hits, misses, size) = X509Cache.stats()
+        return f'{hits} hits, {misses} misses, {size} cached'
+
+
+def pem_to_cert(cert_pem: bytes) -> Certificate:
+    """
+    x509 Certificate from pem (cached)
+    """
+    return X509Cache.get('cert', cert_pem, load_pem_x509_certificate)
+
+
+def pem_to_csr(csr_pem: bytes) -> CertificateSigningRequest:
+    """
+    x509 CSR from pem (cached)
+    """
+    return X509Cache.get('csr', csr_pem, load_pem_x509_csr)
+
+
+def pem_to_pubkey(cert_pem: bytes) -> KeyTypePub | KeyTypePubOther:
+    """
+    Public key of certificate from pem (cached)
+    """
+    def _load_pubkey(pem: bytes) -> KeyTypePub | KeyTypePubOther:
+        return pem_to_cert(pem).public_key()   # type: ignore[return-value]
+
+    return X509Cache.get('pubkey', cert_pem, _load_pubkey)
@@ -9,11 +9,12 @@ Certs, chains, clients
 #
 
 import os
+from cryptography.x509 import Certificate
 
 from ssl_mgr.db import SslDb
 from ssl_mgr.config import SslOpts
 from ssl_mgr.config_service import ServiceConf
-from ssl_mgr.crypto_base import (read_chain_pem, read_cert_pem, read_fullchain_pem)
+from ssl_mgr.crypto_base import (PemFile, pem_to_cert)
 from ssl_mgr.crypto_csr import SslCsr
 
 from .class_key import SslKey
@@ -48,25 +49,17 @@ class CertData():
             self.is_ca = True
 
         #
-        # read existing certs, chains etc
+        # existing certs, chains, key and csr are read on demand
+        # and kept until their file changes (see PemFile)
         #  All in PEM format
         # todo: change attrib name: self.cert -> cert->cert_pem
         #
-        self.cert: bytes = b''
-        self.chain: bytes = b''
-        self.fullchain: bytes = b''
-        self.csr: SslCsr                # Data
         self.csr_pem: bytes = b''
-        self.key: SslKey
-
-        if self.db_dir:
-            self.cert = read_cert_pem(self.db_dir)
-            self.chain = read_chain_pem(self.db_dir)
-            self.fullchain = read_fullchain_pem(self.db_dir)
-
-        self.key = SslKey(self.db_name, self.svc, self.db)
-        self.csr = SslCsr(self.db_name, self.svc,
-                          self.db, is_ca=self.is_ca)
+        self.cert_file = PemFile(self.db_dir, 'cert.pem')
+        self.chain_file = PemFile(self.db_dir, 'chain.pem')
+        self.fullchain_file = PemFile(self.db_dir, 'fullchain.pem')
+        self._key: SslKey | None = None
+        self._csr: SslCsr | None = None
 
         #
         # If svc newer than cert - cert out of date
@@ -78,3 +71,63 @@ class CertData():
     def __getattr__(self, name: str):
         """ Unknown attribs return None instead of error """
         return None
+
+    @property
+    def cert(self) -> bytes:
+        """ cert pem """
+        return self.cert_file.pem
+
+    @cert.setter
+    def cert(self, pem: bytes):
+        self.cert_file.set(pem)
+
+    @property
+    def cert_x509(self) -> Certificate | None:
+        """ cert parsed from cert pem """
+        return self.cert_file.obj(pem_to_cert)
+
+    @property
+    def chain(self) -> bytes:
+        """ chain pem """
+        return self.chain_file.pem
+
+    @chain.setter
+    def chain(self, pem: bytes):
+        self.chain_file.set(pem)
+
+    @property
+    def fullchain(self) -> bytes:
+        """ fullchain pem """
+        return self.fullchain_file.pem
+
+    @fullchain.setter
+    def fullchain(self, pem: bytes):
+        self.fullchain_file.set(pem)
+
+    @property
+    def key(self) -> SslKey:
+        """ Private key - made on first use """
+        if self._key is None:
+            self._key = SslKey(self.db_name, self.svc, self.db)
+        return self._key
+
+    @property
+    def csr(self) -> SslCsr:
+        """ CSR - made on first use """
+        if self._csr is None:
+            self._csr = SslCsr(self.db_name, self.svc,
+                               self.db, is_ca=self.is_ca)
+        return self._csr
+
+    def update_dir(self):
+        """
+        Update db_dir after curr/next change.
+        Files are only re-read if they changed.
+        """
+        self.db_dir = os.path.join(self.db.db_dir, self.db_name)
+        for pem_file in (self.cert_file, self.chain_file, self.fullchain_file):
+            pem_file.set_dir(self.db_dir)
+        if self._key is not None:
+            self._key.refresh_paths()
+        if self._csr is not None:
+            self._csr.refresh_paths()
@@ -5,22 +5,16 @@ Certs, chains, clients
 """
 # pylint: disable=too-many-instance-attributes,invalid-name,too-many-arguments
 
-import os
-from cryptography.x509 import load_pem_x509_certificate
-
-from ssl_mgr.crypto_base import (read_chain_pem, read_cert_pem, read_fullchain_pem)
 from ssl_mgr.crypto_base import save_bundle
 from ssl_mgr.crypto_base import CertInfo
 from ssl_mgr.crypto_base import (cert_info, cert_expires, cert_time_to_expire)
 from ssl_mgr.crypto_base import CertExpires
 
 from ssl_mgr.crypto_hash import (cert_hash, csr_hash, pubkey_hash)
-from ssl_mgr.crypto_csr import SslCsr
 from ssl_mgr.ca_sign import (CACertbot)
 from ssl_mgr.cbot import sign_cert_wrap
 from ssl_mgr.utils import Log
 
-from .class_key import SslKey
 from .ca_self import CASelf
 from .ca_local import CALocal
 
@@ -204,7 +198,7 @@ class SslCert(CertData):
         """
         self.cert = cert_pem
         self.chain = chain_pem
-        self.fullchain = read_fullchain_pem(db_dir)
+        self.fullchain_file.invalidate()
 
         #
         # save bundle = key + fullchain
@@ -221,26 +215,19 @@ class SslCert(CertData):
         """
         After any change to curr/next then we
         update to ensure path references up to date
+         - nothing is re-read unless its file changed
         """
-        self.db_dir = os.path.join(self.db.db_dir, self.db_name)
-
-        self.key = SslKey(self.db_name, self.svc, self.db)
-        self.csr = SslCsr(self.db_name, self.svc, self.db, is_ca=self.is_ca)
-
-        self.cert = read_cert_pem(self.db_dir)
-        self.chain = read_chain_pem(self.db_dir)
-        self.fullchain = read_fullchain_pem(self.db_dir)
+        self.update_dir()
         return True
 
     def cert_expires(self) -> CertExpires | None:
         '''
         Returns this cert expiration as CertExpires
         '''
-        if not self.cert:
+        cert = self.cert_x509
+        if not cert:
             return None
 
-        cert_pem = self.cert
-        cert = load_pem_x509_certificate(cert_pem)
         expires = cert_expires(cert)
         return expires
 
@@ -250,9 +237,8 @@ class SslCert(CertData):
         """
         expiry_date_str = '-'
         days_left = -1
-        if self.cert:
-            cert_pem = self.cert
-            cert = load_pem_x509_certificate(cert_pem)
+        cert = self.cert_x509
+        if cert:
             (expiry_date_str, days_left) = cert_time_to_expire(cert)
         return (expiry_date_str, days_left)
 
@@ -261,8 +247,7 @@ class SslCert(CertData):
         Extract useful info from cert
         """
         info = CertInfo()
-        if self.cert:
-            cert_pem = self.cert
-            cert = load_pem_x509_certificate(cert_pem)
+        cert = self.cert_x509
+        if cert:
             info = cert_info(cert)
         return info
@@ -9,7 +9,7 @@ import os
 
 from ssl_mgr.db import SslDb
 from ssl_mgr.crypto_base import save_privkey_pem
-from ssl_mgr.crypto_base import read_privkey_pem
+from ssl_mgr.crypto_base import PemFile
 from ssl_mgr.config_service import ServiceConf
 
 from .keys import gen_key_rsa
@@ -28,28 +28,37 @@ class SslKey():
         self.keyopts: ServiceConf.KeyOpts = svc.keyopts
 
         self.key_dir: str = ''
-        self.privkey_pem: bytes = b''
         self.pubkey_pem: bytes = b''
         # self.privkey:
         # self.pubkey:
 
         self.db_dir = os.path.join(db.db_dir, db_name)
 
-        # Not error for no key
-        self.read_privkey()
+        # Not error for no key - read when first used
+        self.privkey_file = PemFile(self.db_dir, 'privkey.pem')
 
     def __getattr__(self, name: str):
         """ non-set items simply return None so easy to check existence"""
         return None
 
+    @property
+    def privkey_pem(self) -> bytes:
+        """ private key pem - read on demand """
+        return self.privkey_file.pem
+
+    @privkey_pem.setter
+    def privkey_pem(self, pem: bytes):
+        self.privkey_file.set(pem)
+
     def refresh_paths(self) -> bool:
         """
         After any change to curr/next update to ensure
         path references up to date
+         - key is re-read only if file changed
         """
         db_name = self.db_name
         self.db_dir = os.path.join(self.db.db_dir, db_name)
-        self.read_privkey()
+        self.privkey_file.set_dir(self.db_dir)
         return self.okay
 
     def save_privkey(self) -> bool:
@@ -63,7 +72,7 @@ class SslKey():
         """
         read priv key file
         """
-        self.privkey_pem = read_privkey_pem(self.db_dir)
+        self.privkey_file.invalidate()
         if not self.privkey_pem:
             return False
         return True
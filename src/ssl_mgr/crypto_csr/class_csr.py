@@ -5,8 +5,7 @@ Certificate Tools - CSR
 """
 # pylint: disable=too-many-instance-attributes,invalid-name
 
-from ssl_mgr.db import SslDb
-from ssl_mgr.config_service import ServiceConf
+import os
 
 from .csr_build import csr_generate
 from .csr_file import (read_csr, write_csr)
@@ -17,19 +16,6 @@ class SslCsr(SslCsrData):
     """
     Certificate Signing Request
     """
-    def __init__(self,
-                 db_name: str,
-                 svc: ServiceConf,
-                 db: SslDb,
-                 is_ca: bool = False):
-
-        super().__init__(db_name, svc, db, is_ca)
-
-        #
-        # read existing csr if available
-        #
-        self.read()
-
     def generate(self, privkey_pem: bytes) -> bool:
         """
         Make a CSR
@@ -41,11 +27,12 @@ class SslCsr(SslCsrData):
             self.okay = False
             return False
 
-        (self.csr, self.csr_pem) = csr_generate(self, privkey_pem)
-        if not self.csr:
+        (csr, csr_pem) = csr_generate(self, privkey_pem)
+        if not csr:
             print('Failed to make CSR')
             self.okay = False
             return False
+        self.csr_file.set(csr_pem, csr)
         return True
 
     def read(self) -> None:
@@ -53,7 +40,17 @@ class SslCsr(SslCsrData):
         read csr from file
          - ok to get nothing as may not be any CSR
         """
-        (self.csr, self.csr_pem) = read_csr(self.db_dir, self.file)
+        (csr, csr_pem) = read_csr(self.db_dir, self.file)
+        self.csr_file.set(csr_pem, csr)
+
+    def refresh_paths(self) -> bool:
+        """
+        After any change to curr/next update path.
+         - csr is re-read only if file changed
+        """
+        self.db_dir = os.path.join(self.db.db_dir, self.db_name)
+        self.csr_file.set_dir(self.db_dir)
+        return self.okay
 
     def save(self) -> bool:
         """ write csr to it's file """
@@ -10,6 +10,7 @@ import os
 from cryptography.x509 import CertificateSigningRequest
 
 from ssl_mgr.crypto_base import KeyTypePrv
+from ssl_mgr.crypto_base import (PemFile, pem_to_csr)
 from ssl_mgr.db import SslDb
 from ssl_mgr.config_service import ServiceConf
 
@@ -36,12 +37,15 @@ class SslCsrData():
         self.days_end: int = 3650        # csr self sig valid
         self.is_ca: bool = is_ca
 
-        self.csr: CertificateSigningRequest | None = None
-        self.csr_pem: bytes = b''
         self.key_pkey: KeyTypePrv | None = None
 
         self.db_dir = os.path.join(self.db.db_dir, db_name)
 
+        #
+        # csr_pem / csr read and parsed on demand
+        #
+        self.csr_file = PemFile(self.db_dir, self.file)
+
         #
         # Ensure is_ca is up to date
         #
@@ -50,3 +54,13 @@ class SslCsrData():
     def __getattr__(self, name: str):
         """ non-set items simply return None so easy to check existence"""
         return None
+
+    @property
+    def csr_pem(self) -> bytes:
+        """ csr in PEM format """
+        return self.csr_file.pem
+
+    @property
+    def csr(self) -> CertificateSigningRequest | None:
+        """ x509 csr parsed from csr_pem """
+        return self.csr_file.obj(pem_to_csr)
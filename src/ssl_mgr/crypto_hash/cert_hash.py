@@ -3,11 +3,10 @@
 """
 Certificate Hash
 """
-from cryptography.x509 import load_pem_x509_certificate
-from cryptography.x509 import load_pem_x509_csr
-
 from cryptography.hazmat.primitives import serialization
 
+from ssl_mgr.crypto_base import (pem_to_cert, pem_to_csr, pem_to_pubkey)
+
 from .hash import (lookup_hash_algo, make_hash)
 
 
@@ -19,7 +18,7 @@ def cert_hash(cert_pem: bytes, hash_type: str) -> str:
     if not cert_pem:
         return ''
 
-    cert = load_pem_x509_certificate(cert_pem)
+    cert = pem_to_cert(cert_pem)
 
     if hash_type:
         hash_algo = lookup_hash_algo(hash_type)
@@ -42,7 +41,7 @@ def csr_hash(csr_pem: bytes, hash_type: str) -> str:
     if not csr_pem:
         return ''
 
-    csr = load_pem_x509_csr(csr_pem)
+    csr = pem_to_csr(csr_pem)
     csr_bytes = csr.public_bytes(serialization.Encoding.DER)
 
     hash_algo = lookup_hash_algo(hash_type)
@@ -61,8 +60,7 @@ def pubkey_hash(cert_pem: bytes, hash_type: str,
     if not cert_pem:
         return ''
 
-    cert = load_pem_x509_certificate(cert_pem)
-    pub_key = cert.public_key()
+    pub_key = pem_to_pubkey(cert_pem)
 
     if serialize_fmt == "DER":
         encoding = serialization.Encoding.DER
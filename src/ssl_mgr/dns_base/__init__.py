@@ -8,4 +8,6 @@ from .dns_hash import dns_file_hash
 from .dns_restart import dns_restart
 from .dns_zone_update import dns_zone_update
 from .dns_server import init_primary_dns_server
+from .lazy_dns import LazySslDns
 from .rdata_format import (dns_tlsa_record_format, dns_txt_record_format)
+from .ns_stats import (NsStats, read_ns_stats)
@@ -13,7 +13,7 @@ from ssl_mgr.utils import Log
 
 from .dns import dns_resolver
 from .dns import auth_nameservers
-from .dns import dns_query
+from .dns import dns_query_cached
 
 
 def _mx_host_dict(mx_hosts_raw: list[str]) -> dict[str, str]:
@@ -64,6 +64,9 @@ class SslDnsData:
         self.mx_hosts: dict[str, str] = {}
 
         self.check_delay: int = -1
+        self.query_timeout: float = 5.0     # per query (async ns checks)
+        self.wait_max: int = 3600           # max secs for ns to update
+        self.top_dir: str = ''              # ns stats kept under here
         self.xtra_ns: list[str] = []
         self.okay: bool = True
 
@@ -80,7 +83,7 @@ class SslDnsData:
         #
         dns_ips: list[str] = [dns_primary]
         if not is_valid_cidr(dns_primary):
-            dns_ips = dns_query(self.stub_resolver, dns_primary, 'A')
+            dns_ips = dns_query_cached(self.stub_resolver, dns_primary, 'A')
 
         self.primary_resolver = dns_resolver(dns_ips, dns_port)
 
@@ -102,7 +105,7 @@ class SslDnsData:
                 if is_valid_cidr(xns):
                     self.xtra_ns.append(xns)
                 else:
-                    dns_ips = dns_query(self.stub_resolver, xns, 'A')
+                    dns_ips = dns_query_cached(self.stub_resolver, xns, 'A')
                     self.xtra_ns += dns_ips
 
         #
@@ -121,7 +124,8 @@ class SslDnsData:
                 self.checks[ns] = False
 
         if self.primary_resolver and self.apex_domain:
-            mx_hosts = dns_query(self.primary_resolver, self.apex_domain, 'MX')
+            mx_hosts = dns_query_cached(self.primary_resolver,
+                                        self.apex_domain, 'MX')
             #
             # mx_hosts = ['10 a.com', '20 b.com' ..]
             #  => {'10' : 'a.com', '20' : 'b.com', ..]
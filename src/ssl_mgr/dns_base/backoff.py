@@ -0,0 +1,37 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Polling wait times
+"""
+# pylint: disable=too-few-public-methods
+import random
+
+
+class Backoff:
+    """
+    Exponential backoff with jitter.
+      - start polling often (first wait is about 'first' secs)
+      - each wait grows by 'factor' up to 'max_wait' secs
+      - jitter spreads waits by +/- 'jitter' fraction so many
+        checks started together don't all query at same moment.
+    """
+    def __init__(self,
+                 first: float = 2.0,
+                 factor: float = 2.0,
+                 max_wait: float = 60.0,
+                 jitter: float = 0.2):
+        self.wait: float = first
+        self.factor: float = factor
+        self.max_wait: float = max_wait
+        self.jitter: float = jitter
+
+    def next_wait(self) -> float:
+        """
+        Return next wait time in seconds
+        """
+        wait = self.wait
+        self.wait = min(self.wait * self.factor, self.max_wait)
+
+        spread = wait * self.jitter
+        wait = random.uniform(wait - spread, wait + spread)
+        return max(wait, 0.0)
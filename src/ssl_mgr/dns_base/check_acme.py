@@ -4,34 +4,18 @@
 DNS tools
 """
 # pylint: disable=invalid-name,line-too-long,too-many-locals
+import asyncio
 import time
 
+import dns.asyncresolver
+
 from ssl_mgr.utils import (Log)
 
 from .dns import dns_serial, dns_query
+from .dns import (dns_resolver_async, dns_serial_async)
 from ._dns_data import SslDnsData
-
-
-def _wait_time_by_try(num_tries: int) -> int:
-    """
-    Returns seconds to wait
-    """
-    if num_tries < 3:
-        return 5
-
-    if num_tries < 5:
-        return 10
-
-    if num_tries < 10:
-        return 30
-
-    if num_tries < 20:
-        return 60
-
-    if num_tries < 40:
-        return 90
-
-    return 120
+from .backoff import Backoff
+from .ns_stats import NsStats
 
 
 def check_acme_challenges(ssl_dns: SslDnsData,
@@ -49,25 +33,24 @@ def check_acme_challenges(ssl_dns: SslDnsData,
         - get SOA serial number
         - check all nameservers (authoritative plus xtra) have correct serial
     """
-    #
-    # Pre check delay
-    #
     logger = Log()
     logs = logger.logs
 
-    check_delay = ssl_dns.check_delay
-    if check_delay > 0:
-        logs(f'check_acme_challenge pre check delay: {check_delay}')
-        time.sleep(check_delay)
+    #
+    # Propagation clock starts now (zones were just restarted)
+    # No up front delay - nameservers are polled with backoff
+    # and each starts after its own (learned) initial delay.
+    #
+    start = time.monotonic()
 
     #
     # Confirm primary has the challenges
-    # (should never fail)
+    # (should never fail - but signing may take a moment)
     #
     primary_ok = check_primary_challenges(ssl_dns, challenges)
-    if not primary_ok:
-        # ug - wait a minute and try again .. should not happen
-        time.sleep(60)
+    backoff = Backoff(first=2.0, max_wait=15.0)
+    while not primary_ok and time.monotonic() - start < 60:
+        time.sleep(backoff.next_wait())
         primary_ok = check_primary_challenges(ssl_dns, challenges)
 
     if not primary_ok:
@@ -78,7 +61,7 @@ def check_acme_challenges(ssl_dns: SslDnsData,
     #
     # Check all nameservers
     #
-    updated = check_nameservers_updated(ssl_dns)
+    updated = check_nameservers_updated(ssl_dns, start)
     return updated
 
 
@@ -111,14 +94,99 @@ def check_primary_challenges(ssl_dns: SslDnsData,
     return False
 
 
-def check_nameservers_updated(ssl_dns: SslDnsData) -> bool:
+async def _ns_updated(ns: str,
+                      resolver: dns.asyncresolver.Resolver,
+                      ssl_dns: SslDnsData,
+                      serial_primary: str,
+                      start: float) -> bool:
+    """
+    Poll one nameserver until it has serial_primary.
+    Each nameserver runs on its own schedule so a slow one
+    doesn't hold up checking the others.
+     - first check after the initial delay; dns_check_delay
+       unless stats show ns is historically faster.
+     - then poll with exponential backoff + jitter
+     - give up at start + wait_max
+    """
+    logger = Log()
+    log = logger.log
+    logs = logger.logs
+
+    apex_domain = ssl_dns.apex_domain
+    deadline = start + ssl_dns.wait_max
+
+    delay = NsStats.initial_delay(ns, ssl_dns.check_delay)
+    delay -= time.monotonic() - start
+    if delay > 0:
+        log(f' {ns} initial delay: {delay:.0f}')
+        await asyncio.sleep(delay)
+
+    backoff = Backoff()
+    num_tries = 0
+    while True:
+        (serial, timed_out) = await dns_serial_async(resolver, apex_domain)
+        if serial:
+            if serial == serial_primary:
+                secs = time.monotonic() - start
+                NsStats.add(ns, secs, serial)
+                logs(f' {ns} ok {serial_primary} ({secs:.0f} secs)')
+                return True
+            NsStats.add_serial(ns, serial)
+            log(f' {ns} serial {serial} != {serial_primary}')
+        else:
+            if timed_out:
+                NsStats.add_timeout(ns)
+            logs(f' ns {ns} failed to get serial')
+
+        num_tries += 1
+        wait_time = backoff.next_wait()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            NsStats.add_fail(ns)
+            return False
+        wait_time = min(wait_time, remaining)
+        log(f' {ns} try {num_tries} wait: {wait_time:.0f}')
+        await asyncio.sleep(wait_time)
+
+
+async def _nameservers_updated(ssl_dns: SslDnsData,
+                               serial_primary: str,
+                               start: float) -> list[str]:
+    """
+    Check all nameservers at same time.
+    Returns list of nameservers not updated
+    """
+    timeout = ssl_dns.query_timeout
+
+    checks = {}
+    for (ns, sync_resolver) in ssl_dns.resolvers.items():
+        resolver = dns_resolver_async(sync_resolver.nameservers,
+                                      sync_resolver.port, timeout)
+        checks[ns] = _ns_updated(ns, resolver, ssl_dns, serial_primary,
+                                 start)
+
+    results = await asyncio.gather(*checks.values())
+    pending = [ns for (ns, done) in zip(checks, results) if not done]
+    return pending
+
+
+def check_nameservers_updated(ssl_dns: SslDnsData,
+                              start: float | None = None) -> bool:
     """
     Check each nameserver has current serial
+     - all nameservers are queried concurrently (asyncio) with
+       per query timeout (ssl_dns.query_timeout).
+     - returns as soon as last nameserver has the primary serial.
+     - start (time.monotonic()) is when zone was updated, used
+       to measure propagation time of each nameserver.
     """
     logger = Log()
     log = logger.log
     logs = logger.logs
     logs('  check_acme: checking nameservers updated')
+
+    if start is None:
+        start = time.monotonic()
     #
     # Get primary serial
     #
@@ -129,50 +197,16 @@ def check_nameservers_updated(ssl_dns: SslDnsData) -> bool:
     #
     # Check all resolvers have correct serial
     #
-    wait_time = 5
-    max_tries = 50      # approx 1 hour
-    all_done = False
-    pending = [ns for (ns, resolver) in ssl_dns.resolvers.items()]
-    done = []
-
-    #
-    # Each "try" is one check of every authorized plus xtra name servers
-    #
-    num_tries = 0
+    NsStats.initialize(ssl_dns.top_dir)
 
     log('Checking nameservers for current acme-challenges')
-    while not all_done:
-        for (ns, resolver) in ssl_dns.resolvers.items():
-            #
-            # check all the authorized name servers
-            #
-            if ns in done:
-                continue
-
-            serial = dns_serial(resolver, apex_domain)
-            if serial:
-                if serial == serial_primary:
-                    done.append(ns)
-                    pending.remove(ns)
-                    logs(f' {ns} ok {serial_primary}')
-                else:
-                    log(f' {ns} serial {serial} != {serial_primary}')
-            else:
-                logs(f' ns {ns} failed to get serial')
-
-        if len(pending) < 1:
-            all_done = True
-            break
-
-        logs(f' pending: {pending} try {num_tries}')
-        num_tries += 1
-        if num_tries >= max_tries:
-            txt = f'{apex_domain}: {pending}'
-            logs(f'Err: nameserver(s) not updated: {txt}')
-            return False
-
-        wait_time = _wait_time_by_try(num_tries)
-        logs(f' wait: {wait_time}')
-        time.sleep(wait_time)
-
+    pending = asyncio.run(_nameservers_updated(ssl_dns, serial_primary,
+                                               start))
+    if not NsStats.save():
+        logs('Warning: failed to save nameserver stats')
+
+    if pending:
+        txt = f'{apex_domain}: {pending}'
+        logs(f'Err: nameserver(s) not updated: {txt}')
+        return False
     return True
@@ -4,8 +4,14 @@
 DNS tools
 """
 # pylint: disable=invalid-name,line-too-long
+from collections.abc import Sequence
+
 import dns
 import dns.resolver
+import dns.asyncresolver
+import dns.nameserver
+
+from .dns_cache import DnsCache
 
 
 def auth_nameservers(apex_domain: str,
@@ -24,26 +30,17 @@ def auth_nameservers(apex_domain: str,
     """
     ns_list: dict[str, str] = {}
 
-    try:
-        response = primary_resolver.resolve(apex_domain, 'NS')
+    nameservers = dns_query_cached(primary_resolver, apex_domain, 'NS')
+    for this_ns in nameservers:
+        # primary then stub - if returns multiepl IPs
+        # then we take the first. We want a 1-1 map
+        # of nameserver -> ip (no alternates)
+        ips = dns_query_cached(primary_resolver, this_ns, 'A')
+        if not ips:
+            ips = dns_query_cached(stub_resolver, this_ns, 'A')
 
-    except dns.exception.DNSException:
-        # unable to get answer from DNS
-        # means nds server is unavailable
-        return ns_list
-
-    if response.rrset:
-        for rec in response.rrset:
-            this_ns = rec.to_text()
-            # primary then stub - if returns multiepl IPs
-            # then we take the first. We want a 1-1 map
-            # of nameserver -> ip (no alternates)
-            ips = dns_query(primary_resolver, this_ns, 'A')
-            if not ips:
-                ips = dns_query(stub_resolver, this_ns, 'A')
-
-            if ips:
-                ns_list[this_ns] = ips[0]
+        if ips:
+            ns_list[this_ns] = ips[0]
 
     return ns_list
 
@@ -70,34 +67,65 @@ def dns_resolver(server: str | list[str] = '',
     return resolver
 
 
-def dns_query(resolver: dns.resolver.Resolver,
-              query: str,
-              rr_type: str
-              ) -> list[str]:
+def _dns_resolve(resolver: dns.resolver.Resolver,
+                 query: str,
+                 rr_type: str
+                 ) -> tuple[list[str], int]:
     """
-    This uses stub resolver
+    Returns (rrs, ttl)
       - strip quotes around any response (TXT records)
+      - A records return list of ips
     """
     rrs: list[str] = []
 
     try:
         res = resolver.resolve(query, rr_type)
     except dns.exception.DNSException:
-        return rrs
+        return (rrs, 0)
 
     if not (res and res.rrset):
-        return rrs
+        return (rrs, 0)
 
     if rr_type == 'A':
-        ips = []
         for rec in res.rrset:
-            ip = rec.address
-            ips.append(ip)
-        return ips
+            rrs.append(rec.address)
+    else:
+        for record in res.rrset:
+            rrs.append(record.to_text().strip('"'))
+
+    return (rrs, res.rrset.ttl)
 
-    for record in res.rrset:
-        rrs.append(record.to_text().strip('"'))
 
+def dns_query(resolver: dns.resolver.Resolver,
+              query: str,
+              rr_type: str
+              ) -> list[str]:
+    """
+    This uses stub resolver
+      - strip quotes around any response (TXT records)
+    """
+    (rrs, _ttl) = _dns_resolve(resolver, query, rr_type)
+    return rrs
+
+
+def dns_query_cached(resolver: dns.resolver.Resolver,
+                     query: str,
+                     rr_type: str
+                     ) -> list[str]:
+    """
+    As dns_query but answer is cached for its TTL (see DnsCache).
+    For data that rarely changes : NS, MX and A of name servers / hosts.
+    """
+    servers = ','.join(str(ns) for ns in resolver.nameservers)
+    key = f'{servers}:{resolver.port} {query} {rr_type}'
+
+    rrs = DnsCache.get(key)
+    if rrs is not None:
+        return rrs
+
+    (rrs, ttl) = _dns_resolve(resolver, query, rr_type)
+    if rrs:
+        DnsCache.put(key, rrs, ttl)
     return rrs
 
 
@@ -117,3 +145,43 @@ def dns_serial(resolver: dns.resolver.Resolver,
         # only 1 SOA record
         serial = res.rrset[0].serial
     return serial
+
+
+def dns_resolver_async(server: str | Sequence[str | dns.nameserver.Nameserver],
+                       port: int = 53,
+                       timeout: float = 5.0
+                       ) -> dns.asyncresolver.Resolver:
+    """
+    initialize an asyncio resolver instance (no caching)
+      server  - one address or a sequence of them (or dns Nameservers
+                e.g. from a sync resolver's nameservers)
+      timeout - is per query (lifetime) in seconds
+    """
+    resolver = dns.asyncresolver.Resolver(configure=False)
+    if isinstance(server, str):
+        resolver.nameservers = [server]
+    else:
+        resolver.nameservers = list(server)
+    resolver.port = int(port)
+    resolver.lifetime = timeout
+    return resolver
+
+
+async def dns_serial_async(resolver: dns.asyncresolver.Resolver,
+                           apex_domain: str) -> tuple[str, bool]:
+    """
+    async version of dns_serial
+    Returns (serial, timed_out)
+    """
+    serial = ''
+
+    try:
+        res = await resolver.resolve(apex_domain, 'SOA')
+    except dns.exception.Timeout:
+        return (serial, True)
+    except dns.exception.DNSException:
+        return (serial, False)
+
+    if res and res.rrset:
+        serial = res.rrset[0].serial
+    return (serial, False)
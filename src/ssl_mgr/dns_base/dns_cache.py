@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Cache of dns lookup results which rarely change (NS, MX, A).
+
+Every group and every certbot hook builds an SslDns which looks up
+the auth nameservers of the apex domain, their IPs, IPs of
+dns_xtra_ns and the MX hosts. Answers are kept until their TTL expires.
+ - shared by all threads in process
+ - saved to <top_dir>/.dns-stats/dns-cache.toml so the certbot
+   hook processes (and later runs) can use them too. Saves are
+   merged under a file lock as those processes save at same time.
+
+Only used for these 'static' lookups - never for SOA serials or
+acme-challenge TXT records which must always be live.
+"""
+# pylint: disable=too-few-public-methods
+from typing import Any
+import os
+import threading
+import time
+
+from ssl_mgr.utils import (read_file, dict_to_toml_string,
+                           toml_string_to_dict)
+from ssl_mgr.utils import update_file_locked
+from ssl_mgr.utils import Log
+
+
+def _drop_expired(entries: dict[str, dict[str, Any]], now: float
+                  ) -> dict[str, dict[str, Any]]:
+    """
+    Return copy with expired entries removed
+    """
+    return {key: val for (key, val) in entries.items()
+            if val.get('expires', 0) > now}
+
+
+def _parse_cache(data: str) -> dict[str, dict[str, Any]]:
+    """
+    Entries from file content - none if damaged
+    """
+    if not data:
+        return {}
+    cache_dict = toml_string_to_dict(data) or {}
+    return cache_dict.get('cache', {})
+
+
+class DnsCache:
+    """
+    Process wide cache with TTL based eviction.
+    Key is "<server>:<port> <query> <rr_type>"
+    Each entry : {'expires': <epoch secs>, 'rrs': [...]}
+    """
+    _entries: dict[str, dict[str, Any]] = {}
+    _path: str = ''
+    _dirty: bool = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def initialize(top_dir: str):
+        """
+        Load saved (unexpired) entries - once per process
+        """
+        if not top_dir:
+            return
+
+        path = os.path.join(top_dir, '.dns-stats', 'dns-cache.toml')
+        with DnsCache._lock:
+            if DnsCache._path == path:
+                return
+            DnsCache._path = path
+            try:
+                data = read_file(os.path.dirname(path), os.path.basename(path))
+            except ValueError:
+                data = ''
+            saved = _parse_cache(data)
+            saved = _drop_expired(saved, time.time())
+            saved.update(DnsCache._entries)
+            DnsCache._entries = saved
+
+    @staticmethod
+    def get(key: str) -> list[str] | None:
+        """
+        Cached rrs or None if not cached or expired
+        """
+        with DnsCache._lock:
+            entry = DnsCache._entries.get(key)
+            if not entry:
+                return None
+            if entry.get('expires', 0) <= time.time():
+                del DnsCache._entries[key]
+                return None
+            return list(entry.get('rrs', []))
+
+    @staticmethod
+    def put(key: str, rrs: list[str], ttl: int):
+        """
+        Add result which is good for ttl seconds
+        """
+        if ttl <= 0:
+            return
+        with DnsCache._lock:
+            DnsCache._entries[key] = {'expires': time.time() + ttl,
+                                      'rrs': list(rrs)}
+            DnsCache._dirty = True
+
+    @staticmethod
+    def save() -> bool:
+        """
+        Write cache to file, merged with whatever
+        other processes saved in the meantime.
+        """
+        with DnsCache._lock:
+            if not (DnsCache._path and DnsCache._dirty):
+                return True
+
+            def _merge(data: str) -> str:
+                entries = _parse_cache(data)
+                entries.update(DnsCache._entries)
+                entries = _drop_expired(entries, time.time())
+                DnsCache._entries = entries
+                return dict_to_toml_string({'cache': entries})
+
+            okay = update_file_locked(DnsCache._path, _merge, Log().logs)
+            if okay:
+                DnsCache._dirty = False
+            return okay
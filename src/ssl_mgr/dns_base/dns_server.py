@@ -10,6 +10,7 @@ from ssl_mgr.utils import Log
 from ssl_mgr.config import SslOpts
 
 from .class_dns import SslDns
+from .dns_cache import DnsCache
 
 
 def init_primary_dns_server(opts: SslOpts,
@@ -82,10 +83,19 @@ def init_primary_dns_server(opts: SslOpts,
 
     #
     # Initialize dns to use
+    # NS, MX, A lookups are cached (shared with certbot hooks)
     #
+    DnsCache.initialize(opts.top_dir)
+
     check_delay = opts.dns_check_delay
     xtra_ns = opts.dns_xtra_ns
     ssl_dns = SslDns(apex_domain, dns_server, dns_port, check_delay, xtra_ns)
+    DnsCache.save()
+    if opts.dns_query_timeout and opts.dns_query_timeout > 0:
+        ssl_dns.query_timeout = opts.dns_query_timeout
+    if opts.dns_wait_max and opts.dns_wait_max > 0:
+        ssl_dns.wait_max = opts.dns_wait_max
+    ssl_dns.top_dir = opts.top_dir
     if not ssl_dns.okay:
         log('Error - DNS unavailable')
     return ssl_dns
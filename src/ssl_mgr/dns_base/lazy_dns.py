@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Lazy SslDns
+"""
+# pylint: disable=too-few-public-methods
+import threading
+
+from ssl_mgr.config import SslOpts
+from ssl_mgr.utils import Log
+
+from .class_dns import SslDns
+from .dns_server import init_primary_dns_server
+
+
+class LazySslDns:
+    """
+    Holds what is needed to make the SslDns for an apex domain
+    but only does so (with its dns lookups) on first use.
+    Read only tasks (e.g. --status) never touch dns.
+    Safe to share between services running in parallel.
+    """
+    def __init__(self, opts: SslOpts, apex_domain: str):
+        self.opts: SslOpts = opts
+        self.apex_domain: str = apex_domain
+        self.ssl_dns: SslDns | None = None
+        self.initialized: bool = False
+        self.lock = threading.Lock()
+
+    def get(self) -> SslDns | None:
+        """
+        Return SslDns - made on first call.
+        Returns None if dns primary config is unusable.
+        Caller should check ssl_dns.okay.
+        An AttributeError while setting up is raised as RuntimeError.
+        """
+        with self.lock:
+            if self.initialized:
+                return self.ssl_dns
+            self.initialized = True
+
+            try:
+                self.ssl_dns = init_primary_dns_server(self.opts,
+                                                       self.apex_domain)
+            except ValueError:
+                self.ssl_dns = None
+            except AttributeError as err:
+                # callers are properties of classes with __getattr__
+                # which would quietly turn this into None
+                txt = f'{self.apex_domain} primary dns setup bug : {err}'
+                Log().logs(f'Error: {txt}')
+                raise RuntimeError(txt) from err
+
+            if not (self.ssl_dns and self.ssl_dns.okay):
+                logger = Log()
+                txt = f'{self.apex_domain} failed initialize primary dns server'
+                logger.logs(f'Error: {txt}')
+            return self.ssl_dns
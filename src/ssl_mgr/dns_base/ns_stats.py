@@ -0,0 +1,203 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Nameserver propagation history kept across runs.
+
+Written each time nameservers are checked for the primary's serial.
+Used to shorten the initial wait before checking nameservers
+which historically get the new zone quickly, and to help tune
+dns_check_delay / dns_xtra_ns (see sslm-mgr --status).
+  <top_dir>/.dns-stats/ns-stats.toml
+
+  [ns."ns1.example.com."]
+    conv_secs = 42.0        # average secs to reach primary serial
+    last_secs = 38.5        # most recent
+    max_secs = 95.0
+    count = 12              # times seen to reach primary serial
+    timeouts = 2            # queries with no answer in time
+    fails = 0               # times gave up waiting (dns_wait_max)
+    last_serial = '2026101801'
+    last_date = '20261018-10:22:01'
+"""
+from typing import Any
+import os
+import threading
+
+from ssl_mgr.utils import (read_file, dict_to_toml_string, toml_string_to_dict)
+from ssl_mgr.utils import update_file_locked
+from ssl_mgr.utils import current_date_time_str
+from ssl_mgr.utils import Log
+
+type NsEvent = tuple[str, str, float, str]
+
+
+class NsStats:
+    """
+    Process wide nameserver propagation history.
+    Events from this run are kept and merged into the
+    file on save() (under file lock) as other threads and
+    processes may also update it.
+    """
+    alpha: float = 0.3          # weight of newest sample
+    min_count: int = 3          # samples needed before we trust it
+    delay_frac: float = 0.75    # initial delay as fraction of conv_secs
+
+    _path: str = ''
+    _ns: dict[str, dict[str, Any]] = {}
+    _events: list[NsEvent] = []
+    _lock = threading.Lock()
+
+    @staticmethod
+    def initialize(top_dir: str):
+        """
+        Load saved history - once per process
+        """
+        if not top_dir:
+            return
+
+        path = ns_stats_path(top_dir)
+        with NsStats._lock:
+            if NsStats._path == path:
+                return
+            NsStats._path = path
+            NsStats._ns = read_ns_stats(top_dir) or {}
+            for event in NsStats._events:
+                _apply_event(NsStats._ns, event, NsStats.alpha)
+
+    @staticmethod
+    def initial_delay(ns: str, max_delay: float) -> float:
+        """
+        Seconds to wait before first check of ns.
+        Never more than max_delay (dns_check_delay)
+        """
+        if max_delay <= 0:
+            return 0.0
+
+        with NsStats._lock:
+            item = NsStats._ns.get(ns)
+            if not item or item.get('count', 0) < NsStats.min_count:
+                return max_delay
+            conv_secs = item.get('conv_secs', max_delay)
+
+        delay = NsStats.delay_frac * conv_secs
+        return min(delay, max_delay)
+
+    @staticmethod
+    def add(ns: str, secs: float, serial: str = ''):
+        """
+        ns reached primary serial after secs
+        """
+        NsStats._event(('conv', ns, secs, serial))
+
+    @staticmethod
+    def add_serial(ns: str, serial: str):
+        """
+        ns answered with (not yet current) serial
+        """
+        NsStats._event(('serial', ns, 0.0, serial))
+
+    @staticmethod
+    def add_timeout(ns: str):
+        """
+        ns query got no answer
+        """
+        NsStats._event(('timeout', ns, 0.0, ''))
+
+    @staticmethod
+    def add_fail(ns: str):
+        """
+        gave up waiting for ns
+        """
+        NsStats._event(('fail', ns, 0.0, ''))
+
+    @staticmethod
+    def _event(event: NsEvent):
+        with NsStats._lock:
+            NsStats._events.append(event)
+            _apply_event(NsStats._ns, event, NsStats.alpha)
+
+    @staticmethod
+    def save() -> bool:
+        """
+        Merge this run's events into file.
+        File re-read (under lock) as other processes may have updated it.
+        """
+        with NsStats._lock:
+            if not NsStats._path or not NsStats._events:
+                return True
+
+            def _merge(data: str) -> str:
+                stats = _parse_stats(data) or {}
+                for event in NsStats._events:
+                    _apply_event(stats, event, NsStats.alpha)
+                NsStats._ns = stats
+                return dict_to_toml_string({'ns': stats})
+
+            okay = update_file_locked(NsStats._path, _merge, Log().logs)
+            if okay:
+                NsStats._events = []
+            return okay
+
+
+def ns_stats_path(top_dir: str) -> str:
+    """
+    File with nameserver history
+    """
+    return os.path.join(top_dir, '.dns-stats', 'ns-stats.toml')
+
+
+def read_ns_stats(top_dir: str) -> dict[str, dict[str, Any]] | None:
+    """
+    Saved nameserver history keyed by nameserver.
+    None if file can't be parsed.
+    """
+    path = ns_stats_path(top_dir)
+    try:
+        data = read_file(os.path.dirname(path), os.path.basename(path))
+    except ValueError:
+        return None
+    return _parse_stats(data)
+
+
+def _parse_stats(data: str) -> dict[str, dict[str, Any]] | None:
+    """
+    Stats from file content - None if not valid toml
+    """
+    if not data:
+        return {}
+    stats_dict = toml_string_to_dict(data)
+    if stats_dict is None:
+        return None
+    return stats_dict.get('ns', {})
+
+
+def _apply_event(stats: dict[str, dict[str, Any]], event: NsEvent,
+                 alpha: float):
+    """
+    Update ns history with one event
+    """
+    (kind, ns, secs, serial) = event
+    item = stats.get(ns)
+    if not item:
+        item = {'count': 0, 'timeouts': 0, 'fails': 0}
+        stats[ns] = item
+
+    item['last_date'] = current_date_time_str()
+    if serial:
+        item['last_serial'] = str(serial)
+
+    match kind:
+        case 'conv':
+            secs = round(secs, 1)
+            conv_secs = item.get('conv_secs', secs)
+            conv_secs = alpha * secs + (1.0 - alpha) * conv_secs
+            item['conv_secs'] = round(conv_secs, 1)
+            item['last_secs'] = secs
+            item['max_secs'] = max(item.get('max_secs', 0.0), secs)
+            item['count'] = item.get('count', 0) + 1
+
+        case 'timeout':
+            item['timeouts'] = item.get('timeouts', 0) + 1
+
+        case 'fail':
+            item['fails'] = item.get('fails', 0) + 1
@@ -4,6 +4,7 @@
  Track what changed
 """
 # pylint: disable=too-many-instance-attributes, too-few-public-methods
+import threading
 from dataclasses import (dataclass, field)
 
 
@@ -18,18 +19,42 @@ class GroupChange:
     dns_changed: bool = False
     depends: set = field(default_factory=set)
 
+    # services may run in parallel and update us
+    _lock: threading.Lock = field(default_factory=threading.Lock,
+                                  repr=False, compare=False)
+
     def add_svc_name(self, svc_name: str):
         """ add one service name to list """
-        self.svc_names.append(svc_name)
-        self.cert_changed = True
-        self.depends.add('cert')
+        with self._lock:
+            self.svc_names.append(svc_name)
+            self.cert_changed = True
+            self.depends.add('cert')
+
+    def add_svc_change(self, svc_name: str,
+                       curr_changed: bool, next_changed: bool):
+        """
+        Record one service's cert changes (thread safe).
+        """
+        if not (curr_changed or next_changed):
+            return
+
+        with self._lock:
+            if curr_changed:
+                self.curr_cert_changed = True
+            if next_changed:
+                self.next_cert_changed = True
+            self.cert_changed = True
+            if svc_name not in self.svc_names:
+                self.svc_names.append(svc_name)
+            self.depends.add('cert')
 
     def set_tlsa_changed(self):
         """ mark tlsa/dns """
-        self.tlsa_changed = True
-        self.dns_changed = True
-        self.depends.add('tlsa')
-        self.depends.add('dns')
+        with self._lock:
+            self.tlsa_changed = True
+            self.dns_changed = True
+            self.depends.add('tlsa')
+            self.depends.add('dns')
 
 
 class GroupChanges:
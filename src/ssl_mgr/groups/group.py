@@ -27,13 +27,15 @@ class SslGroup(GroupData):
         """
         return execute_tasks(self)
 
-    def to_production(self, prod_group_dir: str) -> bool:
+    def to_production(self, prod_group_dir: str,
+                      svc_names: list[str] | None = None) -> bool:
         """
         Copy certs/keys, tlsa file -> <prod_group_dir>/<service>/xxx.pem
         ssl_mgr requests this if all groups comeplete without error
             we do not do it here even if this group has no errors
+        If svc_names given only those services are copied.
         """
-        return group_to_production(self, prod_group_dir)
+        return group_to_production(self, prod_group_dir, svc_names)
 
     def cleanup(self):
         """
@@ -7,8 +7,7 @@
 import os
 
 from ssl_mgr.config import (SslOpts, is_wildcard_services)
-from ssl_mgr.utils import Log
-from ssl_mgr.dns_base import (SslDns, init_primary_dns_server, dns_file_hash)
+from ssl_mgr.dns_base import (SslDns, LazySslDns, dns_file_hash)
 from ssl_mgr.db import SslDb
 from ssl_mgr.services import Service
 
@@ -29,9 +28,11 @@ class GroupData():
         self.grp_name: str = grp_name   # If not CA this is apex_domain name
         self.apex_domain: str = grp_name
         self.opts: SslOpts = opts
-        self.ssl_dns: SslDns | None = None
         self.svcs: list[str] = svcs
 
+        # dns is only set up when first needed (see ssl_dns)
+        self.lazy_dns: LazySslDns = LazySslDns(opts, grp_name)
+
         # hash lets us know if anything changed
         self.tlsa_path: str = ''             # Final tlsa.<apex_domain> file
         self.tlsa_hash_before: str = ''
@@ -44,14 +45,6 @@ class GroupData():
         self.db: SslDb
         top_dir: str = opts.top_dir
 
-        self.ssl_dns = init_primary_dns_server(opts, grp_name)
-        if not self.ssl_dns.okay:
-            logger = Log()
-            logs = logger.logs
-            logs('Error: failed initialize primary dns server')
-            self.okay = False
-            return
-
         self.db = SslDb(opts.top_dir, grp_name, '')
 
         # check state of tlsa file
@@ -78,7 +71,8 @@ class GroupData():
         # initialize each service
         #
         for svc_name in svcs:
-            this_service = Service(grp_name, svc_name, self.opts, self.ssl_dns)
+            this_service = Service(grp_name, svc_name, self.opts,
+                                   self.lazy_dns)
             if this_service.okay:
                 self.services.append(this_service)
             else:
@@ -90,6 +84,16 @@ class GroupData():
         self.task_mgr = TaskMgr(self.opts)
         self.change = GroupChange()
 
+    @property
+    def ssl_dns(self) -> SslDns | None:
+        """
+        dns for this apex domain - made on first use
+        (TLSA generation, acme checks)
+        """
+        if not self.lazy_dns:
+            return None
+        return self.lazy_dns.get()
+
     def __getattr__(self, name):
         """ non-set items simply return None so easy to check existence"""
         return None
@@ -25,16 +25,20 @@ def check_tlsa_changed(group: GroupData) -> bool:
     return False
 
 
-def group_to_production(group: GroupData, prod_group_dir: str) -> bool:
+def group_to_production(group: GroupData, prod_group_dir: str,
+                        svc_names: list[str] | None = None) -> bool:
     """
     Copy all certs/keys -> production area:
         <prod_group_dir>/<service>/xxx.pem
+    If svc_names is not None, only copy those services.
     """
     logger = Log()
     logger.logs(f'\n{group.grp_name} : to production')
 
     for svc in group.services:
         svc_name = svc.svc_name
+        if svc_names is not None and svc_name not in svc_names:
+            continue
         svc_dir = os.path.join(prod_group_dir, svc_name)
         svc.to_production(svc_dir)
         if not svc.okay:
@@ -117,6 +121,81 @@ def execute_tasks_one_svc(group: GroupData, svc: Service) -> bool:
     return True
 
 
+def _execute_tasks_svc(group: GroupData, svc: Service) -> bool:
+    """
+    All tasks for 1 service and record any cert change
+    """
+    logger = Log()
+    logs = logger.logs
+    logsv = logger.logsv
+
+    tasks = group.task_mgr.tasks
+    change = group.change
+
+    logs(f'  {svc.svc_name}')
+
+    if tasks.renew_cert:
+        (is_time_to_renew, expires_text) = svc.time_to_renew()
+
+        if not is_time_to_renew:
+            logs(expires_text, opt='mspace')
+            return True
+        logsv(expires_text, opt='mspace')
+
+    if not execute_tasks_one_svc(group, svc):
+        group.okay = False
+        return False
+
+    # check if one or both of curr/next cert changed
+    (curr_changed, next_changed) = svc.check_cert_changed()
+    change.add_svc_change(svc.svc_name, curr_changed, next_changed)
+
+    if curr_changed or next_changed:
+        txt1 = f'{svc.svc_name} (curr, next)'
+        txt2 = f' ({curr_changed}, {next_changed})'
+        logsv(f'  cert changed: {txt1} = {txt2}')
+    return True
+
+
+def _execute_tasks_svcs(group: GroupData) -> bool:
+    """
+    Run each service's tasks.
+    Services are independent until the tlsa merge, so
+    they run in parallel (opts.max_parallel_services).
+    CA services run in order as one may sign the next.
+    Log output of each service is kept together and
+    written in service order.
+    """
+    jobs = group.opts.max_parallel_services
+    if not jobs or jobs < 1:
+        jobs = 1
+
+    is_ca = group.grp_name.lower() == 'ca'
+    if is_ca or jobs == 1 or len(group.services) < 2:
+        for svc in group.services:
+            if not _execute_tasks_svc(group, svc):
+                return False
+        return True
+
+    logger = Log()
+    futures = logger.map_buffered(_execute_tasks_svc,
+                                  [(group, svc) for svc in group.services],
+                                  jobs)
+
+    okay = True
+    for future in futures:
+        exc = future.exception()
+        if exc is not None:
+            logger.logs(f'  Error: {exc}')
+            okay = False
+        elif not future.result():
+            okay = False
+
+    if not okay:
+        group.okay = False
+    return okay
+
+
 def execute_tasks(group: GroupData) -> bool:
     """
     Do the requested tasks
@@ -133,44 +212,14 @@ def execute_tasks(group: GroupData) -> bool:
 
     #
     # Order tasks: key, csr, cert then next-to-curr
-    # Do all tasks for 1 service
+    # Do all tasks for each service
     #
-    tasks = group.task_mgr.tasks
-
     # track if any certs changed
     change = group.change
 
-    for svc in group.services:
-        logs(f'  {svc.svc_name}')
-
-        if tasks.renew_cert:
-            (is_time_to_renew, expires_text) = svc.time_to_renew()
-
-            if not is_time_to_renew:
-                logs(expires_text, opt='mspace')
-                continue
-            logsv(expires_text, opt='mspace')
-
-        if not execute_tasks_one_svc(group, svc):
-            group.okay = False
-            return False
-
-        # check if one or both of curr/next cert changed
-        (curr_changed, next_changed) = svc.check_cert_changed()
-        if curr_changed:
-            change.curr_cert_changed = True
-
-        if next_changed:
-            change.next_cert_changed = True
-
-        if curr_changed or next_changed:
-            change.cert_changed = True
-
-        if change.cert_changed:
-            change.add_svc_name(svc.svc_name)
-            txt1 = f'{svc.svc_name} (curr, next)'
-            txt2 = f' ({curr_changed}, {next_changed})'
-            logsv(f'  cert changed: {txt1} = {txt2}')
+    if not _execute_tasks_svcs(group):
+        group.okay = False
+        return False
 
     #
     # update domain level tlsa  file
@@ -5,3 +5,4 @@ services
 """
 from .class_service import Service
 from ._service_data import ServiceData
+from .class_state import SvcState
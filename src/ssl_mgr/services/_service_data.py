@@ -10,7 +10,7 @@ import time
 from ssl_mgr.utils import Log
 from ssl_mgr.config import (SslOpts, CAInfo)
 from ssl_mgr.db import SslDb
-from ssl_mgr.dns_base import SslDns
+from ssl_mgr.dns_base import (SslDns, LazySslDns)
 from ssl_mgr.config_service import ServiceConf
 from ssl_mgr.ca_sign import (CACertbot)
 from ssl_mgr.crypto_cert import CASelf
@@ -24,7 +24,7 @@ class ServiceData():
     Group can be CA (Own or letencrypt) or Client (i.e. one domain)
     """
     def __init__(self, grp_name: str, svc_name: str,
-                 opts: SslOpts, ssl_dns: SslDns | None):
+                 opts: SslOpts, lazy_dns: LazySslDns | None):
         """
         grp_name := 'ca'
         """
@@ -33,7 +33,7 @@ class ServiceData():
         self.apex_domain: str = grp_name
         self.svc_name: str = svc_name
         self.opts: SslOpts = opts
-        self.ssl_dns: SslDns | None = ssl_dns
+        self.lazy_dns: LazySslDns | None = lazy_dns
 
         #
         # Service details (includes conf.d/group/service)
@@ -75,6 +75,15 @@ class ServiceData():
         self.curr_cert_changed = False
         self.next_cert_changed = False
 
+    @property
+    def ssl_dns(self) -> SslDns | None:
+        """
+        Group's dns - made on first use
+        """
+        if not self.lazy_dns:
+            return None
+        return self.lazy_dns.get()
+
     def __getattr__(self, name):
         """ Unknown attribs return None instead of error """
         return None
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Content manifest of a service's curr and next.
+
+Kept in each service db dir and updated whenever a change is seen.
+A cert has changed only if the content of curr or next
+(everything copied to production) differs from the manifest -
+touching files or copying them with different times is not a change.
+
+  <db_dir>/cert-manifest.toml
+
+  [curr]
+    db_name = '20261018-10:22:01'
+    [curr.files]
+      'cert.pem' = '<sha256 hex>'
+      ...
+  [next]
+    ...
+"""
+from typing import Any
+import os
+import hashlib
+
+from ssl_mgr.utils import (read_toml_file, dict_to_toml_string)
+from ssl_mgr.utils import write_path_atomic
+
+type DbContent = dict[str, str]
+
+
+def cert_manifest_path(db_dir: str) -> str:
+    """
+    Manifest file in service db dir
+    """
+    return os.path.join(db_dir, 'cert-manifest.toml')
+
+
+def read_cert_manifest(db_dir: str) -> dict[str, Any] | None:
+    """
+    Saved manifest or None if there isn't one yet
+    """
+    path = cert_manifest_path(db_dir)
+    if not os.path.exists(path):
+        return None
+    return read_toml_file(path)
+
+
+def write_cert_manifest(db_dir: str, manifest: dict[str, Any]) -> bool:
+    """
+    Save manifest
+    """
+    data = dict_to_toml_string(manifest)
+    return write_path_atomic(data, cert_manifest_path(db_dir))
+
+
+def db_content(db_path: str) -> DbContent:
+    """
+    sha256 (hex) of each file in db_path (curr or next).
+    Empty if no db_path.
+    """
+    content: DbContent = {}
+    if not db_path or not os.path.isdir(db_path):
+        return content
+
+    with os.scandir(db_path) as scan:
+        for entry in scan:
+            if entry.name.endswith('.tmp') or not entry.is_file():
+                continue
+            try:
+                with open(entry.path, 'rb') as fobj:
+                    content[entry.name] = hashlib.sha256(fobj.read()).hexdigest()
+            except OSError:
+                continue
+    return content
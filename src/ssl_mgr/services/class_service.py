@@ -7,10 +7,10 @@
 # pylint: disable=too-many-instance-attributes
 
 from ssl_mgr.config import SslOpts
-from ssl_mgr.dns_base import SslDns
+from ssl_mgr.dns_base import LazySslDns
 from ssl_mgr.utils import Log
 
-from .service_tasks import (check_curr_cert_changed, check_next_cert_changed)
+from .service_tasks import check_cert_changed
 from .service_tasks import (new_key_pair, new_next, new_csr, new_cert)
 from .service_tasks import (copy_curr_to_next, next_to_curr)
 from .service_tasks import (renew_cert, roll_next_to_curr)
@@ -29,11 +29,11 @@ class Service(ServiceData):
     Group can be CA (Own or letencrypt) or Client (i.e. one domain)
     """
     def __init__(self, grp_name: str, svc_name: str,
-                 opts: SslOpts, ssl_dns: SslDns | None):
+                 opts: SslOpts, lazy_dns: LazySslDns | None):
         """
         Use base class ServiceData
         """
-        super().__init__(grp_name, svc_name, opts, ssl_dns)
+        super().__init__(grp_name, svc_name, opts, lazy_dns)
         if not self.okay:
             return
 
@@ -56,10 +56,8 @@ class Service(ServiceData):
         return cert_status(self)
 
     def check_cert_changed(self):
-        """ check for changed cert """
-        curr_changed = check_curr_cert_changed(self)
-        next_changed = check_next_cert_changed(self)
-        return (curr_changed, next_changed)
+        """ check for changed cert - by content """
+        return check_cert_changed(self)
 
     def to_production(self, prod_svc_dir: str) -> bool:
         """
@@ -6,11 +6,15 @@
 # pylint: disable=too-few-public-methods
 # pylint: disable=invalid-name
 import os
+import threading
+import time
 
 # from services import Service
 from ._service_data import ServiceData
 
-from .state_time import read_state_time
+from .state_time import (read_state_dir_times, dir_time)
+
+type StateSig = tuple[int, str, str, int, int]
 
 
 def _check_ready_done(predicates: list[tuple[bool, int]],
@@ -139,7 +143,16 @@ class SvcStatus:
 class SvcState:
     """
     Status of curr and next
+
+    update() skips the rescan if neither curr/next nor
+    their dir times (nor the generation) changed since the last one.
     """
+    # counts for all services - see stats_str()
+    counts: dict[str, int] = {'updates': 0, 'skipped': 0,
+                              'scans': 0, 'stats': 0}
+    _counts_lock = threading.Lock()
+    racy_secs: int = 2
+
     def __init__(self, service: ServiceData):
         self.service = service
 
@@ -149,15 +162,49 @@ class SvcState:
         # NB status key is filename with extension removed
         self.fnames = ['privkey.pem', 'csr.pem', 'cert.pem', 'tlsa.rr']
 
+        # bump to force rescan - see changed()
+        self.generation: int = 0
+        self._seen: StateSig | None = None
+
         self.update()
 
+    def changed(self):
+        """
+        Files may have changed without the dir changing
+        (e.g. rewritten in place by another program).
+        Next update() will rescan.
+        """
+        self.generation += 1
+
     def update(self):
         """
         Update times and ready/done
         """
+        db = self.service.db
+        pcurr = db.get_curr_path() or ''
+        pnext = db.get_next_path() or ''
+
+        sig = (self.generation, pcurr, pnext, dir_time(pcurr), dir_time(pnext))
+        SvcState.count('stats', len([pdir for pdir in (pcurr, pnext) if pdir]))
+        if sig == self._seen:
+            SvcState.count('skipped', 1)
+            return
+        SvcState.count('updates', 1)
+
         self.update_times()
         self.update_ready_done()
 
+        #
+        # Dir time only tells us something changed if it's
+        # older than the file system's time resolution (e.g. nfs).
+        # If too recent, rescan next time too.
+        #
+        racy_ns = time.time_ns() - self.racy_secs * 1_000_000_000
+        if sig[3] < racy_ns and sig[4] < racy_ns:
+            self._seen = sig
+        else:
+            self._seen = None
+
     def update_times(self):
         """
         Get updated times of each key file
@@ -169,7 +216,7 @@ class SvcState:
         pcurr = db.get_curr_path()
         pnext = db.get_next_path()
 
-        # get latest file times
+        # get latest file times - one dir scan each
         read_state_times(pcurr, self.fnames, self.curr)
         read_state_times(pnext, self.fnames, self.next)
 
@@ -194,15 +241,39 @@ class SvcState:
         self.curr.update_ready_done()
         self.next.update_ready_done()
 
+    @staticmethod
+    def count(name: str, num: int):
+        """
+        Add to counts
+        """
+        with SvcState._counts_lock:
+            SvcState.counts[name] += num
+
+    @staticmethod
+    def stats_str() -> str:
+        """
+        Counts as text for logging
+        """
+        with SvcState._counts_lock:
+            counts = dict(SvcState.counts)
+        txt = f'{counts["updates"]} updates, {counts["skipped"]} skipped'
+        txt += f', {counts["scans"]} dir scans, {counts["stats"]} file stats'
+        return txt
+
 
 def read_state_times(state_dir: str, fnames: list[str], status: SvcStatus):
     """
     For each state component, check file exists and get its mtime
     status name is filename with extension stripped off
     store result in status.
+     - one scan of state_dir gets them all
     """
+    (mtimes, num_stats) = read_state_dir_times(state_dir, fnames)
+    if state_dir:
+        SvcState.count('scans', 1)
+        SvcState.count('stats', num_stats)
+
     for fname in fnames:
         key_name = os.path.splitext(fname)[0]
         key_name = f'{key_name}_time'
-        mtime_ns = read_state_time(state_dir, fname)
-        setattr(status, key_name, mtime_ns)
+        setattr(status, key_name, mtimes[fname])
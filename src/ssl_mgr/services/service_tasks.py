@@ -9,16 +9,55 @@ from ssl_mgr.tlsa import (TlsaItem, tlsa_generate_file)
 from ssl_mgr.utils import Log
 
 from .copy_key_csr import copy_key_csr
+from .cert_manifest import (read_cert_manifest, write_cert_manifest)
+from .cert_manifest import db_content
 from .service_time import (time_to_renew, log_cert_expiry, time_to_roll)
 from ._service_data import ServiceData
 
 
+def check_cert_changed(service: ServiceData) -> tuple[bool, bool]:
+    """
+    determine if curr and/or next cert changed.
+     - changed means content of curr/next (what goes to production)
+       differs from the service's cert manifest - file times are ignored.
+     - no manifest yet (e.g. first run) then fall back to file times.
+    Manifest is updated to current content.
+    Returns (curr_changed, next_changed)
+    """
+    db = service.db
+    manifest = read_cert_manifest(db.db_dir)
+
+    new_manifest: dict[str, dict] = {}
+    changed: dict[str, bool] = {}
+    for lname in ('curr', 'next'):
+        files = db_content(db.get_path(lname))
+        new_manifest[lname] = {'db_name': db.db_names.get(lname) or '',
+                               'files': files}
+        if manifest is not None:
+            saved = manifest.get(lname, {}).get('files', {})
+            changed[lname] = files != saved
+
+    if manifest is None:
+        changed['curr'] = check_curr_cert_changed(service)
+        changed['next'] = check_next_cert_changed(service)
+
+    opts = service.opts
+    if new_manifest != manifest and not (opts.debug or opts.dry_run):
+        if not write_cert_manifest(db.db_dir, new_manifest):
+            logger = Log()
+            logger.logs(f'Warning: failed to save cert manifest in {db.db_dir}')
+
+    service.curr_cert_changed = changed['curr']
+    service.next_cert_changed = changed['next']
+    return (changed['curr'], changed['next'])
+
+
 def check_next_cert_changed(service: ServiceData) -> bool:
     """
     determine if next cert changed
     - at start no next and have next -> changed
     - time next/cert > time of cert at start
-    - instead of time should we retrieve the fingerprint?
+    - only used until there is a cert manifest
     """
     if service.next_cert_changed:
         return service.next_cert_changed
@@ -39,7 +78,7 @@ def check_curr_cert_changed(service: ServiceData) -> bool:
     determine if curr cert changed if:
       - at start no curr and have curr
       - time curr/cert != time of cert at start (should we enforce newer)
-    - instead of time should we retrieve the fingerprint?
+    - only used until there is a cert manifest
     """
     if service.curr_cert_changed:
         return service.curr_cert_changed
@@ -161,6 +200,8 @@ def new_cert(service: ServiceData) -> bool:
         logs(f'Error creating cert: {txt}')
         return False
 
+    # certbot writes its own files
+    service.state.changed()
     refresh_paths(service)
     service.next_cert_changed = True
 
@@ -291,9 +332,15 @@ def _tlsa_generate_file(service: ServiceData, lname: str) -> bool:
     """
     Wrap call to tlsa_generate_file()
     """
-    if not service.svc.dane_tls or not service.ssl_dns:
+    if not service.svc.dane_tls:
         return True
 
+    ssl_dns = service.ssl_dns
+    if not (ssl_dns and ssl_dns.okay):
+        logger = Log()
+        logger.logs(f'Error: {service.apex_domain} tlsa needs dns')
+        return False
+
     tlsa_item = TlsaItem()
 
     tlsa_item.apex_domain = service.apex_domain
@@ -303,7 +350,7 @@ def _tlsa_generate_file(service: ServiceData, lname: str) -> bool:
     tlsa_item.dane_tls_ttl = service.svc.dane_tls_ttl
     tlsa_item.db = service.db
     tlsa_item.cert = service.cert
-    tlsa_item.ssl_dns = service.ssl_dns
+    tlsa_item.ssl_dns = ssl_dns
 
     # tlsa_item.logs = service.logs
 
@@ -6,9 +6,8 @@ Push curr keys/certs to designated directory
 # pylint: disable=duplicate-code, too-many-locals
 import os
 
-from pyconcurrent import run_prog
-
 from ssl_mgr.utils import make_dir_path
+from ssl_mgr.utils import mirror_dir
 from ssl_mgr.utils import remove_path
 from ssl_mgr.utils import Log
 
@@ -24,6 +23,8 @@ def service_to_production(svc: ServiceData, prod_svc_dir: str) -> bool:
        both. After the roll - then prod curr will be updated and next is
        left and is actually then identical to the new curr
        If dont want this just copy 'curr'.
+     - local copy is done in process (mirror_dir) - rsync is
+       only used for remote hosts.
     """
     opts = svc.opts
     if not os.path.exists(prod_svc_dir):
@@ -56,16 +57,11 @@ def service_to_production(svc: ServiceData, prod_svc_dir: str) -> bool:
         # copy contents to production
         #
         src = os.path.abspath(db_dir)
-        src = f'{src}/'
-
-        pargs = ['/usr/bin/rsync', '-a', '--delete', '--mkpath', src, dst]
 
         if opts.debug:
-            logs(f'    {pargs}')
+            logs(f'    mirror {src} -> {dst}')
         else:
             logs(f'    {lname} {db_name}')
-            test = opts.debug
-            (ret, _out, _err) = run_prog(pargs, test=test, verb=True)
-            if ret != 0:
+            if not mirror_dir(src, dst):
                 return False
     return True
@@ -21,3 +21,40 @@ def read_state_time(fdir: str, fname: str) -> int:
     except OSError:
         return 0
     return stat.st_mtime_ns
+
+
+def read_state_dir_times(fdir: str, fnames: list[str]
+                         ) -> tuple[dict[str, int], int]:
+    """
+    One scan of fdir for all fnames.
+    Returns ({fname: mtime_ns}, number of files stat'ed)
+     - missing files have time 0
+     - only files present are stat'ed
+    """
+    mtimes = dict.fromkeys(fnames, 0)
+    if not fdir:
+        return (mtimes, 0)
+
+    num_stats = 0
+    try:
+        with os.scandir(fdir) as scan:
+            for entry in scan:
+                if entry.name not in mtimes:
+                    continue
+                try:
+                    mtimes[entry.name] = entry.stat().st_mtime_ns
+                    num_stats += 1
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return (mtimes, num_stats)
+
+
+def dir_time(fdir: str) -> int:
+    """
+    Dir mtime in nanosecs or 0 if no dir.
+    Changes whenever a file in it is added, removed or
+    replaced (all our writes are write + rename).
+    """
+    return read_state_time(fdir, '')
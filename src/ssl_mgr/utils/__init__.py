@@ -10,6 +10,7 @@ from .read_write import write_file
 from .read_write import read_pem
 from .read_write import write_pem
 from .read_write import write_path_atomic, copy_file_atomic
+from .update_locked import (write_path_unique, update_file_locked)
 
 from .read_file_time import read_file_time
 
@@ -25,9 +26,13 @@ from .file_tools import rename_backup
 from .file_tools import get_file_time_ns
 
 from .remove_path import remove_path
+from .mirror_dir import mirror_dir
+from .ssh_mux import SshMux
 
 from .toml import read_toml_file
 from .toml import write_toml_file
+from .toml import dict_to_toml_string
+from .toml import toml_string_to_dict
 
 from .cidr import (is_valid_ip4, is_valid_ip6, is_valid_cidr)
 from .class_log import (Log, LogZone)
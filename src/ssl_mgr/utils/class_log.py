@@ -11,7 +11,11 @@ such as leading spaces,  dashes and warn/info/error.
 """
 # pylint: disable=missing-function-docstring
 # pylint: disable=global-statement
+from collections.abc import Callable
+from concurrent.futures import (Future, ThreadPoolExecutor)
+from typing import Any
 import os
+import threading
 from enum import Enum
 
 import logging
@@ -200,15 +204,24 @@ class LogZone(Enum):
     CERTBOT = 1
 
 
+type _Buffered = tuple[str, str, str | list[str] | None]
+
+
 class Log:
     """
     Handle all logging
+
+    Threads running tasks in parallel can buffer their output
+    (buffer_start/buffer_flush) so each task logs as one block
+    rather than interleaved lines.
     """
     _zone: LogZone = LogZone.GENERAL
     _general: _SslLog
     _certbot: _SslLog
     _log: _SslLog
     _initialized: bool = False
+    _thread = threading.local()
+    _flush_lock = threading.Lock()
 
     @staticmethod
     def initialize(logdir: str, zone: LogZone = LogZone.GENERAL):
@@ -230,25 +243,104 @@ class Log:
     def is_initialized():
         return Log._initialized
 
+    @staticmethod
+    def _emit(kind: str, msg: str, opt: str | list[str] | None):
+        if not Log._initialized:
+            return
+        buffer = Log.buffer_get()
+        if buffer is not None:
+            buffer.append((kind, msg, opt))
+            return
+        getattr(Log._log, kind)(msg, opt)
+
     @staticmethod
     def log(msg: str, opt: str | list[str] | None = None):
-        if Log._initialized:
-            Log._log.log(msg, opt)
+        Log._emit('log', msg, opt)
 
     @staticmethod
     def logs(msg: str, opt: str | list[str] | None = None):
-        if Log._initialized:
-            Log._log.logs(msg, opt)
+        Log._emit('logs', msg, opt)
 
     @staticmethod
     def logv(msg: str, opt: str | list[str] | None = None):
-        if Log._initialized:
-            Log._log.logv(msg, opt)
+        Log._emit('logv', msg, opt)
 
     @staticmethod
     def logsv(msg: str, opt: str | list[str] | None = None):
-        if Log._initialized:
-            Log._log.logsv(msg, opt)
+        Log._emit('logsv', msg, opt)
+
+    @staticmethod
+    def buffer_start():
+        """
+        Hold this thread's log output until buffer_flush()
+        """
+        Log._thread.buffer = []
+
+    @staticmethod
+    def buffer_get() -> list[_Buffered] | None:
+        """
+        This thread's log buffer or None if not buffering
+        """
+        return getattr(Log._thread, 'buffer', None)
+
+    @staticmethod
+    def buffer_flush(dest: list[_Buffered] | None = None):
+        """
+        Write out this thread's buffered log as one block.
+        If dest is given (buffer of the thread which started us)
+        then append to that instead so nesting keeps its order.
+        """
+        buffer = Log.buffer_get()
+        Log._thread.buffer = None
+        if not buffer:
+            return
+
+        with Log._flush_lock:
+            if dest is not None:
+                dest.extend(buffer)
+                return
+            for (kind, msg, opt) in buffer:
+                getattr(Log._log, kind)(msg, opt)
+
+    @staticmethod
+    def buffer_replay(entries: list[_Buffered]):
+        """
+        Log previously buffered entries (see buffer_flush dest)
+        from this thread - they go to this thread's buffer if it has one.
+        """
+        for (kind, msg, opt) in entries:
+            Log._emit(kind, msg, opt)
+
+    @staticmethod
+    def run_buffered(out: list[_Buffered], func: Callable[..., Any],
+                     *args: Any) -> Any:
+        """
+        Worker: func(*args) with its log output saved in out
+        (for later buffer_replay). Returns what func returns.
+        """
+        Log.buffer_start()
+        try:
+            return func(*args)
+        finally:
+            Log.buffer_flush(dest=out)
+
+    @staticmethod
+    def map_buffered(func: Callable[..., Any], args_list: list[tuple],
+                     jobs: int) -> list[Future]:
+        """
+        Run func(*args) for each args in args_list, up to jobs at
+        same time. Log output of each is replayed in args_list order
+        once all are done.
+        Returns the (finished) futures in same order.
+        """
+        outs: list[list[_Buffered]] = [[] for _args in args_list]
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+            futures = [pool.submit(Log.run_buffered, out, func, *args)
+                       for (args, out) in zip(args_list, outs)]
+
+        for out in outs:
+            Log.buffer_replay(out)
+        return futures
 
     @staticmethod
     def set_verb(verb: bool):
@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Local directory mirror - in process replacement for 'rsync -a --delete'
+"""
+import os
+import shutil
+
+from .class_log import Log
+
+
+def _copy_keep_owner(src: str, dst: str) -> str:
+    """
+    copy2 (data, mode and times) and, if we can, owner
+    """
+    shutil.copy2(src, dst, follow_symlinks=False)
+    if os.geteuid() == 0:
+        stat = os.lstat(src)
+        os.lchown(dst, stat.st_uid, stat.st_gid)
+    return dst
+
+
+def mirror_dir(src_dir: str, dst_dir: str) -> bool:
+    """
+    Make dst_dir an exact copy of src_dir.
+     - modes, times (and owner if root) preserved
+     - anything in dst_dir not in src_dir is gone
+     - copy is made in a staging dir beside dst_dir (same file system)
+       then renamed into place, so dst_dir is never partially updated.
+       (There is a brief moment between the 2 renames when dst_dir is absent.)
+    """
+    logger = Log()
+    logs = logger.logs
+
+    src_dir = os.path.normpath(src_dir)
+    dst_dir = os.path.normpath(dst_dir)
+    stage_dir = f'{dst_dir}.stage'
+    old_dir = f'{dst_dir}.old'
+
+    for tmp_dir in (stage_dir, old_dir):
+        if os.path.lexists(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    try:
+        os.makedirs(os.path.dirname(dst_dir), exist_ok=True)
+        shutil.copytree(src_dir, stage_dir, symlinks=True,
+                        copy_function=_copy_keep_owner)
+        if os.geteuid() == 0:
+            stat = os.stat(src_dir)
+            os.chown(stage_dir, stat.st_uid, stat.st_gid)
+
+        if os.path.lexists(dst_dir):
+            os.rename(dst_dir, old_dir)
+        os.rename(stage_dir, dst_dir)
+
+    except OSError as err:
+        logs(f'Error: mirror {src_dir} -> {dst_dir} : {err}')
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        if os.path.isdir(old_dir) and not os.path.lexists(dst_dir):
+            os.rename(old_dir, dst_dir)
+        return False
+
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return True
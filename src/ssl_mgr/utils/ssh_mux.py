@@ -0,0 +1,154 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Shared ssh connections (ssh ControlMaster) - one per host.
+
+All ssh, scp and rsync to a host share one connection for the run:
+ - control sockets: <top_dir>/.ssh-mux/<hash of host>
+ - first use of host starts the master connection, which stays up
+   (ControlPersist) so later uses - including from certbot hooks
+   (separate processes) - skip the ssh handshake.
+ - close_all() at end of run stops every master connection.
+   ControlPersist (ssh_control_persist secs idle) is the backstop
+   should we not get that far.
+ - ssh_control_persist = 0 turns this off.
+"""
+# pylint: disable=too-few-public-methods
+import hashlib
+import os
+import subprocess
+import threading
+
+
+class _HostStats:
+    """ uses of one host """
+    def __init__(self):
+        self.uses: int = 0
+        self.reused: int = 0
+
+
+class SshMux:
+    """
+    Process wide ssh ControlMaster settings and stats.
+    """
+    _mux_dir: str = ''
+    _persist: int = 0
+    _stats: dict[str, _HostStats] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def initialize(top_dir: str, persist: int):
+        """
+        Turn on connection sharing (if persist > 0)
+        """
+        if not top_dir or persist <= 0:
+            SshMux._mux_dir = ''
+            return
+
+        mux_dir = os.path.join(top_dir, '.ssh-mux')
+        try:
+            os.makedirs(mux_dir, mode=0o700, exist_ok=True)
+            os.chmod(mux_dir, 0o700)
+        except OSError:
+            return
+        SshMux._mux_dir = mux_dir
+        SshMux._persist = persist
+
+    @staticmethod
+    def _socket(host: str) -> str:
+        """
+        Control socket - kept short as unix socket paths are limited
+        """
+        name = hashlib.sha256(host.encode()).hexdigest()[:16]
+        return os.path.join(SshMux._mux_dir, name)
+
+    @staticmethod
+    def ssh_opts(host: str) -> list[str]:
+        """
+        ssh/scp options to use the shared connection to host.
+        Empty if not enabled.
+        """
+        if not SshMux._mux_dir:
+            return []
+
+        sock = SshMux._socket(host)
+        with SshMux._lock:
+            stats = SshMux._stats.setdefault(host, _HostStats())
+            stats.uses += 1
+            if os.path.exists(sock):
+                stats.reused += 1
+
+        return ['-o', 'ControlMaster=auto',
+                '-o', f'ControlPath={sock}',
+                '-o', f'ControlPersist={SshMux._persist}']
+
+    @staticmethod
+    def ssh(host: str) -> list[str]:
+        """
+        ssh command (before remote command) for host
+        """
+        return ['/usr/bin/ssh'] + SshMux.ssh_opts(host) + [host]
+
+    @staticmethod
+    def scp(host: str) -> list[str]:
+        """
+        scp command (before file arguments) for host
+        """
+        return ['/usr/bin/scp'] + SshMux.ssh_opts(host)
+
+    @staticmethod
+    def rsync_rsh(host: str, ssh_args: list[str] | None = None) -> str:
+        """
+        rsync -e (--rsh) value for host
+        """
+        args = ['ssh'] + SshMux.ssh_opts(host)
+        if ssh_args:
+            args += ssh_args
+        return ' '.join(args)
+
+    @staticmethod
+    def close_all():
+        """
+        Stop every master connection - including any started
+        by other processes (certbot hooks).
+        """
+        mux_dir = SshMux._mux_dir
+        if not mux_dir or not os.path.isdir(mux_dir):
+            return
+
+        with os.scandir(mux_dir) as scan:
+            socks = [entry.path for entry in scan]
+
+        for sock in socks:
+            # host is not used - the socket identifies the connection
+            pargs = ['/usr/bin/ssh', '-o', f'ControlPath={sock}',
+                     '-O', 'exit', 'mux']
+            try:
+                subprocess.run(pargs, capture_output=True, timeout=30,
+                               check=False)
+            except (OSError, subprocess.SubprocessError):
+                pass
+            if os.path.exists(sock):
+                try:
+                    os.unlink(sock)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def stats() -> list[tuple[str, int, int]]:
+        """
+        Per host: (host, uses, reused)
+        """
+        with SshMux._lock:
+            return [(host, stats.uses, stats.reused)
+                    for (host, stats) in sorted(SshMux._stats.items())]
+
+    @staticmethod
+    def stats_str() -> str:
+        """
+        One line summary
+        """
+        stats = SshMux.stats()
+        uses = sum(item[1] for item in stats)
+        reused = sum(item[2] for item in stats)
+        return f'{len(stats)} hosts, {uses} uses, {reused} reused connection'
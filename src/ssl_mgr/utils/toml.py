@@ -41,6 +41,17 @@ def dict_to_toml_string(dic: dict[str, Any]) -> str:
     return txt
 
 
+def toml_string_to_dict(data: str) -> dict[str, Any] | None:
+    """
+    Parse toml string - None if not valid toml
+    (e.g. a damaged cache file)
+    """
+    try:
+        return toml.loads(data)
+    except toml.TOMLDecodeError:
+        return None
+
+
 def read_toml_file(fpath: str) -> dict[str, Any]:
     """
     read toml file and return a dictionary
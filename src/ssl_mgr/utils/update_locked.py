@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Read - merge - write of a file shared by threads and processes
+(e.g. caches and stats updated by sslm-mgr and certbot hooks).
+ - exclusive flock on <file>.lock held throughout
+ - new content written to a unique temp file in same dir and
+   renamed over the file - readers never see a partial file.
+"""
+# pylint: disable=duplicate-code
+from collections.abc import Callable
+import fcntl
+import os
+import tempfile
+
+
+def write_path_unique(data: str, fpath: str,
+                      log: Callable[..., None] = print) -> bool:
+    """
+    Like write_path_atomic, but temp file name is unique so
+    concurrent writers can't clobber each other's temp file.
+    """
+    fpath_dir = os.path.dirname(fpath)
+    try:
+        os.makedirs(fpath_dir, exist_ok=True)
+        (fd, fpath_tmp) = tempfile.mkstemp(dir=fpath_dir,
+                                           prefix=f'.{os.path.basename(fpath)}.')
+    except OSError as err:
+        log(f'write_path_unique - failed making temp file in {fpath_dir} : {err}')
+        return False
+
+    try:
+        with os.fdopen(fd, 'w') as fob:
+            fob.write(data)
+            fob.flush()
+            os.fsync(fob.fileno())
+        os.rename(fpath_tmp, fpath)
+    except OSError as err:
+        log(f'write_path_unique - write error {fpath} : {err}')
+        try:
+            os.unlink(fpath_tmp)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def update_file_locked(fpath: str, update: Callable[[str], str | None],
+                       log: Callable[..., None] = print) -> bool:
+    """
+    Replace file content with update(current content).
+     - current content is '' if no file
+     - update returns None to leave file as is
+    """
+    fpath_dir = os.path.dirname(fpath)
+    try:
+        os.makedirs(fpath_dir, exist_ok=True)
+        lock_fobj = open(f'{fpath}.lock', 'a', encoding='utf-8')
+    except OSError as err:
+        log(f'update_file_locked - lock failed {fpath} : {err}')
+        return False
+
+    with lock_fobj:
+        fcntl.flock(lock_fobj, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(fpath, 'r', encoding='utf-8') as fobj:
+                    data = fobj.read()
+            except FileNotFoundError:
+                data = ''
+            except (OSError, ValueError) as err:
+                log(f'update_file_locked - read failed {fpath} : {err}')
+                data = ''
+
+            new_data = update(data)
+            if new_data is None:
+                return True
+            return write_path_unique(new_data, fpath, log)
+        finally:
+            fcntl.flock(lock_fobj, fcntl.LOCK_UN)
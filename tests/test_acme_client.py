@@ -0,0 +1,232 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Native ACME engine against an in memory fake CA:
+ - signed posts, nonce reuse and badNonce retry
+ - order -> authorize -> finalize -> download
+ - cached authorizations skip challenges
+ - unexpected response shapes raise AcmeError
+"""
+# pylint: disable=protected-access,redefined-outer-name
+from http.client import HTTPMessage
+from types import SimpleNamespace
+import base64
+import json
+
+import pytest
+
+from ssl_mgr.cbot import sign_cert_acme
+from ssl_mgr.cbot.acme_authz_cache import AcmeAuthzCache
+from ssl_mgr.cbot.acme_client import (AcmeSession, AcmeAccount, AcmeError,
+                                      AcmeResponse)
+from ssl_mgr.cbot.acme_jws import (new_acct_key, jwk_thumbprint)
+
+_CA = 'https://ca.test'
+_CERT_PEM = ('-----BEGIN CERTIFICATE-----\nMIIB\n-----END CERTIFICATE-----\n'
+             '-----BEGIN CERTIFICATE-----\nMIIC\n-----END CERTIFICATE-----\n')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+class _FakeCA:
+    """
+    Stands in for AcmeSession.https (_Https) - a minimal ACME server
+    with one authorization (example.com, http-01) per order.
+    """
+    def __init__(self):
+        self.num_nonces = 0
+        self.used_nonces: set[str] = set()
+        self.bad_nonces = 0             # next N posts get badNonce
+        self.posts: list[dict] = []
+        self.authz: dict = {'status': 'pending',
+                            'expires': '2099-01-01T00:00:00Z',
+                            'identifier': {'type': 'dns',
+                                           'value': 'example.com'},
+                            'challenges': [{'type': 'http-01',
+                                            'url': f'{_CA}/chall/1',
+                                            'token': 'tok1'}]}
+        self.order: dict = {}
+        self.order_status_at_create = 'pending'
+
+    def _nonce(self) -> str:
+        self.num_nonces += 1
+        return f'nonce{self.num_nonces}'
+
+    def _resp(self, status: int, body: dict | str | None = None,
+              headers: dict[str, str] | None = None) -> AcmeResponse:
+        msg = HTTPMessage()
+        msg['Replay-Nonce'] = self._nonce()
+        for (key, val) in (headers or {}).items():
+            msg[key] = val
+        if isinstance(body, str):
+            data = body.encode()
+        else:
+            data = json.dumps(body or {}).encode()
+        return AcmeResponse(status, msg, data)
+
+    def _order_status(self) -> str:
+        if self.order.get('status') == 'valid':
+            return 'valid'
+        return 'ready' if self.authz['status'] == 'valid' else 'pending'
+
+    def request(self, method: str, url: str, body: bytes | None = None,
+                headers: dict[str, str] | None = None) -> AcmeResponse:
+        """ one http request """
+        _ = headers
+        if method == 'GET':
+            return self._resp(200, {'newNonce': f'{_CA}/nonce',
+                                    'newAccount': f'{_CA}/acct',
+                                    'newOrder': f'{_CA}/order',
+                                    'meta': {}})
+        if method == 'HEAD':
+            return self._resp(200)
+
+        jws = json.loads(body or b'{}')
+        protected = json.loads(_b64decode(jws['protected']))
+        payload = jws['payload']
+        self.posts.append({'url': url, 'protected': protected,
+                           'payload': payload})
+
+        nonce = protected['nonce']
+        if self.bad_nonces > 0 or nonce in self.used_nonces:
+            self.bad_nonces -= 1
+            return self._resp(400, {'type': 'urn:ietf:params:acme:error:badNonce'})
+        self.used_nonces.add(nonce)
+        assert protected['url'] == url
+
+        return self._route(url, payload)
+
+    def _route(self, url: str, payload: str) -> AcmeResponse:
+        path = url.removeprefix(_CA)
+        match path:
+            case '/order':
+                self.order = {'status': self.order_status_at_create,
+                              'authorizations': [f'{_CA}/authz/1'],
+                              'finalize': f'{_CA}/finalize/1'}
+                return self._resp(201, self.order,
+                                  {'Location': f'{_CA}/order/1'})
+            case '/order/1':
+                self.order['status'] = self._order_status()
+                return self._resp(200, self.order)
+            case '/authz/1':
+                return self._resp(200, self.authz)
+            case '/chall/1':
+                assert json.loads(_b64decode(payload)) == {}
+                self.authz['status'] = 'valid'
+                return self._resp(200, {'status': 'processing'})
+            case '/finalize/1':
+                assert self._order_status() == 'ready'
+                self.order['status'] = 'valid'
+                self.order['certificate'] = f'{_CA}/cert/1'
+                return self._resp(200, self.order)
+            case '/cert/1':
+                return self._resp(200, _CERT_PEM)
+        return self._resp(404, {'type': 'urn:ietf:params:acme:error:malformed',
+                                'detail': f'no {path}'})
+
+    def close(self):
+        """ nothing open """
+
+
+@pytest.fixture
+def fake_ca(monkeypatch) -> _FakeCA:
+    """ fake CA and no real pushes """
+    AcmeAuthzCache._accounts = {}
+    AcmeAuthzCache._path = ''
+    monkeypatch.setattr(sign_cert_acme, 'auth_push',
+                        lambda certbot, rows: certbot.pushed.append(rows))
+    return _FakeCA()
+
+
+def _account(fake_ca: _FakeCA) -> AcmeAccount:
+    session = AcmeSession(f'{_CA}/directory')
+    session.https = fake_ca                     # type: ignore[assignment]
+    return AcmeAccount(session, new_acct_key(), kid=f'{_CA}/acct/1')
+
+
+def _order(acct: AcmeAccount) -> tuple[str, SimpleNamespace]:
+    certbot = SimpleNamespace(apex_domain='example.com', challenge_proto='',
+                              pushed=[])
+    ca_info = SimpleNamespace(ca_preferred_acme_profile='',
+                              ca_preferred_chain='')
+    x509 = SimpleNamespace(CN='example.com', sans=['example.com'])
+    csr = SimpleNamespace(public_bytes=lambda _encoding: b'csr-der')
+    ssl_csr = SimpleNamespace(svc=SimpleNamespace(x509=x509), csr=csr)
+
+    pem = sign_cert_acme._order(certbot, SimpleNamespace(ca_info=ca_info),
+                                acct, ssl_csr, 'http')
+    return (pem, certbot)
+
+
+def test_post_retries_bad_nonce(fake_ca):
+    """ badNonce is retried with a fresh nonce """
+    acct = _account(fake_ca)
+    fake_ca.bad_nonces = 1
+
+    resp = acct.post(f'{_CA}/authz/1')
+
+    assert resp.json()['status'] == 'pending'
+    nonces = [post['protected']['nonce'] for post in fake_ca.posts]
+    assert len(nonces) == 2
+    assert nonces[0] != nonces[1]
+    assert fake_ca.posts[1]['protected']['kid'] == acct.kid
+
+
+def test_post_gives_up_on_bad_nonces(fake_ca):
+    """ not retried forever """
+    acct = _account(fake_ca)
+    fake_ca.bad_nonces = 10
+    with pytest.raises(AcmeError):
+        acct.post(f'{_CA}/authz/1')
+
+
+def test_post_error_raises(fake_ca):
+    """ acme problem document becomes AcmeError """
+    acct = _account(fake_ca)
+    with pytest.raises(AcmeError, match='no /nothing'):
+        acct.post(f'{_CA}/nothing')
+
+
+def test_order_flow(fake_ca):
+    """ new order through to downloaded chain """
+    acct = _account(fake_ca)
+
+    (pem, certbot) = _order(acct)
+
+    assert pem == _CERT_PEM
+    thumbprint = jwk_thumbprint(acct.key)
+    assert certbot.pushed == [['# example.com http',
+                               f'example.com tok1.{thumbprint} tok1']]
+    assert AcmeAuthzCache.valid(acct.kid, f'{_CA}/authz/1') == 'example.com'
+    # replay nonces from responses are reused - only the first is fetched
+    assert fake_ca.num_nonces > len(fake_ca.posts)
+    assert len(fake_ca.used_nonces) == len(fake_ca.posts)
+
+
+def test_cached_authz_skips_challenge(fake_ca):
+    """ second order of same name needs no challenge """
+    acct = _account(fake_ca)
+    _order(acct)
+    num_posts = len(fake_ca.posts)
+
+    (pem, certbot) = _order(acct)
+
+    assert pem == _CERT_PEM
+    assert not certbot.pushed
+    urls = [post['url'] for post in fake_ca.posts[num_posts:]]
+    assert f'{_CA}/authz/1' not in urls
+
+
+def test_unexpected_response_shape(fake_ca):
+    """ malformed server data is an AcmeError not a crash """
+    acct = _account(fake_ca)
+    fake_ca.authz['identifier'] = 'example.com'
+    with pytest.raises(AcmeError):
+        _order(acct)
+
+    fake_ca.authz['identifier'] = {'type': 'dns', 'value': 'example.com'}
+    fake_ca.authz['challenges'] = 'http-01'
+    with pytest.raises(AcmeError):
+        _order(acct)
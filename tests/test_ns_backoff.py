@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+# SPDX-FileCopyrightText: © 2023-present Gene C <arch@sapience.com>
+"""
+Nameserver propagation waiter (dns-01):
+ - backoff schedule
+ - total wait capped at wait_max
+ - learned initial delay (NsStats)
+Nameservers are faked (dns_serial_async) and time is virtual.
+"""
+# pylint: disable=protected-access,redefined-outer-name
+import asyncio
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ssl_mgr.dns_base import check_acme
+from ssl_mgr.dns_base.backoff import Backoff
+from ssl_mgr.dns_base.ns_stats import (NsStats, read_ns_stats)
+
+
+class _Clock:
+    """
+    virtual time.monotonic() advanced by asyncio.sleep():
+    when every task is asleep the earliest one wakes.
+    """
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+        self.waking: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    """ virtual clock for check_acme """
+    clk = _Clock()
+    real_sleep = asyncio.sleep
+
+    async def _sleep(secs: float):
+        clk.sleeps.append(secs)
+        wake = clk.now + secs
+        clk.waking.append(wake)
+        while clk.now < wake:
+            # let the others run till they sleep too
+            await real_sleep(0)
+            await real_sleep(0)
+            if wake <= min(clk.waking):
+                clk.now = wake
+        clk.waking.remove(wake)
+
+    monkeypatch.setattr(check_acme, 'time', clk)
+    monkeypatch.setattr(asyncio, 'sleep', _sleep)
+    return clk
+
+
+@pytest.fixture
+def stats_dir(tmp_path) -> str:
+    """ fresh process wide NsStats in tmp dir """
+    NsStats._path = ''
+    NsStats._ns = {}
+    NsStats._events = []
+    NsStats.initialize(str(tmp_path))
+    return str(tmp_path)
+
+
+def _ssl_dns(top_dir: str, nameservers: list[str], wait_max: int = 600,
+             check_delay: int = 60) -> SimpleNamespace:
+    resolvers = {ns: SimpleNamespace(nameservers=[ns], port=53)
+                 for ns in nameservers}
+    return SimpleNamespace(apex_domain='example.com', wait_max=wait_max,
+                           check_delay=check_delay, query_timeout=1.0,
+                           resolvers=resolvers, top_dir=top_dir)
+
+
+def _fake_nameservers(monkeypatch, clock: _Clock, ready_at: dict[str, float]):
+    """
+    ns has new serial '2' once clock passes its ready_at
+    (relative to clock start) - never if not in ready_at.
+    """
+    start = clock.now
+
+    def _resolver(nameservers, _port, _timeout):
+        return nameservers[0]
+
+    async def _serial(ns, _domain):
+        ready = ready_at.get(ns)
+        if ready is not None and clock.now - start >= ready:
+            return ('2', False)
+        return ('1', False)
+
+    monkeypatch.setattr(check_acme, 'dns_resolver_async', _resolver)
+    monkeypatch.setattr(check_acme, 'dns_serial_async', _serial)
+
+
+def test_backoff_schedule():
+    """ doubles up to max_wait """
+    backoff = Backoff(first=2.0, factor=2.0, max_wait=20.0, jitter=0.0)
+    waits = [backoff.next_wait() for _ in range(6)]
+    assert waits == [2.0, 4.0, 8.0, 16.0, 20.0, 20.0]
+
+
+def test_backoff_jitter_bounds():
+    """ jitter stays within +/- jitter fraction """
+    backoff = Backoff(first=10.0, factor=1.0, max_wait=10.0, jitter=0.2)
+    for _ in range(200):
+        assert 8.0 <= backoff.next_wait() <= 12.0
+
+
+def test_nameservers_each_on_own_schedule(monkeypatch, clock, stats_dir):
+    """ fast ns done early, slow one keeps polling """
+    _fake_nameservers(monkeypatch, clock, {'ns1.': 0.0, 'ns2.': 100.0})
+    ssl_dns = _ssl_dns(stats_dir, ['ns1.', 'ns2.'], check_delay=5)
+    start = clock.now
+
+    pending = asyncio.run(check_acme._nameservers_updated(ssl_dns, '2', start))
+
+    assert not pending
+    assert NsStats._ns['ns1.']['count'] == 1
+    assert NsStats._ns['ns1.']['last_secs'] == 5.0
+    assert NsStats._ns['ns2.']['last_secs'] >= 100.0
+    # polled with backoff - not a fixed interval
+    assert max(clock.sleeps) > 2 * min(clock.sleeps)
+
+
+def test_total_wait_capped(monkeypatch, clock, stats_dir):
+    """ gives up at wait_max and counts the failure """
+    _fake_nameservers(monkeypatch, clock, {})
+    ssl_dns = _ssl_dns(stats_dir, ['ns1.'], wait_max=300, check_delay=10)
+    start = clock.now
+
+    pending = asyncio.run(check_acme._nameservers_updated(ssl_dns, '2', start))
+
+    assert pending == ['ns1.']
+    assert clock.now - start == pytest.approx(300.0)
+    assert NsStats._ns['ns1.']['fails'] == 1
+
+
+def test_initial_delay_learned(stats_dir):
+    """ initial delay shrinks only after min_count samples """
+    max_delay = 60.0
+    for count in range(NsStats.min_count):
+        assert NsStats.initial_delay('ns1.', max_delay) == max_delay
+        NsStats.add('ns1.', 8.0, str(count))
+
+    delay = NsStats.initial_delay('ns1.', max_delay)
+    assert delay == pytest.approx(NsStats.delay_frac * 8.0)
+
+    # never more than dns_check_delay
+    assert NsStats.initial_delay('ns1.', 4.0) == 4.0
+    assert NsStats.initial_delay('ns1.', 0) == 0.0
+
+
+def test_stats_saved_concurrently(stats_dir):
+    """ threads saving together lose nothing """
+    num_threads = 8
+    barrier = threading.Barrier(num_threads)
+    results: list[bool] = []
+
+    def _worker(idx: int):
+        NsStats.add(f'ns{idx}.', 5.0, '1')
+        barrier.wait()
+        results.append(NsStats.save())
+
+    threads = [threading.Thread(target=_worker, args=(idx,))
+               for idx in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results)
+    saved = read_ns_stats(stats_dir)
+    assert saved is not None
+    assert sorted(saved) == sorted(f'ns{idx}.' for idx in range(num_threads))
+
+
+def test_damaged_stats_file(stats_dir):
+    """ unreadable file is treated as no history """
+    os.makedirs(f'{stats_dir}/.dns-stats', exist_ok=True)
+    with open(f'{stats_dir}/.dns-stats/ns-stats.toml', 'w',
+              encoding='utf-8') as fobj:
+        fobj.write('[ns."ns1.\ncount = ')
+    assert read_ns_stats(stats_dir) is None
+
+    NsStats._path = ''
+    NsStats.initialize(stats_dir)
+    NsStats.add('ns1.', 5.0, '1')
+    assert NsStats.save()
+    assert read_ns_stats(stats_dir) == NsStats._ns